@@ -0,0 +1,96 @@
+# bench_extract.py
+"""
+Compare the two HTML -> text engines on the pages in .cache/http.
+
+    python bench_extract.py [--repeat 3] [--max-text 18000]
+"""
+import argparse
+import gzip
+import glob
+import os
+import time
+
+from src.web import html_to_text
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _load_pages(cache_dir: str) -> list[tuple[str, str]]:
+    pages: list[tuple[str, str]] = []
+
+    # flat legacy entries
+    for p in sorted(glob.glob(os.path.join(cache_dir, "*.html"))):
+        pages.append((os.path.basename(p), open(p, "r", encoding="utf-8", errors="ignore").read()))
+
+    # content-addressed blobs
+    for p in sorted(glob.glob(os.path.join(cache_dir, "blobs", "*", "*.html.*"))):
+        raw = open(p, "rb").read()
+        if p.endswith(".gz"):
+            raw = gzip.decompress(raw)
+        elif p.endswith(".zst"):
+            if zstandard is None:
+                continue
+            raw = zstandard.ZstdDecompressor().decompress(raw)
+        pages.append((os.path.basename(p), raw.decode("utf-8", errors="ignore")))
+
+    return pages
+
+
+def _time_engine(html: str, engine: str, max_text: int, repeat: int) -> tuple[float, str]:
+    best = float("inf")
+    text = ""
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        _, text = html_to_text(html, engine=engine, max_text=max_text)
+        best = min(best, time.perf_counter() - t0)
+    return best, text
+
+
+def _word_agreement(a: str, b: str) -> float:
+    """
+    Jaccard overlap of the word sets (1.0 = same vocabulary).
+    """
+    wa, wb = set(a.split()), set(b.split())
+    if not wa and not wb:
+        return 1.0
+    return len(wa & wb) / len(wa | wb)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cache-dir", default=os.path.join(".cache", "http"))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--max-text", type=int, default=18000)
+    args = ap.parse_args()
+
+    pages = _load_pages(args.cache_dir)
+    if not pages:
+        print(f"No cached pages found in {args.cache_dir}")
+        return
+
+    print(f"{'page':<44} {'KB':>7} {'bs4 ms':>9} {'lxml ms':>9} {'speedup':>8} {'agree':>6}")
+    total_bs4 = 0.0
+    total_lxml = 0.0
+    for name, html in pages:
+        t_bs4, text_bs4 = _time_engine(html, "bs4", args.max_text, args.repeat)
+        t_lxml, text_lxml = _time_engine(html, "lxml", args.max_text, args.repeat)
+        total_bs4 += t_bs4
+        total_lxml += t_lxml
+        print(
+            f"{name[:44]:<44} {len(html) / 1024:>7.0f} {t_bs4 * 1000:>9.1f} {t_lxml * 1000:>9.1f} "
+            f"{(t_bs4 / t_lxml if t_lxml else 0):>7.1f}x {_word_agreement(text_bs4, text_lxml):>6.2f}"
+        )
+
+    print()
+    print(f"pages: {len(pages)}")
+    print(f"bs4 total:  {total_bs4 * 1000:.0f} ms ({total_bs4 / len(pages) * 1000:.1f} ms/page)")
+    print(f"lxml total: {total_lxml * 1000:.0f} ms ({total_lxml / len(pages) * 1000:.1f} ms/page)")
+    if total_lxml:
+        print(f"speedup:    {total_bs4 / total_lxml:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# bench_pipeline.py
+"""
+Throughput of the research -> fit pipeline without network: profile + fit for N companies
+against the fake LLM backend (llm_backends.FakeLLMBackend), on the pages stored in
+cache/profiles (synthetic pages if there are none).
+
+    python bench_pipeline.py [--companies 50] [--latency 0.5] [--tokens-per-s 100] [--concurrency 16] [--stream]
+
+Fit results are written to a temporary cache directory, not to cache/fit.
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from src.fit import iter_score_company_fit, score_company_fit
+from src.llm import LLMClient, LLMLimits, configure_llm, llm_stats, run_batch
+from src.llm_backends import FakeLLMBackend
+from src.research import iter_summarize_company, summarize_company
+from src.web import FetchedPage
+
+
+def _load_companies(profiles_dir: str) -> list[tuple[str, list[FetchedPage]]]:
+    out: list[tuple[str, list[FetchedPage]]] = []
+    for p in sorted(glob.glob(os.path.join(profiles_dir, "*.json"))):
+        try:
+            with open(p, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            continue
+        pages = [
+            FetchedPage(url=d.get("url", ""), title=d.get("title", ""), text=d.get("text", ""))
+            for d in entry.get("pages") or []
+            if d.get("text")
+        ]
+        if pages:
+            out.append((str(entry.get("company_name") or os.path.basename(p)), pages))
+    return out
+
+
+def _synthetic_companies(n: int) -> list[tuple[str, list[FetchedPage]]]:
+    body = (
+        "{name} builds software for logistics teams. Our platform helps dispatchers plan routes, "
+        "track shipments and talk to customers. Founded in 2012, {name} employs 120 people. "
+        "Leadership: Anna Example (CEO), Ben Sample (CTO). Customers include retailers and carriers. "
+    )
+    return [
+        (
+            f"Company {i}",
+            [
+                FetchedPage(url=f"https://company{i}.example/", title=f"Company {i}", text=body.format(name=f"Company {i}") * 8),
+                FetchedPage(url=f"https://company{i}.example/about", title="About", text=body.format(name=f"Company {i}") * 4),
+            ],
+        )
+        for i in range(n)
+    ]
+
+
+def _pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+
+def _run_one(company: tuple[str, list[FetchedPage]], stream: bool) -> dict:
+    name, pages = company
+    t0 = time.monotonic()
+    first = None
+    if stream:
+        for profile in iter_summarize_company(name, pages, min_interval_s=0.0):
+            if first is None and profile.get("partial"):
+                first = time.monotonic() - t0
+        for fit in iter_score_company_fit(name, profile["profile_raw"], profile=profile.get("profile"), use_cache=False, min_interval_s=0.0):
+            pass
+    else:
+        profile = summarize_company(name, pages)
+        fit = score_company_fit(name, profile["profile_raw"], profile=profile.get("profile"), use_cache=False)
+    return {
+        "seconds": time.monotonic() - t0,
+        "first_s": first,
+        "errors": len(profile.get("profile_errors") or []) + len(fit.get("fit_errors") or []),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--profiles-dir", default=os.path.join("cache", "profiles"))
+    ap.add_argument("--companies", type=int, default=50)
+    ap.add_argument("--latency", type=float, default=0.5)
+    ap.add_argument("--tokens-per-s", type=float, default=100.0)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--rpm", type=float, default=500)
+    ap.add_argument("--tpm", type=float, default=200_000)
+    ap.add_argument("--stream", action="store_true")
+    args = ap.parse_args()
+
+    companies = _load_companies(args.profiles_dir)
+    source = args.profiles_dir
+    if not companies:
+        companies, source = _synthetic_companies(args.companies), "synthetic"
+    companies = (companies * (args.companies // len(companies) + 1))[: args.companies]
+
+    configure_llm(
+        LLMClient(
+            limits=LLMLimits(rpm=args.rpm, tpm=args.tpm, concurrency=args.concurrency),
+            backend=FakeLLMBackend(latency_s=args.latency, tokens_per_s=args.tokens_per_s),
+        )
+    )
+
+    cwd = os.getcwd()
+    tmp = tempfile.mkdtemp(prefix="bench_pipeline_")
+    os.chdir(tmp)  # cache/fit is relative: keep fake fits out of the real cache
+    try:
+        t0 = time.monotonic()
+        results = run_batch(lambda c: _run_one(c, args.stream), companies)
+        wall = time.monotonic() - t0
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    ok = [r for r in results if isinstance(r, dict)]
+    failed = len(results) - len(ok)
+    seconds = [r["seconds"] for r in ok]
+    firsts = [r["first_s"] for r in ok if r["first_s"] is not None]
+
+    print(f"companies:  {len(companies)} ({source}), {'streamed' if args.stream else 'blocking'}")
+    print(f"wall:       {wall:.1f} s ({len(companies) / wall:.2f} companies/s)" if wall else "wall: 0 s")
+    print(f"per company: p50 {_pct(seconds, 0.5):.2f} s, p95 {_pct(seconds, 0.95):.2f} s")
+    if firsts:
+        print(f"first text: p50 {_pct(firsts, 0.5):.2f} s, p95 {_pct(firsts, 0.95):.2f} s")
+    print(f"failed:     {failed}, schema errors: {sum(r['errors'] for r in ok)}")
+    print(f"llm:        {json.dumps(llm_stats())}")
+
+
+if __name__ == "__main__":
+    main()
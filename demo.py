@@ -1,12 +1,15 @@
 # demo.py
 import streamlit as st
 import pandas as pd
-import json 
 
 from src.io import load_leads_csv
-from src.research import build_company_profile
-from src.fit import score_company_fit
-from src.discovery import DiscoverySpec, find_company_by_name, discover_companies
+from src.brief_view import ensure_fit, ensure_profile
+from src.discovery import DiscoverySpec, iter_discover_companies, iter_find_company_by_name
+from src.prefetch import Prefetcher
+from src.schemas import parsed_profile
+
+# Homepages + Unterseiten der ersten N Kandidaten im Hintergrund vorladen (0 = aus)
+PREFETCH_TOP_N = 3
 
 
 # ----------------------------
@@ -315,31 +318,6 @@ def _fit_badge(score: int | None) -> tuple[str, str]:
     return ("Weak", "badge-weak")
 
 
-def _ensure_profile(company_name: str, company_url: str, use_cache: bool) -> dict:
-    if "profiles_by_name" not in st.session_state:
-        st.session_state["profiles_by_name"] = {}
-    if company_name in st.session_state["profiles_by_name"]:
-        return st.session_state["profiles_by_name"][company_name]
-    profile = build_company_profile(company_name, company_url, use_cache=use_cache)
-    st.session_state["profiles_by_name"][company_name] = profile
-    return profile
-
-
-def _ensure_fit(company_name: str, profile_raw: str, preferences: dict, use_cache: bool) -> dict:
-    if "fit_by_name" not in st.session_state:
-        st.session_state["fit_by_name"] = {}
-    if company_name in st.session_state["fit_by_name"]:
-        return st.session_state["fit_by_name"][company_name]
-    fit_state = score_company_fit(
-        company_name=company_name,
-        profile_raw=profile_raw,
-        preferences=preferences,
-        use_cache=use_cache,
-    )
-    st.session_state["fit_by_name"][company_name] = fit_state
-    return fit_state
-
-
 def _set_results(items: list[dict]):
     df = pd.DataFrame(items)
     if df.empty:
@@ -347,31 +325,43 @@ def _set_results(items: list[dict]):
     st.session_state["results_df"] = df
 
 
-def _safe_parse_json_dict(text: str) -> dict:
+def _stream_results(candidates, live) -> list[dict]:
+    """
+    Sammelt Kandidaten aus einem Discovery-Generator und zeigt jeden sofort an.
+    results_df wird pro Kandidat aktualisiert (ein abgebrochener Lauf behält die Treffer).
+    """
+    items: list[dict] = []
+    for c in candidates:
+        items.append(c)
+        _set_results(items)
+        with live.container():
+            st.markdown('<div class="agentiq-card">', unsafe_allow_html=True)
+            st.markdown(f"**{c.get('company_name') or '(unknown)'}**")
+            if c.get("company_url"):
+                st.caption(c["company_url"])
+            if c.get("snippet"):
+                st.write(c["snippet"])
+            st.markdown("</div>", unsafe_allow_html=True)
+    return items
+
+
+def _start_prefetch(urls: list[str]):
     """
-    Robust JSON parse for strings that should contain a dict.
-    If parsing fails, return empty dict.
+    Wärmt den HTTP-Cache für die ersten Kandidaten, während die Liste gelesen wird.
     """
-    if not text:
-        return {}
-    t = str(text).strip()
-    try:
-        obj = json.loads(t)
-        return obj if isinstance(obj, dict) else {}
-    except Exception:
-        pass
-
-    # try to salvage a JSON object inside text
-    start = t.find("{")
-    end = t.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        chunk = t[start : end + 1]
-        try:
-            obj = json.loads(chunk)
-            return obj if isinstance(obj, dict) else {}
-        except Exception:
-            return {}
-    return {}
+    if st.session_state.get("uv_prefetch_urls") == urls:
+        return
+    _cancel_prefetch()
+    if urls:
+        st.session_state["uv_prefetcher"] = Prefetcher(urls, max_companies=len(urls)).start()
+        st.session_state["uv_prefetch_urls"] = urls
+
+
+def _cancel_prefetch():
+    prefetcher = st.session_state.pop("uv_prefetcher", None)
+    st.session_state.pop("uv_prefetch_urls", None)
+    if prefetcher is not None:
+        prefetcher.cancel()
 
 
 def _render_company_profile_pretty(profile_state: dict):
@@ -381,10 +371,16 @@ def _render_company_profile_pretty(profile_state: dict):
     - Sources moved to the bottom (below Unklarheiten)
     """
     raw = str((profile_state or {}).get("profile_raw", "") or "")
-    parsed = _safe_parse_json_dict(raw)
+    partial = bool((profile_state or {}).get("partial"))
+    # validated when the profile was written; while streaming: the fields parsed so far
+    parsed = parsed_profile(profile_state)
 
     sources = (profile_state or {}).get("sources", []) or []
 
+    if partial and not parsed:
+        st.caption("Profil wird erstellt…")
+        return
+
     # Fallback if JSON cannot be parsed
     if not parsed:
         st.caption("Confidence")
@@ -448,6 +444,48 @@ def _render_company_profile_pretty(profile_state: dict):
             st.write(f"- {s.get('title','')} — {s.get('url','')}")
 
 
+def _render_fit_pretty(fit_state: dict):
+    """
+    Decision-Support Ergebnis (auch Zwischenstände beim Streaming: fertige Felder zuerst).
+    """
+    fit = fit_state.get("fit", {}) if isinstance(fit_state.get("fit"), dict) else {}
+    score = fit.get("fit_score", None)
+    if isinstance(score, (int, float)):
+        st.metric("Suitability Score", int(score))
+    else:
+        st.metric("Suitability Score", "—")
+
+    if fit.get("decision_summary"):
+        st.markdown("#### Zusammenfassung")
+        st.write(fit["decision_summary"])
+
+    if fit.get("recommended_use_case"):
+        st.markdown("#### Vorschlag für Prototy")
+        st.info(fit["recommended_use_case"])
+
+    why_good = fit.get("why_good_fit", [])
+    why_not = fit.get("why_not", [])
+    next_q = fit.get("next_questions", [])
+
+    if why_good:
+        st.markdown("#### Warum guter fit?")
+        for x in (why_good if isinstance(why_good, list) else [why_good])[:6]:
+            if x:
+                st.write(f"- {x}")
+
+    if why_not:
+        st.markdown("#### Risiken")
+        for x in (why_not if isinstance(why_not, list) else [why_not])[:6]:
+            if x:
+                st.write(f"- {x}")
+
+    if next_q:
+        st.markdown("#### Offene Fragen")
+        for x in (next_q if isinstance(next_q, list) else [next_q])[:6]:
+            if x:
+                st.write(f"- {x}")
+
+
 # ----------------------------
 # Session init
 # ----------------------------
@@ -573,8 +611,9 @@ if st.session_state["uv_view"] == "start":
                 if not q.strip():
                     st.error("Bitte gib einen Firmennamen oder eine Domain ein.")
                 else:
+                    live = st.container()
                     with st.spinner("Suche…"):
-                        candidates = find_company_by_name(q, max_results=int(top_n))
+                        candidates = _stream_results(iter_find_company_by_name(q, max_results=int(top_n)), live)
                         _set_results(candidates)
                         st.session_state["uv_view"] = "results"
                         st.rerun()
@@ -604,8 +643,9 @@ if st.session_state["uv_view"] == "start":
                         company_size="",
                         exclude_consumer_services=True,
                     )
+                    live = st.container()
                     with st.spinner("Discover…"):
-                        items = discover_companies(spec, max_results=int(top_n))
+                        items = _stream_results(iter_discover_companies(spec, max_results=int(top_n)), live)
                         _set_results(items)
                         st.session_state["uv_view"] = "results"
                         st.rerun()
@@ -618,6 +658,7 @@ elif st.session_state["uv_view"] == "results":
     back_row = st.columns([1, 5, 1], vertical_alignment="center")
     with back_row[0]:
         if st.button("← Zurück", type="primary", use_container_width=True, key="back_results"):
+            _cancel_prefetch()
             st.session_state["uv_view"] = "start"
             st.session_state["uv_start_step"] = "step1"
             st.rerun()
@@ -633,6 +674,9 @@ elif st.session_state["uv_view"] == "results":
     else:
         top_k = st.slider("Top N anzeigen", 3, 20, min(10, len(df)), 1)
 
+        if PREFETCH_TOP_N > 0:
+            _start_prefetch([str(u).strip() for u in df["company_url"].head(PREFETCH_TOP_N) if str(u).strip()])
+
         st.write("")
         for _, row in df.head(int(top_k)).iterrows():
             cname = str(row.get("company_name", "")).strip()
@@ -662,6 +706,8 @@ elif st.session_state["uv_view"] == "results":
                 st.markdown(f'<div class="agentiq-metric {badge_cls}">Early fit: <b>{badge_text}</b></div>', unsafe_allow_html=True)
             with cC:
                 if st.button("Brief öffnen", type="primary", use_container_width=True, key=f"open_{cname}_{curl}"):
+                    if st.session_state.get("uv_prefetcher") is not None:
+                        st.session_state["uv_prefetcher"].focus(curl)
                     st.session_state["uv_selected_company"] = {
                         "company_name": cname,
                         "company_url": curl,
@@ -705,27 +751,10 @@ elif st.session_state["uv_view"] == "brief":
     with a2:
         run_brief = st.button("Brief generieren", type="primary", use_container_width=True, key="run_brief_uv")
 
+    status = st.container()
     profile_state = (st.session_state.get("profiles_by_name") or {}).get(cname)
     fit_state = (st.session_state.get("fit_by_name") or {}).get(cname)
 
-    if run_research:
-        with st.spinner("Research…"):
-            profile_state = _ensure_profile(cname, curl, use_cache=st.session_state["uv_caches"]["research"])
-            st.success("Research fertig ✅")
-
-    if run_brief:
-        if not profile_state:
-            with st.spinner("Research (required)…"):
-                profile_state = _ensure_profile(cname, curl, use_cache=st.session_state["uv_caches"]["research"])
-        with st.spinner("Scoring…"):
-            fit_state = _ensure_fit(
-                company_name=cname,
-                profile_raw=str(profile_state.get("profile_raw", "") or ""),
-                preferences=st.session_state["uv_prefs"],
-                use_cache=st.session_state["uv_caches"]["decision"],
-            )
-            st.success("Brief erstellt ✅")
-
     st.divider()
 
     left, right = st.columns(2)  # 50/50
@@ -733,52 +762,57 @@ elif st.session_state["uv_view"] == "brief":
     # -------- LEFT: Company profile (pretty, no raw JSON) --------
     with left:
         st.markdown("###  Company Profile")
+        profile_slot = st.empty()
+
+    # -------- RIGHT: Decision-support result (no raw JSON expander) --------
+    with right:
+        st.markdown("###  Decision-Support Ergebnis")
+        fit_slot = st.empty()
+
+    # Modellausgabe läuft live in die Spalten; der Endstand wird unten gezeichnet
+    if run_research:
+        profile_state = ensure_profile(
+            cname,
+            curl,
+            use_cache=st.session_state["uv_caches"]["research"],
+            slot=profile_slot,
+            render=_render_company_profile_pretty,
+            waiting="Lade Webseiten…",
+        )
+        status.success("Research fertig ✅")
+
+    if run_brief:
+        if not profile_state:
+            profile_state = ensure_profile(
+                cname,
+                curl,
+                use_cache=st.session_state["uv_caches"]["research"],
+                slot=profile_slot,
+                render=_render_company_profile_pretty,
+                waiting="Lade Webseiten…",
+            )
+        fit_state = ensure_fit(
+            company_name=cname,
+            profile_raw=str(profile_state.get("profile_raw", "") or ""),
+            profile=profile_state.get("profile"),
+            preferences=st.session_state["uv_prefs"],
+            use_cache=st.session_state["uv_caches"]["decision"],
+            slot=fit_slot,
+            render=_render_fit_pretty,
+            waiting="Bereite Brief vor…",
+        )
+        status.success("Brief erstellt ✅")
+
+    with profile_slot.container():
         if profile_state:
             # Pretty render instead of raw JSON textarea
             _render_company_profile_pretty(profile_state)
         else:
             st.info("Noch kein Research. Klicke **Research**.")
 
-    # -------- RIGHT: Decision-support result (no raw JSON expander) --------
-    with right:
-        st.markdown("###  Decision-Support Ergebnis")
+    with fit_slot.container():
         if fit_state and isinstance(fit_state, dict):
-            fit = fit_state.get("fit", {}) if isinstance(fit_state.get("fit"), dict) else {}
-            score = fit.get("fit_score", None)
-            if isinstance(score, (int, float)):
-                st.metric("Suitability Score", int(score))
-            else:
-                st.metric("Suitability Score", "—")
-
-            if fit.get("decision_summary"):
-                st.markdown("#### Zusammenfassung")
-                st.write(fit["decision_summary"])
-
-            if fit.get("recommended_use_case"):
-                st.markdown("#### Vorschlag für Prototy")
-                st.info(fit["recommended_use_case"])
-
-            why_good = fit.get("why_good_fit", [])
-            why_not = fit.get("why_not", [])
-            next_q = fit.get("next_questions", [])
-
-            if why_good:
-                st.markdown("#### Warum guter fit?")
-                for x in (why_good if isinstance(why_good, list) else [why_good])[:6]:
-                    if x:
-                        st.write(f"- {x}")
-
-            if why_not:
-                st.markdown("#### Risiken")
-                for x in (why_not if isinstance(why_not, list) else [why_not])[:6]:
-                    if x:
-                        st.write(f"- {x}")
-
-            if next_q:
-                st.markdown("#### Offene Fragen")
-                for x in (next_q if isinstance(next_q, list) else [next_q])[:6]:
-                    if x:
-                        st.write(f"- {x}")
+            _render_fit_pretty(fit_state)
         else:
             st.info("Noch kein Brief. Klicke **Brief generieren**.")
 
@@ -5,9 +5,9 @@ import streamlit as st
 import pandas as pd
 
 from src.io import load_leads_csv
-from src.research import build_company_profile
-from src.fit import score_company_fit
-from src.discovery import DiscoverySpec, find_company_by_name, discover_companies
+from src.brief_view import batch_briefs, ensure_fit, ensure_profile, render_fit_section, render_profile_section
+from src.discovery import DiscoverySpec, iter_discover_companies, iter_find_company_by_name
+from src.prefetch import Prefetcher
 
 
 # ----------------------------
@@ -25,31 +25,6 @@ def _fit_badge(score: int | None) -> str:
     return "Weak"
 
 
-def _ensure_profile(company_name: str, company_url: str, use_cache: bool) -> dict:
-    if "profiles_by_name" not in st.session_state:
-        st.session_state["profiles_by_name"] = {}
-    if company_name in st.session_state["profiles_by_name"]:
-        return st.session_state["profiles_by_name"][company_name]
-    profile = build_company_profile(company_name, company_url, use_cache=use_cache)
-    st.session_state["profiles_by_name"][company_name] = profile
-    return profile
-
-
-def _ensure_fit(company_name: str, profile_raw: str, preferences: dict, use_cache: bool) -> dict:
-    if "fit_by_name" not in st.session_state:
-        st.session_state["fit_by_name"] = {}
-    if company_name in st.session_state["fit_by_name"]:
-        return st.session_state["fit_by_name"][company_name]
-    fit_state = score_company_fit(
-        company_name=company_name,
-        profile_raw=profile_raw,
-        preferences=preferences,
-        use_cache=use_cache,
-    )
-    st.session_state["fit_by_name"][company_name] = fit_state
-    return fit_state
-
-
 def _set_results(items: list[dict]):
     df = pd.DataFrame(items)
     if df.empty:
@@ -57,6 +32,43 @@ def _set_results(items: list[dict]):
     st.session_state["results_df"] = df
 
 
+def _stream_results(candidates, live) -> list[dict]:
+    """
+    Collect candidates from a discovery generator, showing each one as it arrives.
+    results_df is updated per candidate, so an interrupted run keeps what it found.
+    """
+    items: list[dict] = []
+    for c in candidates:
+        items.append(c)
+        _set_results(items)
+        with live.container(border=True):
+            st.markdown(f"**{c.get('company_name') or '(unknown)'}**")
+            if c.get("company_url"):
+                st.caption(c["company_url"])
+            if c.get("snippet"):
+                st.write(c["snippet"])
+    return items
+
+
+def _start_prefetch(urls: list[str]):
+    """
+    Warm the HTTP cache for the first candidates while the operator reads the list.
+    """
+    if st.session_state.get("prefetch_urls") == urls:
+        return
+    _cancel_prefetch()
+    if urls:
+        st.session_state["prefetcher"] = Prefetcher(urls, max_companies=len(urls)).start()
+        st.session_state["prefetch_urls"] = urls
+
+
+def _cancel_prefetch():
+    prefetcher = st.session_state.pop("prefetcher", None)
+    st.session_state.pop("prefetch_urls", None)
+    if prefetcher is not None:
+        prefetcher.cancel()
+
+
 # ----------------------------
 # Session init
 # ----------------------------
@@ -82,6 +94,7 @@ st.caption("Admin view (unchanged).")
 st.sidebar.header("Computation")
 use_research_cache = st.sidebar.checkbox("Use research cache", value=True)
 use_decision_cache = st.sidebar.checkbox("Use decision cache", value=True)
+prefetch_top_n = st.sidebar.slider("Prefetch top N candidates in background", 0, 10, 3, 1)
 
 st.sidebar.divider()
 st.sidebar.header("Fit preferences (MVP)")
@@ -160,9 +173,12 @@ if st.session_state["view"] == "start":
             if not company_query.strip():
                 st.error("Please enter a company name or domain.")
             else:
+                live = st.container()
                 with st.spinner("Searching the web…"):
                     try:
-                        candidates = find_company_by_name(company_query, max_results=int(top_n))
+                        candidates = _stream_results(
+                            iter_find_company_by_name(company_query, max_results=int(top_n)), live
+                        )
                         _set_results(candidates)
                         st.session_state["view"] = "results"
                         st.rerun()
@@ -204,9 +220,10 @@ if st.session_state["view"] == "start":
                     company_size=company_size,
                     exclude_consumer_services=exclude_local_services,
                 )
+                live = st.container()
                 with st.spinner("Discovering companies…"):
                     try:
-                        items = discover_companies(spec, max_results=int(top_n))
+                        items = _stream_results(iter_discover_companies(spec, max_results=int(top_n)), live)
                         _set_results(items)
                         st.session_state["view"] = "results"
                         st.rerun()
@@ -226,16 +243,31 @@ if st.session_state["view"] == "results":
     if df.empty:
         st.warning("No results available. Go back and search again.")
         if st.button("← Back"):
+            _cancel_prefetch()
             st.session_state["view"] = "start"
             st.rerun()
         st.stop()
 
     top_k = st.slider("Show top N results", 3, 20, min(10, len(df)), 1)
 
+    if prefetch_top_n > 0:
+        _start_prefetch([str(u).strip() for u in df["company_url"].head(int(prefetch_top_n)) if str(u).strip()])
+
     if st.button("← Back to search"):
+        _cancel_prefetch()
         st.session_state["view"] = "start"
         st.rerun()
 
+    if st.button(f"Research + score top {int(top_k)}"):
+        batch = [
+            {"company_name": str(r.get("company_name", "")).strip(), "company_url": str(r.get("company_url", "")).strip()}
+            for _, r in df.head(int(top_k)).iterrows()
+        ]
+        batch = [b for b in batch if b["company_name"] and b["company_url"]]
+        failed = batch_briefs(batch, fit_preferences, use_research_cache, use_decision_cache)
+        if failed:
+            st.warning(f"{failed} of {len(batch)} companies failed; open their brief to retry.")
+
     st.divider()
 
     for _, row in df.head(int(top_k)).iterrows():
@@ -261,6 +293,8 @@ if st.session_state["view"] == "results":
                 st.metric("Early fit", _fit_badge(fit_score))
             with cols[2]:
                 if st.button("Open brief", key=f"open_{cname}_{curl}", use_container_width=True):
+                    if st.session_state.get("prefetcher") is not None:
+                        st.session_state["prefetcher"].focus(curl)
                     st.session_state["selected_company"] = {
                         "company_name": cname,
                         "company_url": curl,
@@ -324,99 +358,58 @@ if st.session_state["view"] == "brief":
     with action_cols[2]:
         st.caption("Research → grounded profile. Brief → suitability score + prototype suggestion + open questions.")
 
+    status = st.container()
     profile_state = (st.session_state.get("profiles_by_name") or {}).get(cname)
     fit_state = (st.session_state.get("fit_by_name") or {}).get(cname)
 
+    st.divider()
+
+    st.subheader("Company profile (grounded in website)")
+    profile_slot = st.empty()
+
+    st.divider()
+
+    st.subheader("Decision-support brief")
+    fit_slot = st.empty()
+
+    # model output streams into the slots; the final state is drawn below
     if run_research:
-        with st.spinner("Fetching pages & building profile…"):
-            try:
-                profile_state = _ensure_profile(cname, curl, use_cache=use_research_cache)
-                st.success("Research complete ✅")
-            except Exception as e:
-                st.error(f"Research failed: {e}")
+        try:
+            profile_state = ensure_profile(
+                cname, curl, use_cache=use_research_cache, slot=profile_slot, render=render_profile_section
+            )
+            status.success("Research complete ✅")
+        except Exception as e:
+            status.error(f"Research failed: {e}")
 
     if run_brief:
         # ensure profile exists
         if not profile_state:
-            with st.spinner("Research first (required)…"):
-                try:
-                    profile_state = _ensure_profile(cname, curl, use_cache=use_research_cache)
-                except Exception as e:
-                    st.error(f"Research failed: {e}")
-                    profile_state = None
+            try:
+                profile_state = ensure_profile(
+                    cname, curl, use_cache=use_research_cache, slot=profile_slot, render=render_profile_section
+                )
+            except Exception as e:
+                status.error(f"Research failed: {e}")
+                profile_state = None
 
         if profile_state:
-            with st.spinner("Scoring decision suitability…"):
-                try:
-                    fit_state = _ensure_fit(
-                        company_name=cname,
-                        profile_raw=str(profile_state.get("profile_raw", "") or ""),
-                        preferences=fit_preferences,
-                        use_cache=use_decision_cache,
-                    )
-                    st.success("Decision brief generated ✅")
-                except Exception as e:
-                    st.error(f"Decision scoring failed: {e}")
-
-    st.divider()
-
-    st.subheader("Company profile (grounded in website)")
-    if profile_state:
-        st.caption("Research cache: " + ("✅ Yes" if profile_state.get("from_cache") else "❌ No"))
-        sources = profile_state.get("sources", []) or []
-        if sources:
-            st.write("**Sources used**")
-            for s in sources[:8]:
-                st.write(f"- {s.get('title','')} — {s.get('url','')}")
-        with st.expander("Raw profile output (debug)", expanded=False):
-            st.text_area("Profile (raw)", value=str(profile_state.get("profile_raw", "") or ""), height=260)
-    else:
-        st.info("No research yet. Click **Run research**.")
+            try:
+                fit_state = ensure_fit(
+                    company_name=cname,
+                    profile_raw=str(profile_state.get("profile_raw", "") or ""),
+                    profile=profile_state.get("profile"),
+                    preferences=fit_preferences,
+                    use_cache=use_decision_cache,
+                    slot=fit_slot,
+                    render=render_fit_section,
+                )
+                status.success("Decision brief generated ✅")
+            except Exception as e:
+                status.error(f"Decision scoring failed: {e}")
 
-    st.divider()
+    with profile_slot.container():
+        render_profile_section(profile_state)
 
-    st.subheader("Decision-support brief")
-    if fit_state:
-        st.caption("Decision cache: " + ("✅ Yes" if fit_state.get("from_cache") else "❌ No"))
-
-        fit = fit_state.get("fit", {}) if isinstance(fit_state, dict) else {}
-        score = fit.get("fit_score") if isinstance(fit, dict) else None
-
-        if isinstance(score, (int, float)):
-            st.metric("Decision suitability score", int(score))
-        else:
-            st.metric("Decision suitability score", "—")
-
-        decision_summary = fit.get("decision_summary", "")
-        recommended = fit.get("recommended_use_case", "")
-        why_good = fit.get("why_good_fit", [])
-        why_not = fit.get("why_not", [])
-        next_q = fit.get("next_questions", [])
-
-        if decision_summary:
-            st.write("**Decision summary**")
-            st.write(decision_summary)
-
-        if recommended:
-            st.write("**Suggested prototype**")
-            st.info(recommended)
-
-        if why_good:
-            st.write("**Why this could work**")
-            for x in (why_good if isinstance(why_good, list) else [why_good])[:7]:
-                st.write(f"- {x}")
-
-        if why_not:
-            st.write("**Risks / concerns**")
-            for x in (why_not if isinstance(why_not, list) else [why_not])[:7]:
-                st.write(f"- {x}")
-
-        if next_q:
-            st.write("**Open questions**")
-            for x in (next_q if isinstance(next_q, list) else [next_q])[:7]:
-                st.write(f"- {x}")
-
-        with st.expander("Raw decision JSON (debug)", expanded=False):
-            st.text_area("Decision output (raw)", value=str(fit_state.get("fit_raw", "") or ""), height=260)
-    else:
-        st.info("No decision brief yet. Click **Generate brief**.")
+    with fit_slot.container():
+        render_fit_section(fit_state)
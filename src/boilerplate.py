@@ -0,0 +1,112 @@
+# src/boilerplate.py
+"""
+Site-level boilerplate removal.
+
+Pages of one site repeat the same nav / cookie banner / footer. Page text is
+already whitespace-collapsed (no block structure left), so repeats are found
+with word shingles: every window of SHINGLE_WORDS words that occurs on at
+least `min_pages` pages is boilerplate, and runs of covered words of at least
+MIN_RUN_WORDS are cut. The first page a block appears on keeps its copy, so the
+model still sees the nav once (it often lists products / sections) and content
+shared by e.g. /products and /solutions is deduplicated, not lost.
+"""
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Any
+
+from .tokens import estimate_tokens
+from .web import FetchedPage
+
+
+SHINGLE_WORDS = 8
+# shorter repeated runs are usually real content (product names, taglines) -> keep
+MIN_RUN_WORDS = 12
+
+
+def _shingles(words: list[str], k: int) -> list[int]:
+    return [hash(tuple(words[i : i + k])) for i in range(0, max(0, len(words) - k + 1))]
+
+
+def _covered_positions(words: list[str], repeated: set[int], k: int) -> list[bool]:
+    covered = [False] * len(words)
+    for i, h in enumerate(_shingles(words, k)):
+        if h in repeated:
+            for j in range(i, i + k):
+                covered[j] = True
+    return covered
+
+
+def _drop_runs(words: list[str], covered: list[bool], min_run: int) -> list[str]:
+    out: list[str] = []
+    i = 0
+    n = len(words)
+    while i < n:
+        if not covered[i]:
+            out.append(words[i])
+            i += 1
+            continue
+        j = i
+        while j < n and covered[j]:
+            j += 1
+        if j - i < min_run:
+            out.extend(words[i:j])
+        i = j
+    return out
+
+
+def strip_site_boilerplate(
+    pages: list[FetchedPage],
+    min_pages: int = 2,
+    keep_first: bool = True,
+) -> tuple[list[FetchedPage], dict[str, Any]]:
+    """
+    Remove text blocks repeated across the pages of ONE company.
+    keep_first=False removes repeated blocks from every page, including the first one.
+    Returns (cleaned pages, stats). Pages are copied; inputs are not modified.
+    """
+    chars_before = sum(len(p.text or "") for p in pages)
+    stats: dict[str, Any] = {
+        "pages": len(pages),
+        "chars_before": chars_before,
+        "chars_after": chars_before,
+        "chars_saved": 0,
+        "tokens_saved_est": 0,
+    }
+    if len(pages) < max(2, min_pages):
+        return list(pages), stats
+
+    k = SHINGLE_WORDS
+    words_by_page = [(p.text or "").split() for p in pages]
+
+    df: dict[int, int] = {}
+    for words in words_by_page:
+        for h in set(_shingles(words, k)):
+            df[h] = df.get(h, 0) + 1
+    repeated = {h for h, n in df.items() if n >= min_pages}
+    if not repeated:
+        return list(pages), stats
+
+    # repeated shingles some earlier page already kept; only those are cut, so every repeated
+    # block survives once (on the first page it appears on), not just the blocks of page 0
+    emitted: set[int] = set() if keep_first else repeated
+    cleaned: list[FetchedPage] = []
+    for p, words in zip(pages, words_by_page):
+        covered = _covered_positions(words, emitted, k)
+        kept = _drop_runs(words, covered, MIN_RUN_WORDS)
+        if keep_first:
+            emitted |= repeated.intersection(_shingles(kept, k))
+        cleaned.append(replace(p, text=" ".join(kept)) if len(kept) != len(words) else p)
+
+    chars_after = sum(len(p.text or "") for p in cleaned)
+    saved_text_tokens = sum(estimate_tokens(p.text or "") for p in pages) - sum(
+        estimate_tokens(p.text or "") for p in cleaned
+    )
+    stats.update(
+        {
+            "chars_after": chars_after,
+            "chars_saved": chars_before - chars_after,
+            "tokens_saved_est": max(0, saved_text_tokens),
+        }
+    )
+    return cleaned, stats
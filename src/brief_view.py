@@ -0,0 +1,223 @@
+# src/brief_view.py
+"""
+Streamlit helpers for the company brief view, shared by app.py, pages/99_Admin.py and demo.py.
+
+- ensure_profile / ensure_fit: research + decision brief with per-session caches
+  (st.session_state["profiles_by_name"] / ["fit_by_name"]); with a slot (st.empty) the model
+  output streams into it, after a spinner for the page fetch / prompt building before it
+- render_profile_section / render_fit_section: the plain renderers of app.py and the admin page
+  (demo.py brings its own)
+- batch_briefs: research + score many companies concurrently into the same caches
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Optional
+
+import streamlit as st
+
+from .fit import iter_score_company_fit, score_company_fit, score_company_fits
+from .research import build_company_profile, build_company_profiles, iter_build_company_profile
+
+
+def _stream_into(slot, states: Iterable[dict], render: Callable[[dict], Any], waiting: str) -> Optional[dict]:
+    """
+    Drain a streaming generator into `slot`: a spinner with `waiting` until its first item
+    (pages are fetched before the model starts), then render(partial state) per update.
+    Returns the final item.
+    """
+    it = iter(states)
+    with slot.container(), st.spinner(waiting):
+        state = next(it, None)
+    while state is not None and state.get("partial"):
+        with slot.container():
+            render(state)
+        state = next(it, None)
+    return state
+
+
+def ensure_profile(
+    company_name: str,
+    company_url: str,
+    use_cache: bool,
+    slot=None,
+    render=None,
+    waiting: str = "Fetching website pages…",
+) -> dict:
+    """
+    With a slot (st.empty) the model output is streamed: render(partial state) redraws the
+    slot as profile fields complete.
+    """
+    profiles = st.session_state.setdefault("profiles_by_name", {})
+    if company_name in profiles:
+        return profiles[company_name]
+    if slot is None:
+        profile = build_company_profile(company_name, company_url, use_cache=use_cache)
+    else:
+        profile = _stream_into(
+            slot, iter_build_company_profile(company_name, company_url, use_cache=use_cache), render, waiting
+        )
+    profiles[company_name] = profile
+    return profile
+
+
+def ensure_fit(
+    company_name: str,
+    profile_raw: str,
+    preferences: dict,
+    use_cache: bool,
+    profile: dict | None = None,
+    slot=None,
+    render=None,
+    waiting: str = "Preparing decision brief…",
+) -> dict:
+    """
+    Same streaming contract as ensure_profile.
+    """
+    fits = st.session_state.setdefault("fit_by_name", {})
+    if company_name in fits:
+        return fits[company_name]
+    if slot is None:
+        fit_state = score_company_fit(
+            company_name=company_name,
+            profile_raw=profile_raw,
+            preferences=preferences,
+            use_cache=use_cache,
+            profile=profile,
+        )
+    else:
+        fit_state = _stream_into(
+            slot,
+            iter_score_company_fit(
+                company_name=company_name,
+                profile_raw=profile_raw,
+                preferences=preferences,
+                use_cache=use_cache,
+                profile=profile,
+            ),
+            render,
+            waiting,
+        )
+    fits[company_name] = fit_state
+    return fit_state
+
+
+def render_profile_section(profile_state: dict | None):
+    if not profile_state:
+        st.info("No research yet. Click **Run research**.")
+        return
+    if profile_state.get("partial"):
+        # streaming: show the fields parsed so far
+        st.caption("Research: generating…")
+        st.json(profile_state.get("profile") or {})
+        return
+    st.caption("Research cache: " + ("✅ Yes" if profile_state.get("from_cache") else "❌ No"))
+    sources = profile_state.get("sources", []) or []
+    if sources:
+        st.write("**Sources used**")
+        for s in sources[:8]:
+            st.write(f"- {s.get('title','')} — {s.get('url','')}")
+    with st.expander("Raw profile output (debug)", expanded=False):
+        st.text_area("Profile (raw)", value=str(profile_state.get("profile_raw", "") or ""), height=260)
+
+
+def render_fit_section(fit_state: dict | None):
+    if not fit_state:
+        st.info("No decision brief yet. Click **Generate brief**.")
+        return
+    partial = bool(fit_state.get("partial"))
+    if partial:
+        st.caption("Decision brief: generating…")
+    else:
+        st.caption("Decision cache: " + ("✅ Yes" if fit_state.get("from_cache") else "❌ No"))
+
+    fit = fit_state.get("fit", {}) if isinstance(fit_state, dict) else {}
+    score = fit.get("fit_score") if isinstance(fit, dict) else None
+
+    if isinstance(score, (int, float)):
+        st.metric("Decision suitability score", int(score))
+    else:
+        st.metric("Decision suitability score", "—")
+
+    decision_summary = fit.get("decision_summary", "")
+    recommended = fit.get("recommended_use_case", "")
+    why_good = fit.get("why_good_fit", [])
+    why_not = fit.get("why_not", [])
+    next_q = fit.get("next_questions", [])
+
+    if decision_summary:
+        st.write("**Decision summary**")
+        st.write(decision_summary)
+
+    if recommended:
+        st.write("**Suggested prototype**")
+        st.info(recommended)
+
+    if why_good:
+        st.write("**Why this could work**")
+        for x in (why_good if isinstance(why_good, list) else [why_good])[:7]:
+            st.write(f"- {x}")
+
+    if why_not:
+        st.write("**Risks / concerns**")
+        for x in (why_not if isinstance(why_not, list) else [why_not])[:7]:
+            st.write(f"- {x}")
+
+    if next_q:
+        st.write("**Open questions**")
+        for x in (next_q if isinstance(next_q, list) else [next_q])[:7]:
+            st.write(f"- {x}")
+
+    if not partial:
+        with st.expander("Raw decision JSON (debug)", expanded=False):
+            st.text_area("Decision output (raw)", value=str(fit_state.get("fit_raw", "") or ""), height=260)
+
+
+
+def batch_briefs(rows: list[dict], preferences: dict, use_research_cache: bool, use_decision_cache: bool) -> int:
+    """
+    Research + score many companies at once (LLM calls run concurrently, see src/llm.py).
+    Fills the same session caches as ensure_profile / ensure_fit. Returns the number of failures.
+    """
+    profiles = st.session_state.setdefault("profiles_by_name", {})
+    fits = st.session_state.setdefault("fit_by_name", {})
+    failed = 0
+
+    todo = [r for r in rows if r["company_name"] not in profiles]
+    if todo:
+        bar = st.progress(0.0, text=f"Research 0/{len(todo)}")
+        done = [0]
+
+        def _tick(i, res):
+            done[0] += 1
+            bar.progress(done[0] / len(todo), text=f"Research {done[0]}/{len(todo)}")
+
+        for r, res in zip(todo, build_company_profiles(todo, use_cache=use_research_cache, on_result=_tick)):
+            if isinstance(res, Exception):
+                failed += 1
+            else:
+                profiles[r["company_name"]] = res
+
+    todo = [
+        {
+            "company_name": r["company_name"],
+            "profile_raw": str(profiles[r["company_name"]].get("profile_raw", "") or ""),
+            "profile": profiles[r["company_name"]].get("profile"),
+        }
+        for r in rows
+        if r["company_name"] in profiles and r["company_name"] not in fits
+    ]
+    if todo:
+        bar = st.progress(0.0, text=f"Scoring 0/{len(todo)}")
+        done = [0]
+
+        def _tick(i, res):
+            done[0] += 1
+            bar.progress(done[0] / len(todo), text=f"Scoring {done[0]}/{len(todo)}")
+
+        results = score_company_fits(todo, preferences=preferences, use_cache=use_decision_cache, on_result=_tick)
+        for r, res in zip(todo, results):
+            if isinstance(res, Exception):
+                failed += 1
+            else:
+                fits[r["company_name"]] = res
+    return failed
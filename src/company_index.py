@@ -0,0 +1,291 @@
+# src/company_index.py
+"""
+Local BM25 index over researched companies (cache/profiles), for instant discovery.
+
+- one document per company site: profile fields (summary, what_they_sell, likely_users, ...)
+  plus the text of the fetched pages; profile fields weigh more than page text (BM25F-style)
+- updated incrementally by research.build_company_profile; bootstrapped from cache/profiles
+  the first time the index is opened
+- persisted as term frequencies per document (cache/index/companies.json); postings are
+  rebuilt in memory on load
+"""
+from __future__ import annotations
+
+import glob
+import json
+import math
+import os
+import re
+import threading
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+from .crawl import site_key
+from .schemas import parsed_profile
+
+
+INDEX_PATH = os.path.join("cache", "index", "companies.json")
+PROFILES_DIR = os.path.join("cache", "profiles")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# term weight per field
+FIELD_WEIGHTS = {
+    "name": 3,
+    "company_summary": 3,
+    "what_they_sell": 3,
+    "likely_users": 2,
+    "page_title": 2,
+    "page_text": 1,
+}
+# page text is long and repetitive; the head of each page carries the signal
+MAX_PAGE_TOKENS = 2000
+
+_FOLD = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = {
+    "the", "and", "for", "with", "our", "you", "your", "are", "from", "that", "this", "all",
+    "der", "die", "das", "und", "mit", "für", "fuer", "von", "den", "des", "ein", "eine", "wir",
+    "sie", "ist", "im", "in", "zu", "auf", "bei", "unklar", "company", "gmbh",
+}
+
+# country filter: TLD + names a country goes by
+COUNTRY_ALIASES = {
+    "de": {"germany", "deutschland", "german", "deutsch"},
+    "at": {"austria", "oesterreich", "austrian"},
+    "ch": {"switzerland", "schweiz", "swiss"},
+    "nl": {"netherlands", "niederlande", "dutch"},
+    "fr": {"france", "frankreich", "french"},
+    "uk": {"uk", "united kingdom", "england", "britain", "british"},
+    "us": {"usa", "united states", "us", "america"},
+}
+
+
+def tokenize(text: str) -> list[str]:
+    t = (text or "").lower().translate(_FOLD)
+    return [w for w in _TOKEN_RE.findall(t) if len(w) > 1 and w not in _STOPWORDS and not w.isdigit()]
+
+
+def _as_text(v: Any) -> str:
+    if isinstance(v, list):
+        return " ".join(str(x) for x in v)
+    return str(v or "")
+
+
+def _company_url(profile: dict[str, Any]) -> str:
+    url = profile.get("company_url") or ""
+    if not url:
+        # profiles written before company_url was stored: root of the first fetched page
+        first = (profile.get("sources") or profile.get("pages") or [{}])[0]
+        u = urlparse(str(first.get("url") or ""))
+        if u.scheme and u.netloc:
+            url = f"{u.scheme}://{u.netloc}/"
+    return url
+
+
+def _country_codes(query: str) -> set[str]:
+    q = " ".join(tokenize(query)) or (query or "").strip().lower()
+    if not q:
+        return set()
+    codes = {code for code, names in COUNTRY_ALIASES.items() if q == code or q in names}
+    return codes or {q}
+
+
+class CompanyIndex:
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        # doc_id -> {"company_name", "company_url", "snippet", "length", "tf": {term: weighted tf}}
+        self.docs: dict[str, dict[str, Any]] = {}
+        self._postings: dict[str, dict[str, float]] = {}
+        self._total_len = 0.0
+        self._load()
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            data = json.loads(open(self.path, "r", encoding="utf-8").read())
+        except Exception:
+            return
+        for doc_id, doc in (data.get("docs") or {}).items():
+            self._insert(doc_id, doc)
+
+    def save(self) -> None:
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.tmp{os.getpid()}"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"docs": self.docs}, ensure_ascii=False))
+            os.replace(tmp, self.path)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+    def _insert(self, doc_id: str, doc: dict[str, Any]) -> None:
+        self.docs[doc_id] = doc
+        self._total_len += float(doc.get("length") or 0)
+        for term, tf in (doc.get("tf") or {}).items():
+            self._postings.setdefault(term, {})[doc_id] = float(tf)
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            doc = self.docs.pop(doc_id, None)
+            if not doc:
+                return
+            self._total_len -= float(doc.get("length") or 0)
+            for term in doc.get("tf") or {}:
+                p = self._postings.get(term)
+                if p is not None:
+                    p.pop(doc_id, None)
+                    if not p:
+                        del self._postings[term]
+
+    def add_profile(self, profile: dict[str, Any], save: bool = True) -> Optional[str]:
+        """
+        Index (or re-index) one profile as returned by research.build_company_profile.
+        Returns the document id (site key) or None if the profile has no usable URL.
+        """
+        url = _company_url(profile)
+        doc_id = site_key(url) if url else ""
+        if not doc_id:
+            return None
+
+        parsed = parsed_profile(profile)
+
+        fields: list[tuple[str, str]] = [("name", str(profile.get("company_name") or ""))]
+        for f in ("company_summary", "what_they_sell", "likely_users"):
+            fields.append((f, _as_text(parsed.get(f))))
+        for p in profile.get("pages") or []:
+            fields.append(("page_title", str(p.get("title") or "")))
+            fields.append(("page_text", " ".join(tokenize(str(p.get("text") or ""))[:MAX_PAGE_TOKENS])))
+
+        tf: dict[str, float] = {}
+        length = 0.0
+        for field_name, text in fields:
+            w = FIELD_WEIGHTS[field_name]
+            for term in tokenize(text):
+                tf[term] = tf.get(term, 0.0) + w
+                length += w
+
+        tld = doc_id.rsplit(".", 1)[-1]
+        doc = {
+            "company_name": profile.get("company_name") or doc_id,
+            "company_url": url,
+            "snippet": _as_text(parsed.get("company_summary"))[:300],
+            "tld": tld,
+            "length": length,
+            "tf": tf,
+        }
+        with self._lock:
+            self.remove(doc_id)
+            self._insert(doc_id, doc)
+            if save:
+                self.save()
+        return doc_id
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def _matches_country(self, doc_id: str, codes: set[str]) -> bool:
+        doc = self.docs[doc_id]
+        if doc.get("tld") in codes:
+            return True
+        tf = doc.get("tf") or {}
+        for code in codes:
+            for name in COUNTRY_ALIASES.get(code, {code}):
+                if all(t in tf for t in tokenize(name) or [name]):
+                    return True
+        return False
+
+    def search(
+        self,
+        query: str,
+        max_results: int = 10,
+        country: str = "",
+        required: str = "",
+    ) -> list[dict[str, Any]]:
+        """
+        BM25 over all indexed companies.
+        country: hard filter (TLD or the country named in the company's text)
+        required: at least one of these words must occur (e.g. the industry)
+        Returns [{company_name, company_url, snippet, score, source}] best first.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        required_terms = set(tokenize(required))
+        codes = _country_codes(country)
+
+        with self._lock:
+            n = len(self.docs)
+            if n == 0:
+                return []
+            avg_len = self._total_len / n if n else 1.0
+            scores: dict[str, float] = {}
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1.0 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    dl = float(self.docs[doc_id].get("length") or 0)
+                    denom = tf + BM25_K1 * (1 - BM25_B + BM25_B * dl / (avg_len or 1.0))
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / denom
+
+            ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+            out: list[dict[str, Any]] = []
+            for doc_id, score in ranked:
+                doc = self.docs[doc_id]
+                if required_terms and not any(t in doc["tf"] for t in required_terms):
+                    continue
+                if codes and not self._matches_country(doc_id, codes):
+                    continue
+                out.append({
+                    "company_name": doc["company_name"],
+                    "company_url": doc["company_url"],
+                    "snippet": doc["snippet"],
+                    "score": round(score, 3),
+                    "source": "local_index",
+                })
+                if len(out) >= max_results:
+                    break
+            return out
+
+
+def rebuild_from_profiles(index: CompanyIndex, profiles_dir: str = PROFILES_DIR) -> int:
+    """
+    (Re)index every cached profile. Returns the number of indexed companies.
+    """
+    for p in sorted(glob.glob(os.path.join(profiles_dir, "*.json"))):
+        try:
+            profile = json.loads(open(p, "r", encoding="utf-8").read())
+        except Exception:
+            continue
+        if isinstance(profile, dict):
+            index.add_profile(profile, save=False)
+    index.save()
+    return len(index)
+
+
+_index: Optional[CompanyIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_company_index() -> CompanyIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                idx = CompanyIndex()
+                if not os.path.exists(idx.path) and os.path.isdir(PROFILES_DIR):
+                    rebuild_from_profiles(idx)
+                _index = idx
+    return _index
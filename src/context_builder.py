@@ -0,0 +1,245 @@
+# src/context_builder.py
+"""
+Token-budgeted prompt context for summarize_company.
+
+Page text is split into passages of ~PASSAGE_TOKENS (sentence-aligned), each passage is scored
+against the fields of the profile schema (offerings, users, leadership, company facts, digital
+touchpoints) with keyword matchers, and the best passages are packed into `token_budget`:
+
+1. coverage: the best passage for every field first (so one verbose product page can't crowd
+   out the "who uses it" evidence)
+2. then the rest by score until the budget is full (passages that don't fit are skipped,
+   smaller ones may still fit)
+
+Selected passages are emitted per page in document order, under the page's URL/TITLE header,
+so the model can still cite sources. Sites that fit the budget are sent entirely; when the site
+has to be cut, cookie / privacy / legal passages without profile facts score negative and are
+never packed.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from .keywords import KeywordMatcher
+from .tokens import estimate_tokens
+from .web import FetchedPage
+
+
+CONTEXT_TOKEN_BUDGET = 5000
+PASSAGE_TOKENS = 120
+# the opening passage of a page usually says what the company does
+LEAD_BONUS = 2.0
+# field hits beyond this count add nothing (long keyword-stuffed passages)
+MAX_FIELD_HITS = 3
+
+FIELD_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "offerings": (
+        "produkt", "product", "lösung", "loesung", "solution", "leistung", "service", "angebot",
+        "we offer", "wir bieten", "portfolio", "plattform", "platform", "software", "hersteller",
+        "manufactur", "entwickel", "develop", "funktion", "feature", "modul", "anbieter", "provider",
+    ),
+    "users": (
+        "kunde", "customer", "client", "zielgruppe", "anwender", "nutzer", "user", "branche",
+        "industries", "referenz", "case stud", "erfolgsgeschichte", "für unternehmen",
+        "for companies", "for teams", "mittelstand", "enterprise", "b2b", "partner",
+    ),
+    "leadership": (
+        "geschäftsführ", "geschaeftsfuehr", "ceo", "cto", "coo", "founder", "gründer", "gruender",
+        "vorstand", "managing director", "inhaber", "leitung", "management", "head of",
+    ),
+    "company": (
+        "gegründet", "gegruendet", "founded", "mitarbeiter", "employees", "standort", "location",
+        "headquarter", "hauptsitz", "niederlassung", "seit", "since", "umsatz", "revenue",
+        "familienunternehmen", "unternehmensgruppe", "tochter", "subsidiary",
+    ),
+    "digital": (
+        "portal", "login", "app", "online", "digital", "dashboard", "konfigurator", "configurator",
+        "shop", "self-service", "kundenportal", "schnittstelle", "api", "plattform", "platform",
+    ),
+}
+FIELD_WEIGHTS = {"offerings": 3.0, "users": 2.0, "leadership": 1.5, "company": 1.0, "digital": 1.0}
+
+NOISE_KEYWORDS = (
+    "cookie", "datenschutz", "privacy", "einwilligung", "consent", "newsletter", "agb",
+    "terms of", "alle rechte", "all rights reserved", "javascript", "haftung", "disclaimer",
+)
+
+# keywords up to SHORT_KEYWORD_LEN chars ("app", "ceo", "seit") only count as whole words,
+# longer ones as substrings (German compounds: "Kundenportal", "Softwarelösungen")
+SHORT_KEYWORD_LEN = 4
+
+
+def _field_matchers(kws: tuple[str, ...]) -> tuple[KeywordMatcher, KeywordMatcher]:
+    return (
+        KeywordMatcher([k for k in kws if len(k) > SHORT_KEYWORD_LEN]),
+        KeywordMatcher([k for k in kws if len(k) <= SHORT_KEYWORD_LEN], word_boundary=True),
+    )
+
+
+_FIELD_MATCHERS = {f: _field_matchers(kws) for f, kws in FIELD_KEYWORDS.items()}
+_NOISE_MATCHERS = _field_matchers(NOISE_KEYWORDS)
+_SENTENCE_RE = re.compile(r"[^.!?]+(?:[.!?]+|$)")
+
+
+@dataclass
+class Passage:
+    page: int  # index into the pages list
+    start: int  # char offsets into the page text
+    end: int
+    text: str
+    tokens: int
+    score: float = 0.0
+    fields: list[str] = field(default_factory=list)
+
+
+def split_passages(text: str, page: int = 0, target_tokens: int = PASSAGE_TOKENS) -> list[Passage]:
+    """
+    Sentence-aligned chunks of about `target_tokens`; over-long sentences are cut at word boundaries.
+    """
+    max_chars = int(target_tokens * 4)
+    out: list[Passage] = []
+    start = end = None
+    for m in _SENTENCE_RE.finditer(text or ""):
+        s, e = m.start(), m.end()
+        while e - s > max_chars:
+            # one huge "sentence" (lists, tables flattened to text): cut at the last space
+            cut = text.rfind(" ", s, s + max_chars)
+            cut = cut if cut > s else s + max_chars
+            if start is not None:
+                out.append(_passage(text, page, start, end))
+                start = None
+            out.append(_passage(text, page, s, cut))
+            s = cut
+        if start is not None and e - start > max_chars:
+            out.append(_passage(text, page, start, end))
+            start = None
+        if start is None:
+            start = s
+        end = e
+    if start is not None:
+        out.append(_passage(text, page, start, end))
+    return [p for p in out if p.text]
+
+
+def _passage(text: str, page: int, start: int, end: int) -> Passage:
+    # offsets cover exactly the stripped text, so page_text[start:end] == passage.text
+    raw = text[start:end]
+    t = raw.strip()
+    start += len(raw) - len(raw.lstrip())
+    return Passage(page=page, start=start, end=start + len(t), text=t, tokens=estimate_tokens(t))
+
+
+def score_passage(p: Passage, company_name: str = "") -> None:
+    t = p.text.lower()
+    score = 0.0
+    fields: list[str] = []
+    for f, (substrings, words) in _FIELD_MATCHERS.items():
+        hits = len(substrings.hit_set(t)) + len(words.hit_set(t))
+        if hits:
+            fields.append(f)
+            score += FIELD_WEIGHTS[f] * min(hits, MAX_FIELD_HITS)
+    if company_name and company_name.lower() in t:
+        score += 1.0
+    if p.start == 0:
+        score += LEAD_BONUS
+    noise = sum(len(m.hit_set(t)) for m in _NOISE_MATCHERS)
+    if noise:
+        # pure cookie / legal text is dropped; a passage that also carries profile facts
+        # (e.g. the Geschäftsführer line in an Impressum) is only ranked down
+        score = score - noise if fields else -float(noise)
+    p.score = score
+    p.fields = fields
+
+
+def _page_header(page: FetchedPage) -> str:
+    return f"URL: {page.url}\nTITLE: {page.title}\nTEXT: "
+
+
+def build_context(
+    company_name: str,
+    pages: list[FetchedPage],
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Returns (prompt context, stats). stats["passages"] lists every packed passage
+    ({url, start, end, score, fields}) and stats["sources"] the pages that contributed.
+    """
+    passages: list[Passage] = []
+    for i, page in enumerate(pages):
+        passages.extend(split_passages(page.text or "", page=i))
+    seen: set[str] = set()
+    unique: list[Passage] = []
+    for p in passages:
+        key = " ".join(p.text.lower().split())
+        if key in seen:
+            continue
+        seen.add(key)
+        score_passage(p, company_name)
+        unique.append(p)
+
+    header_tokens = [estimate_tokens(_page_header(pg)) for pg in pages]
+    tokens_before = sum(header_tokens) + sum(p.tokens for p in unique)
+
+    chosen: set[int] = set()
+    pages_used: set[int] = set()
+    used = 0
+
+    def take(idx: int) -> bool:
+        nonlocal used
+        p = unique[idx]
+        cost = p.tokens + (0 if p.page in pages_used else header_tokens[p.page])
+        if used + cost > token_budget:
+            return False
+        chosen.add(idx)
+        pages_used.add(p.page)
+        used += cost
+        return True
+
+    ranked = sorted(range(len(unique)), key=lambda i: (-unique[i].score, unique[i].page, unique[i].start))
+    if tokens_before <= token_budget:
+        # everything fits: pass the site through untouched, noise included
+        for i in range(len(unique)):
+            take(i)
+    else:
+        for f in FIELD_KEYWORDS:
+            best = next((i for i in ranked if f in unique[i].fields and unique[i].score > 0), None)
+            if best is not None and best not in chosen:
+                take(best)
+        for i in ranked:
+            if unique[i].score < 0:
+                break
+            if i not in chosen:
+                take(i)
+
+    blocks: list[str] = []
+    used_passages: list[dict[str, Any]] = []
+    for page_idx, page in enumerate(pages):
+        sel = sorted((unique[i] for i in chosen if unique[i].page == page_idx), key=lambda p: p.start)
+        if not sel:
+            continue
+        parts: list[str] = []
+        prev_end = 0
+        for p in sel:
+            # mark gaps so the model doesn't read two distant passages as one statement
+            if parts and (page.text or "")[prev_end : p.start].strip():
+                parts.append("[…]")
+            parts.append(p.text)
+            prev_end = p.end
+            used_passages.append(
+                {"url": page.url, "start": p.start, "end": p.end, "score": round(p.score, 2), "fields": p.fields}
+            )
+        blocks.append(_page_header(page) + " ".join(parts))
+
+    context = "\n\n".join(blocks)
+    stats = {
+        "token_budget": token_budget,
+        "tokens_before": tokens_before,
+        "tokens_used": estimate_tokens(context),
+        "passages_total": len(unique),
+        "passages_used": len(used_passages),
+        "passages": used_passages,
+        "sources": [{"url": pages[i].url, "title": pages[i].title} for i in sorted(pages_used)],
+    }
+    return context, stats
@@ -0,0 +1,423 @@
+# src/crawl.py
+"""
+Crawl frontier for company sites.
+
+- link scoring (score_path) shared with web.pick_internal_links
+- CrawlFrontier: depth-limited priority queue of same-site URLs, deduped on canonical URL
+- CrawlBudget: per-domain (and optional global) page + byte budgets, thread-safe,
+  can be shared across companies / calls
+- sitemap.xml discovery
+"""
+from __future__ import annotations
+
+import heapq
+import html
+import itertools
+import re
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+from .keywords import KeywordMatcher
+
+
+# ----------------------------
+# Link scoring
+# ----------------------------
+DEFAULT_LINK_KEYWORDS = [
+    # English
+    "about",
+    "company",
+    "team",
+    "leadership",
+    "management",
+    "imprint",
+    "contact",
+    "careers",
+    "jobs",
+    # German
+    "ueber-uns",
+    "über-uns",
+    "uber-uns",
+    "unternehmen",
+    "team",
+    "menschen",
+    "leitung",
+    "führung",
+    "geschaeftsfuehrung",
+    "geschäftsführung",
+    "impressum",
+    "kontakt",
+    "karriere",
+    "stellen",
+    "jobs",
+]
+
+DEFAULT_BLOCK_KEYWORDS = [
+    "blog",
+    "changelog",
+    "docs",
+    "documentation",
+    "help",
+    "press",
+    "news",
+    "events",
+    "community",
+    "privacy",
+    "terms",
+    "status",
+    "legal",
+    "security",
+    "cookie",
+    # common noisy sections
+    "customers",
+    "case-studies",
+    "case-studies",
+    "partners",
+]
+
+PATH_BOOSTS = [
+    ("leadership", 60),
+    ("team", 55),
+    ("management", 55),
+    ("about", 50),
+    ("company", 45),
+    ("ueber-uns", 50),
+    ("über-uns", 50),
+    ("impressum", 45),
+    ("imprint", 45),
+    ("kontakt", 40),
+    ("contact", 40),
+    ("geschaeftsfuehrung", 55),
+    ("geschäftsführung", 55),
+    ("karriere", 10),
+    ("careers", 10),
+    ("jobs", 10),
+]
+
+SKIP_EXTENSIONS = (".pdf", ".zip", ".png", ".jpg", ".jpeg", ".svg", ".webp")
+
+# priority lost per extra click from the homepage
+DEPTH_PENALTY = 15
+
+
+@lru_cache(maxsize=64)
+def _path_matcher(keywords: tuple[str, ...], block_keywords: tuple[str, ...]) -> KeywordMatcher:
+    """
+    One weighted matcher for boosts (+w), keywords (+5 each) and block keywords (-80 each).
+    """
+    return KeywordMatcher(
+        list(PATH_BOOSTS) + [(k, 5) for k in keywords] + [(k, -80) for k in block_keywords]
+    )
+
+
+_DEFAULT_PATH_MATCHER = _path_matcher(tuple(DEFAULT_LINK_KEYWORDS), tuple(DEFAULT_BLOCK_KEYWORDS))
+
+
+def score_path(
+    path: str,
+    keywords: Optional[list[str]] = None,
+    block_keywords: Optional[list[str]] = None,
+) -> int:
+    if keywords is None and block_keywords is None:
+        m = _DEFAULT_PATH_MATCHER
+    else:
+        m = _path_matcher(
+            tuple(DEFAULT_LINK_KEYWORDS if keywords is None else keywords),
+            tuple(DEFAULT_BLOCK_KEYWORDS if block_keywords is None else block_keywords),
+        )
+    return m.score(path)
+
+
+def _site(netloc: str) -> str:
+    netloc = (netloc or "").lower()
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
+
+def site_key(url: str) -> str:
+    """
+    Domain used for budgets / same-site checks (www. stripped).
+    """
+    return _site(urlparse(url).netloc)
+
+
+def canonical_url(url: str) -> str:
+    """
+    Dedup key: lowercase host without www., no fragment, no trailing slash,
+    tracking params dropped, remaining query params sorted.
+    """
+    u = urlparse(url)
+    path = u.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = [
+        (k, v)
+        for k, v in parse_qsl(u.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in {"gclid", "fbclid", "ref"}
+    ]
+    return urlunparse(("", _site(u.netloc), path, "", urlencode(sorted(query)), ""))
+
+
+def link_candidates(
+    base_url: str,
+    hrefs: list[str],
+    keywords: Optional[list[str]] = None,
+    block_keywords: Optional[list[str]] = None,
+    same_site_only: bool = False,
+) -> list[tuple[int, str]]:
+    """
+    Resolve + filter + score hrefs. Returns [(score, absolute url)] with score > 0, best first.
+    same_site_only=False keeps the historic exact-netloc check (www.x.com != x.com).
+    """
+    base_netloc = urlparse(base_url).netloc.lower()
+    candidates: list[tuple[int, str]] = []
+    for href in hrefs:
+        if not href or href.startswith("#") or href.startswith("mailto:") or href.startswith("tel:"):
+            continue
+        full = urljoin(base_url, href)
+        parsed = urlparse(full)
+        if parsed.scheme not in {"http", "https"}:
+            continue
+        netloc = parsed.netloc.lower()
+        if same_site_only:
+            if _site(netloc) != _site(base_netloc):
+                continue
+        elif netloc != base_netloc:
+            continue
+        path = (parsed.path or "").lower()
+        if not path or path == "/":
+            continue
+        if any(path.endswith(ext) for ext in SKIP_EXTENSIONS):
+            continue
+
+        s = score_path(path, keywords, block_keywords)
+        if s <= 0:
+            continue
+        candidates.append((s, full))
+
+    candidates.sort(key=lambda x: x[0], reverse=True)
+    return candidates
+
+
+# ----------------------------
+# Budget
+# ----------------------------
+@dataclass
+class CrawlBudget:
+    """
+    Page + byte budgets per domain (and optionally overall).
+    Share one instance across fetch_pages_for_company calls to cap a whole batch.
+    """
+
+    max_pages_per_domain: int = 5
+    max_bytes_per_domain: int = 6_000_000
+    max_total_pages: Optional[int] = None
+    max_total_bytes: Optional[int] = None
+
+    _pages: dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _bytes: dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _total_pages: int = field(default=0, init=False, repr=False)
+    _total_bytes: int = field(default=0, init=False, repr=False)
+    _closed: bool = field(default=False, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def close(self) -> None:
+        """
+        Refuse all further reservations (cancels crawls sharing this budget at their next page).
+        """
+        with self._lock:
+            self._closed = True
+
+    def reserve(self, domain: str) -> bool:
+        """
+        Claim one page slot for `domain`. False if any budget is used up.
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            if self._pages.get(domain, 0) >= self.max_pages_per_domain:
+                return False
+            if self._bytes.get(domain, 0) >= self.max_bytes_per_domain:
+                return False
+            if self.max_total_pages is not None and self._total_pages >= self.max_total_pages:
+                return False
+            if self.max_total_bytes is not None and self._total_bytes >= self.max_total_bytes:
+                return False
+            self._pages[domain] = self._pages.get(domain, 0) + 1
+            self._total_pages += 1
+            return True
+
+    def release(self, domain: str) -> None:
+        """
+        Give a reserved page slot back (fetch failed or page was a duplicate).
+        """
+        with self._lock:
+            if self._pages.get(domain, 0) > 0:
+                self._pages[domain] -= 1
+                self._total_pages = max(0, self._total_pages - 1)
+
+    def record_bytes(self, domain: str, n: int) -> None:
+        with self._lock:
+            self._bytes[domain] = self._bytes.get(domain, 0) + int(n)
+            self._total_bytes += int(n)
+
+    def usage(self, domain: Optional[str] = None) -> dict[str, int]:
+        with self._lock:
+            if domain is None:
+                return {"pages": self._total_pages, "bytes": self._total_bytes}
+            return {"pages": self._pages.get(domain, 0), "bytes": self._bytes.get(domain, 0)}
+
+
+# ----------------------------
+# Frontier
+# ----------------------------
+class CrawlFrontier:
+    """
+    Priority queue of URLs to fetch for one site.
+    Priority = score_path boosts - DEPTH_PENALTY * (depth - 1). Dedup is on canonical_url,
+    both before fetching (pushed URLs) and after (the page's <link rel=canonical>).
+    """
+
+    def __init__(
+        self,
+        root_url: str,
+        max_depth: int = 2,
+        keywords: Optional[list[str]] = None,
+        block_keywords: Optional[list[str]] = None,
+    ):
+        self.root_url = root_url
+        self.site = site_key(root_url)
+        self.max_depth = max_depth
+        self.keywords = keywords
+        self.block_keywords = block_keywords
+        self._heap: list[tuple[int, int, str, int]] = []
+        self._tie = itertools.count()
+        self._seen: set[str] = {canonical_url(root_url)}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, url: str, depth: int, score: int) -> bool:
+        if depth > self.max_depth or score <= 0:
+            return False
+        key = canonical_url(url)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        priority = score - DEPTH_PENALTY * max(0, depth - 1)
+        heapq.heappush(self._heap, (-priority, next(self._tie), url, depth))
+        return True
+
+    def add_links(self, page_url: str, hrefs: list[str], depth: int) -> int:
+        n = 0
+        for s, u in link_candidates(page_url, hrefs, self.keywords, self.block_keywords, same_site_only=True):
+            if site_key(u) == self.site and self.push(u, depth, s):
+                n += 1
+        return n
+
+    def add_sitemap_urls(self, urls: list[str], limit: int = 50) -> int:
+        """
+        Sitemap URLs count as depth 1 (linked from the site structure); only the best `limit` are queued.
+        """
+        scored: list[tuple[int, str]] = []
+        for u in urls:
+            if site_key(u) != self.site:
+                continue
+            path = (urlparse(u).path or "").lower()
+            if not path or path == "/" or any(path.endswith(ext) for ext in SKIP_EXTENSIONS):
+                continue
+            s = score_path(path, self.keywords, self.block_keywords)
+            if s > 0:
+                scored.append((s, u))
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return sum(1 for s, u in scored[:limit] if self.push(u, 1, s))
+
+    def accept_canonical(self, fetched_url: str, canonical: str) -> bool:
+        """
+        After fetching: False if the page declares a canonical URL we already have.
+        """
+        if not canonical:
+            return True
+        key = canonical_url(urljoin(fetched_url, canonical))
+        if key == canonical_url(fetched_url):
+            return True
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+    def pop(self) -> Optional[tuple[str, int]]:
+        if not self._heap:
+            return None
+        _, _, url, depth = heapq.heappop(self._heap)
+        return url, depth
+
+
+# ----------------------------
+# Sitemaps
+# ----------------------------
+_LOC_RE = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.I)
+
+# small in-process cache: site -> urls (sitemaps barely change within a session).
+# Only sitemaps that were found are kept: a timeout or 5xx is retried on the next call,
+# a 404 is remembered by host_health's negative cache instead.
+_sitemap_cache: dict[str, list[str]] = {}
+_sitemap_lock = threading.Lock()
+
+
+def _get_text(url: str, timeout_s: float, max_bytes: int, budget: Optional[CrawlBudget] = None) -> str:
+    # through web.fetch_url for the HTTP disk cache, host health and the circuit breaker
+    # (imported here: web imports this module)
+    from .web import fetch_url
+
+    text = fetch_url(url, timeout_s=int(timeout_s), max_bytes=max_bytes, content_types=("xml",)) or ""
+    if budget is not None and text:
+        budget.record_bytes(site_key(url), len(text.encode("utf-8", errors="replace")))
+    return text
+
+
+def _locs(xml: str) -> list[str]:
+    return [html.unescape(x) for x in _LOC_RE.findall(xml)]
+
+
+def fetch_sitemap_urls(
+    root_url: str,
+    timeout_s: float = 8,
+    max_urls: int = 2000,
+    max_child_sitemaps: int = 3,
+    max_bytes: int = 2_000_000,
+    budget: Optional[CrawlBudget] = None,
+) -> list[str]:
+    """
+    URLs from /sitemap.xml (following up to max_child_sitemaps entries of a sitemap index).
+    Returns [] if the site has none. Downloaded sitemap bytes are charged to `budget`'s byte
+    budget for the site (answers from the in-process cache cost nothing).
+    """
+    site = site_key(root_url)
+    with _sitemap_lock:
+        if site in _sitemap_cache:
+            return list(_sitemap_cache[site])
+
+    u = urlparse(root_url)
+    start = urlunparse((u.scheme or "https", u.netloc, "/sitemap.xml", "", "", ""))
+
+    urls: list[str] = []
+    xml = _get_text(start, timeout_s, max_bytes, budget)
+    if "<sitemapindex" in xml[:2000].lower():
+        children = _locs(xml)
+        # page/company sitemaps first, product/blog/post sitemaps are rarely useful here
+        children.sort(key=lambda c: 0 if re.search(r"page|company|about", c, re.I) else 1)
+        for child in children[:max_child_sitemaps]:
+            urls.extend(_locs(_get_text(child, timeout_s, max_bytes, budget)))
+            if len(urls) >= max_urls:
+                break
+    else:
+        urls = _locs(xml)
+
+    urls = [x.strip() for x in urls[:max_urls] if x.strip().startswith("http")]
+    if urls:
+        with _sitemap_lock:
+            _sitemap_cache[site] = urls
+    return list(urls)
@@ -1,28 +1,27 @@
 # src/discovery.py
 from __future__ import annotations
-from urllib.parse import urlparse, parse_qs, unquote, quote_plus
-
 
 import re
-import time
-from dataclasses import dataclass
-from typing import Any, Optional
-from urllib.parse import urlparse, quote_plus
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from dataclasses import asdict, dataclass
+from typing import Any, Iterator, Optional
+from urllib.parse import urlparse
+
+from .company_index import get_company_index
+from .keywords import KeywordMatcher
+from .ratelimit import bind_caller
+from .search_backends import SearchBackend, get_search_backend
+from .search_cache import cached_search
+from .types import SearchResult
 
-import requests
-from bs4 import BeautifulSoup
+# query variants searched at once (pacing per search host is up to the ratelimit scheduler)
+DISCOVERY_QUERY_WORKERS = 4
 
 
 # ----------------------------
 # Types
 # ----------------------------
-@dataclass
-class SearchResult:
-    title: str
-    url: str
-    snippet: str = ""
-
-
 @dataclass
 class DiscoverySpec:
     industry: str = ""
@@ -40,13 +39,6 @@ def _norm(s: str) -> str:
     return " ".join(str(s or "").strip().split())
 
 
-def _clean_title(title: str) -> str:
-    t = _norm(title)
-    # remove common suffixes (very rough)
-    t = re.sub(r"\s*[-–|]\s*(LinkedIn|Xing|Crunchbase|Wikipedia|Jobs|Karriere|Careers)\s*$", "", t, flags=re.I)
-    return t.strip()
-
-
 def _is_probably_company_domain(url: str) -> bool:
     if not url:
         return False
@@ -79,170 +71,121 @@ def _is_probably_company_domain(url: str) -> bool:
         return False
 
 
+# Listing a keyword twice counts it twice ("restaurant", "hotel", "tattoo" are EN+DE).
+CONSUMER_SERVICE_HINTS = [
+    # EN
+    "salon",
+    "hair",
+    "barber",
+    "restaurant",
+    "cafe",
+    "bakery",
+    "beauty",
+    "spa",
+    "nails",
+    "tattoo",
+    "gym",
+    "hotel",
+    # DE
+    "friseur",
+    "barbier",
+    "restaurant",
+    "café",
+    "baeckerei",
+    "bäckerei",
+    "kosmetik",
+    "nagel",
+    "tattoo",
+    "hotel",
+    "gasthaus",
+    "öffnungszeiten",
+    "oeffnungszeiten",
+]
+_CONSUMER_MATCHER = KeywordMatcher(CONSUMER_SERVICE_HINTS)
+
+
 def _looks_like_consumer_service(text: str) -> bool:
-    t = _norm(text).lower()
-    hints = [
-        # EN
-        "salon",
-        "hair",
-        "barber",
-        "restaurant",
-        "cafe",
-        "bakery",
-        "beauty",
-        "spa",
-        "nails",
-        "tattoo",
-        "gym",
-        "hotel",
-        # DE
-        "friseur",
-        "barbier",
-        "restaurant",
-        "café",
-        "baeckerei",
-        "bäckerei",
-        "kosmetik",
-        "nagel",
-        "tattoo",
-        "hotel",
-        "gasthaus",
-        "öffnungszeiten",
-        "oeffnungszeiten",
-    ]
-    hits = sum(1 for h in hints if h in t)
-    return hits >= 2
+    return _CONSUMER_MATCHER.count(_norm(text)) >= 2
 
 
 # ----------------------------
-# DuckDuckGo HTML search (no key)
+# Search (backend + persistent cache)
 # ----------------------------
-# src/discovery.py (PATCH)
-from urllib.parse import urlparse, parse_qs, unquote, quote_plus
-
-def _unwrap_ddg_url(href: str) -> str:
+def _search(
+    query: str,
+    max_results: int = 10,
+    use_cache: bool = True,
+    backend: Optional[SearchBackend] = None,
+) -> list[SearchResult]:
     """
-    DDG often returns redirect URLs like:
-    https://duckduckgo.com/l/?uddg=https%3A%2F%2Flinear.app%2F
-    We unwrap them to the real target URL.
-    """
-    if not href:
-        return href
-
-    try:
-        u = urlparse(href)
-        # DDG redirect pattern
-        if "duckduckgo.com" in (u.netloc or "") and u.path.startswith("/l/"):
-            qs = parse_qs(u.query or "")
-            if "uddg" in qs and qs["uddg"]:
-                return unquote(qs["uddg"][0])
-    except Exception:
-        pass
-
-    return href
-
-
-def _request_html(url: str, timeout_s: int = 12) -> str:
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X) AppleWebKit/537.36 "
-            "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
-        ),
-        "Accept-Language": "de-DE,de;q=0.9,en;q=0.8",
-        "Referer": "https://duckduckgo.com/",
-    }
-    r = requests.get(url, headers=headers, timeout=timeout_s)
-    if r.status_code >= 400:
-        return ""
-    return r.text or ""
-
-
-def _ddg_search(query: str, max_results: int = 10, timeout_s: int = 12) -> list[SearchResult]:
-    """
-    More robust DDG search:
-    1) Try lite.duckduckgo.com (easier to parse, fewer class changes)
-    2) Fallback to duckduckgo.com/html
-    Also unwrap redirect links to real target URLs.
+    Search via the configured backend (see search_backends.py), through the search cache.
     """
     q = _norm(query)
     if not q:
         return []
-
-    out: list[SearchResult] = []
-
-    # --- 1) LITE version (preferred) ---
-    lite_url = "https://lite.duckduckgo.com/lite/?q=" + quote_plus(q)
-    html = _request_html(lite_url, timeout_s=timeout_s)
-
-    if html:
-        soup = BeautifulSoup(html, "lxml")
-
-        # lite results: links usually have class "result-link"
-        for a in soup.select("a.result-link"):
-            title = a.get_text(" ", strip=True) or ""
-            href = (a.get("href") or "").strip()
-            href = _unwrap_ddg_url(href)
-            title = _clean_title(title)
-
-            if href and title:
-                out.append(SearchResult(title=title, url=href, snippet=""))
-
-            if len(out) >= max_results:
-                break
-
-    # --- 2) Fallback to HTML version ---
-    if len(out) == 0:
-        html_url = "https://duckduckgo.com/html/?q=" + quote_plus(q)
-        html2 = _request_html(html_url, timeout_s=timeout_s)
-
-        if html2:
-            soup = BeautifulSoup(html2, "lxml")
-            for res in soup.select(".result"):
-                a = res.select_one(".result__a")
-                if not a:
-                    continue
-
-                href = (a.get("href") or "").strip()
-                href = _unwrap_ddg_url(href)
-
-                title = _clean_title(a.get_text(" ", strip=True) or "")
-                snippet_el = res.select_one(".result__snippet")
-                snippet = _norm(snippet_el.get_text(" ", strip=True)) if snippet_el else ""
-
-                if href and title:
-                    out.append(SearchResult(title=title, url=href, snippet=snippet))
-
-                if len(out) >= max_results:
-                    break
-
-    return out
-
+    b = backend or get_search_backend()
+    rows = cached_search(
+        q,
+        b.name,
+        max_results,
+        lambda: [asdict(r) for r in b.search(q, max_results=max_results)],
+        use_cache=use_cache and b.cacheable,
+    )
+    return [SearchResult(**r) for r in rows]
+
+
+def _iter_search_results(
+    queries: list[str],
+    max_results: int = 20,
+    backend: Optional[SearchBackend] = None,
+) -> Iterator[tuple[str, list[SearchResult]]]:
+    """
+    Run all queries concurrently and yield (query, results) in completion order.
+    Closing the generator early cancels queries that haven't started yet.
+    """
+    qs = list(dict.fromkeys(q for q in queries if q and q.strip()))
+    if not qs:
+        return
+    ex = ThreadPoolExecutor(max_workers=min(DISCOVERY_QUERY_WORKERS, len(qs)), thread_name_prefix="discovery")
+    try:
+        search = bind_caller(_search)
+        futures = {ex.submit(search, q, max_results, True, backend): q for q in qs}
+        for fut in as_completed(futures):
+            try:
+                results = fut.result()
+            except Exception:
+                continue
+            yield futures[fut], results
+    finally:
+        # running searches finish in the background (and still fill the search cache)
+        ex.shutdown(wait=False, cancel_futures=True)
 
 
 # ----------------------------
 # Public API
 # ----------------------------
-def find_company_by_name(company_query: str, max_results: int = 6) -> list[dict[str, Any]]:
+def iter_find_company_by_name(company_query: str, max_results: int = 6) -> Iterator[dict[str, Any]]:
     """
-    Given a company name (or domain), returns a list of candidates:
-    [{company_name, company_url, snippet, source}]
+    Given a company name (or domain), yields candidates as soon as they pass the filters:
+    {company_name, company_url, snippet, source}
     """
     q = _norm(company_query)
     if not q:
-        return []
+        return
 
     # If user pasted a domain, prefer it
     if re.match(r"^https?://", q, flags=re.I) or "." in q:
         url_guess = q if q.startswith("http") else f"https://{q}"
-        return [{
+        yield {
             "company_name": q.replace("https://", "").replace("http://", "").strip("/"),
             "company_url": url_guess,
             "snippet": "User provided URL/domain.",
             "source": "user_input",
-        }]
+        }
+        return
 
-    results = _ddg_search(f"{q} official website", max_results=max_results)
-    candidates: list[dict[str, Any]] = []
+    backend = get_search_backend()
+    results = _search(f"{q} official website", max_results=max_results, backend=backend)
     seen_hosts = set()
 
     for r in results:
@@ -253,20 +196,54 @@ def find_company_by_name(company_query: str, max_results: int = 6) -> list[dict[
             continue
         seen_hosts.add(host)
 
-        candidates.append({
+        yield {
             "company_name": r.title or q,
             "company_url": r.url,
             "snippet": r.snippet,
-            "source": "ddg",
-        })
+            "source": backend.name,
+        }
+
 
-    return candidates
+def find_company_by_name(company_query: str, max_results: int = 6) -> list[dict[str, Any]]:
+    """
+    Given a company name (or domain), returns a list of candidates:
+    [{company_name, company_url, snippet, source}]
+    """
+    return list(iter_find_company_by_name(company_query, max_results=max_results))
 
 
-def discover_companies(spec: DiscoverySpec, max_results: int = 10) -> list[dict[str, Any]]:
+def _local_index_candidates(spec: DiscoverySpec, max_results: int) -> list[dict[str, Any]]:
     """
-    Parameter-based discovery (web search → extract company sites).
-    Returns list of: {company_name, company_url, snippet, source}
+    Already researched companies matching the spec (company_index.py); no network.
+    """
+    query = _norm(" ".join([spec.industry, spec.keywords, spec.region_or_city]))
+    if not query:
+        return []
+    try:
+        hits = get_company_index().search(
+            query,
+            max_results=max_results * 2,
+            country=spec.country,
+            required=spec.industry or spec.keywords,
+        )
+    except Exception:
+        return []
+    out = []
+    for h in hits:
+        if spec.exclude_consumer_services and _looks_like_consumer_service(f"{h['company_name']} {h['snippet']}"):
+            continue
+        out.append({k: h[k] for k in ("company_name", "company_url", "snippet", "source")})
+    return out
+
+
+def iter_discover_companies(
+    spec: DiscoverySpec,
+    max_results: int = 10,
+    use_local_index: bool = True,
+) -> Iterator[dict[str, Any]]:
+    """
+    Streaming discover_companies: yields each candidate as soon as it passes the domain and
+    consumer-service filters. Closing the generator early cancels outstanding searches.
     """
     parts = []
     if spec.industry:
@@ -290,40 +267,52 @@ def discover_companies(spec: DiscoverySpec, max_results: int = 10) -> list[dict[
         _norm(" ".join([spec.industry, spec.country, "B2B company"])),
     ]
 
-    candidates: list[dict[str, Any]] = []
+    n = 0
     seen_hosts = set()
 
-    for q in queries:
-        if not q.strip():
-            continue
-        results = _ddg_search(q, max_results=20)
-        for r in results:
-            if not _is_probably_company_domain(r.url):
-                continue
-
-            blob = f"{r.title} {r.snippet}"
-            if spec.exclude_consumer_services and _looks_like_consumer_service(blob):
-                continue
-
-            host = urlparse(r.url).netloc.lower()
-            if host in seen_hosts:
+    if use_local_index:
+        for c in _local_index_candidates(spec, max_results):
+            host = urlparse(c["company_url"]).netloc.lower()
+            if not host or host in seen_hosts:
                 continue
             seen_hosts.add(host)
+            yield c
+            n += 1
+            if n >= max_results:
+                return
+
+    # all variants in flight at once, merged in arrival order
+    backend = get_search_backend()
+    with closing(_iter_search_results(queries, max_results=20, backend=backend)) as batches:
+        for _, results in batches:
+            for r in results:
+                if not _is_probably_company_domain(r.url):
+                    continue
 
-            candidates.append({
-                "company_name": r.title,
-                "company_url": r.url,
-                "snippet": r.snippet,
-                "source": "ddg",
-            })
+                blob = f"{r.title} {r.snippet}"
+                if spec.exclude_consumer_services and _looks_like_consumer_service(blob):
+                    continue
 
-            if len(candidates) >= max_results:
-                break
+                host = urlparse(r.url).netloc.lower()
+                if host in seen_hosts:
+                    continue
+                seen_hosts.add(host)
 
-        if len(candidates) >= max_results:
-            break
+                yield {
+                    "company_name": r.title,
+                    "company_url": r.url,
+                    "snippet": r.snippet,
+                    "source": backend.name,
+                }
+                n += 1
+                if n >= max_results:
+                    return
 
-        # small politeness delay
-        time.sleep(0.15)
 
-    return candidates
+def discover_companies(spec: DiscoverySpec, max_results: int = 10, use_local_index: bool = True) -> list[dict[str, Any]]:
+    """
+    Parameter-based discovery (local index of researched companies first, then web search
+    → extract company sites for the remainder).
+    Returns list of: {company_name, company_url, snippet, source}
+    """
+    return list(iter_discover_companies(spec, max_results=max_results, use_local_index=use_local_index))
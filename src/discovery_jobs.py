@@ -0,0 +1,360 @@
+# src/discovery_jobs.py
+"""
+Deep discovery: build prospect pools of hundreds/thousands of companies for one spec.
+
+- query expansion: industry synonyms × regions × size bands (expand_queries)
+- paginated search (backend.search_pages, falls back to a single search() page), through the
+  search cache: a query's pages are cached as one entry, so resumed or overlapping jobs don't
+  spend the search rate budget on queries that were already run
+- streaming dedup on the registrable domain (www.shop.acme.de == acme.de)
+- DiscoveryJob: runs the expanded queries concurrently, yields new candidates as they come in,
+  persists progress to cache/discovery_jobs/<job_id>.json and resumes from there
+  (query granularity: a query that was cut off is searched again from its first page)
+- a query only counts as done after a search that returned results; errors (timeouts, 429s)
+  and empty (throttled) answers leave it pending for the next run, up to MAX_QUERY_ATTEMPTS
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import asdict
+from typing import Any, Iterator, Optional
+from urllib.parse import urlparse
+
+from .discovery import DISCOVERY_QUERY_WORKERS, DiscoverySpec, _is_probably_company_domain, _looks_like_consumer_service, _norm, _search
+from .ratelimit import caller_scope, current_caller
+from .search_backends import SearchBackend, get_search_backend
+from .search_cache import cached_search
+from .types import SearchResult
+
+
+DISCOVERY_JOBS_DIR = os.path.join("cache", "discovery_jobs")
+DEFAULT_PAGES_PER_QUERY = 5
+DEFAULT_MAX_QUERIES = 80
+# write job progress at most this often
+SAVE_INTERVAL_S = 2.0
+# runs a query may fail (error or no results) before the job gives up on it
+MAX_QUERY_ATTEMPTS = 3
+
+# EN/DE synonyms; keys are matched against the lowercased industry
+INDUSTRY_SYNONYMS: dict[str, list[str]] = {
+    "logistics": ["logistics", "logistik", "spedition", "freight forwarding", "transport"],
+    "logistik": ["logistik", "logistics", "spedition", "transport", "lagerlogistik"],
+    "maschinenbau": ["maschinenbau", "mechanical engineering", "machinery manufacturer", "anlagenbau"],
+    "mechanical engineering": ["mechanical engineering", "maschinenbau", "machinery manufacturer"],
+    "manufacturing": ["manufacturing", "fertigung", "produktion", "industrial manufacturer"],
+    "software": ["software", "saas", "softwareentwicklung", "software company"],
+    "saas": ["saas", "software", "cloud software", "b2b software"],
+    "industrial iot": ["industrial iot", "iiot", "industrie 4.0", "smart factory"],
+    "energy": ["energy", "energie", "energieversorger", "renewable energy"],
+    "healthcare": ["healthcare", "medizintechnik", "medical devices", "gesundheitswesen"],
+    "automotive": ["automotive", "automobilzulieferer", "automotive supplier", "fahrzeugbau"],
+    "construction": ["construction", "bauunternehmen", "bau", "construction company"],
+}
+
+COUNTRY_REGIONS: dict[str, list[str]] = {
+    "germany": [
+        "Bayern", "Baden-Württemberg", "NRW", "Hessen", "Niedersachsen", "Berlin", "Hamburg",
+        "Sachsen", "Rheinland-Pfalz", "Thüringen", "Schleswig-Holstein", "Bremen",
+    ],
+    "austria": ["Wien", "Oberösterreich", "Steiermark", "Tirol", "Salzburg", "Niederösterreich"],
+    "switzerland": ["Zürich", "Bern", "Basel", "Aargau", "St. Gallen", "Luzern"],
+}
+COUNTRY_NAMES = {"deutschland": "germany", "de": "germany", "österreich": "austria", "at": "austria", "schweiz": "switzerland", "ch": "switzerland"}
+
+SIZE_BANDS: dict[str, list[str]] = {
+    "1-10": ["startup"],
+    "11-50": ["KMU", "small business"],
+    "51-200": ["Mittelstand", "mid-sized company"],
+    "201-1000": ["Mittelstand", "mid-sized company"],
+    "1000+": ["Konzern", "enterprise"],
+}
+
+# second-level labels under which companies register (acme.co.uk, acme.com.au)
+_SECOND_LEVEL = {"co", "com", "org", "net", "ac", "gv", "or"}
+
+
+def canonical_domain(url: str) -> str:
+    """
+    Registrable domain, lowercased: https://www.shop.acme.de/x -> acme.de, acme.co.uk stays.
+    """
+    host = (urlparse(url).netloc or "").lower().split("@")[-1].split(":")[0]
+    labels = [x for x in host.split(".") if x]
+    if len(labels) <= 2:
+        return ".".join(labels)
+    if labels[-2] in _SECOND_LEVEL and len(labels[-1]) == 2:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def _industry_terms(spec: DiscoverySpec) -> list[str]:
+    terms: list[str] = []
+    for part in [spec.industry] + spec.keywords.split(","):
+        p = _norm(part)
+        if not p:
+            continue
+        terms.extend(INDUSTRY_SYNONYMS.get(p.lower(), [p]))
+    return list(dict.fromkeys(t for t in terms if t)) or [""]
+
+
+def _regions(spec: DiscoverySpec) -> list[str]:
+    given = [_norm(r) for r in spec.region_or_city.split(",") if _norm(r)]
+    if given:
+        return given
+    country = _norm(spec.country).lower()
+    return [""] + COUNTRY_REGIONS.get(COUNTRY_NAMES.get(country, country), [])
+
+
+def _size_bands(spec: DiscoverySpec) -> list[str]:
+    if spec.company_size:
+        return SIZE_BANDS.get(spec.company_size, [])[:1] or [""]
+    # no size given: plain queries first, then each band once
+    return [""] + list(dict.fromkeys(b for bands in SIZE_BANDS.values() for b in bands[:1]))
+
+
+def expand_queries(spec: DiscoverySpec, max_queries: int = DEFAULT_MAX_QUERIES) -> list[str]:
+    """
+    industry synonyms × regions × size bands, most general combinations first
+    (ordered by the sum of the indices, so early queries already cover every dimension).
+    """
+    terms, regions, bands = _industry_terms(spec), _regions(spec), _size_bands(spec)
+    combos = sorted(
+        ((i, j, k) for i in range(len(terms)) for j in range(len(regions)) for k in range(len(bands))),
+        key=lambda x: (sum(x), x),
+    )
+    out: list[str] = []
+    for i, j, k in combos:
+        q = _norm(" ".join([terms[i], regions[j], spec.country, bands[k], "company"]))
+        if q and q != "company" and q not in out:
+            out.append(q)
+        if len(out) >= max_queries:
+            break
+    return out
+
+
+def _job_id(spec: DiscoverySpec, target: int, max_queries: int, pages_per_query: int) -> str:
+    raw = json.dumps([asdict(spec), target, max_queries, pages_per_query], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class DiscoveryJob:
+    def __init__(
+        self,
+        spec: DiscoverySpec,
+        target: int = 500,
+        max_queries: int = DEFAULT_MAX_QUERIES,
+        pages_per_query: int = DEFAULT_PAGES_PER_QUERY,
+        workers: int = DISCOVERY_QUERY_WORKERS,
+        backend: Optional[SearchBackend] = None,
+        jobs_dir: str = DISCOVERY_JOBS_DIR,
+    ):
+        self.spec = spec
+        self.target = target
+        self.pages_per_query = pages_per_query
+        self.workers = max(1, workers)
+        self.backend = backend or get_search_backend()
+        self.job_id = _job_id(spec, target, max_queries, pages_per_query)
+        self.path = os.path.join(jobs_dir, f"{self.job_id}.json")
+
+        self.queries = expand_queries(spec, max_queries=max_queries)
+        self.done_queries: set[str] = set()
+        # query -> failed attempts so far (pending until MAX_QUERY_ATTEMPTS)
+        self.failed_queries: dict[str, int] = {}
+        self.candidates: list[dict[str, Any]] = []
+        self.seen_domains: set[str] = set()
+        self.counters = {"pages": 0, "raw_results": 0, "duplicates": 0, "rejected": 0}
+        self.elapsed_s = 0.0
+        self._last_save = 0.0
+        self._load()
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            state = json.loads(open(self.path, "r", encoding="utf-8").read())
+        except Exception:
+            return
+        self.done_queries = set(state.get("done_queries") or [])
+        self.failed_queries = {str(q): int(n) for q, n in (state.get("failed_queries") or {}).items()}
+        self.candidates = list(state.get("candidates") or [])
+        self.seen_domains = {c["domain"] for c in self.candidates if c.get("domain")}
+        self.counters.update(state.get("counters") or {})
+        self.elapsed_s = float(state.get("elapsed_s") or 0.0)
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        state = {
+            "job_id": self.job_id,
+            "spec": asdict(self.spec),
+            "target": self.target,
+            "backend": self.backend.name,
+            "queries": self.queries,
+            "done_queries": sorted(self.done_queries),
+            "failed_queries": self.failed_queries,
+            "candidates": self.candidates,
+            "counters": self.counters,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "stats": self.stats(),
+        }
+        tmp = f"{self.path}.tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(state, ensure_ascii=False))
+        os.replace(tmp, self.path)
+        self._last_save = time.monotonic()
+
+    def _exhausted(self, query: str) -> bool:
+        return query in self.done_queries or self.failed_queries.get(query, 0) >= MAX_QUERY_ATTEMPTS
+
+    @property
+    def finished(self) -> bool:
+        return len(self.candidates) >= self.target or all(self._exhausted(q) for q in self.queries)
+
+    # ----------------------------
+    # Run
+    # ----------------------------
+    def _pages(self, query: str) -> Iterator[list[SearchResult]]:
+        paged = getattr(self.backend, "search_pages", None)
+        if paged is None:
+            yield _search(query, max_results=30, backend=self.backend)
+            return
+        pages = cached_search(
+            query,
+            f"{self.backend.name}/pages",
+            self.pages_per_query,
+            lambda: [[asdict(r) for r in page] for page in paged(query, max_pages=self.pages_per_query)],
+            use_cache=self.backend.cacheable,
+        )
+        for page in pages:
+            yield [SearchResult(**r) for r in page]
+
+    def _worker(self, todo: "queue.Queue[str]", out: "queue.Queue", stop: threading.Event, caller: str) -> None:
+        with caller_scope(caller):
+            while not stop.is_set():
+                try:
+                    q = todo.get_nowait()
+                except queue.Empty:
+                    return
+                n = 0
+                try:
+                    for results in self._pages(q):
+                        n += len(results)
+                        out.put(("page", q, results))
+                        if stop.is_set():
+                            return
+                except Exception:
+                    # timeouts, 429s, DNS blips: worth another try on resume
+                    out.put(("failed", q, None))
+                    continue
+                # no results at all is how a throttled search answers: retry it too
+                out.put(("done" if n else "failed", q, None))
+
+    def _accept(self, r: SearchResult) -> Optional[dict[str, Any]]:
+        if not _is_probably_company_domain(r.url):
+            self.counters["rejected"] += 1
+            return None
+        if self.spec.exclude_consumer_services and _looks_like_consumer_service(f"{r.title} {r.snippet}"):
+            self.counters["rejected"] += 1
+            return None
+        domain = canonical_domain(r.url)
+        if not domain or domain in self.seen_domains:
+            self.counters["duplicates"] += 1
+            return None
+        self.seen_domains.add(domain)
+        return {
+            "company_name": r.title,
+            "company_url": r.url,
+            "snippet": r.snippet,
+            "source": self.backend.name,
+            "domain": domain,
+        }
+
+    def run(self) -> Iterator[dict[str, Any]]:
+        """
+        Yield NEW candidates until `target` is reached or all queries are exhausted.
+        Safe to stop early (close the generator); call run() again to resume.
+        """
+        if self.finished:
+            return
+        todo: "queue.Queue[str]" = queue.Queue()
+        pending = [q for q in self.queries if not self._exhausted(q)]
+        for q in pending:
+            todo.put(q)
+        out: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        caller = current_caller()
+        threads = [
+            threading.Thread(target=self._worker, args=(todo, out, stop, caller), name=f"discovery-job-{i}", daemon=True)
+            for i in range(min(self.workers, len(pending)))
+        ]
+        for t in threads:
+            t.start()
+
+        t0 = time.monotonic()
+        base_elapsed = self.elapsed_s
+        remaining = len(pending)
+        try:
+            while remaining and len(self.candidates) < self.target:
+                try:
+                    kind, q, results = out.get(timeout=0.5)
+                except queue.Empty:
+                    if not any(t.is_alive() for t in threads):
+                        break
+                    continue
+                if kind == "done":
+                    self.done_queries.add(q)
+                    self.failed_queries.pop(q, None)
+                    remaining -= 1
+                elif kind == "failed":
+                    self.failed_queries[q] = self.failed_queries.get(q, 0) + 1
+                    remaining -= 1
+                else:
+                    self.counters["pages"] += 1
+                    self.counters["raw_results"] += len(results)
+                    for r in results:
+                        c = self._accept(r)
+                        if c is None:
+                            continue
+                        self.candidates.append(c)
+                        yield c
+                        if len(self.candidates) >= self.target:
+                            break
+                self.elapsed_s = base_elapsed + time.monotonic() - t0
+                if time.monotonic() - self._last_save >= SAVE_INTERVAL_S:
+                    self.save()
+        finally:
+            stop.set()
+            self.elapsed_s = base_elapsed + time.monotonic() - t0
+            self.save()
+
+    def stats(self) -> dict[str, Any]:
+        raw = self.counters["raw_results"]
+        return {
+            "queries": len(self.queries),
+            "queries_done": sum(1 for q in self.queries if q in self.done_queries),
+            "queries_failed": sum(1 for q in self.queries if q in self.failed_queries),
+            "candidates": len(self.candidates),
+            "target": self.target,
+            **self.counters,
+            "elapsed_s": round(self.elapsed_s, 2),
+            # throughput / yield
+            "candidates_per_s": round(len(self.candidates) / self.elapsed_s, 2) if self.elapsed_s else 0.0,
+            "results_per_s": round(raw / self.elapsed_s, 2) if self.elapsed_s else 0.0,
+            "yield": round(len(self.candidates) / raw, 3) if raw else 0.0,
+        }
+
+
+def deep_discover_companies(spec: DiscoverySpec, target: int = 500, **kwargs: Any) -> list[dict[str, Any]]:
+    """
+    Run (or resume) a DiscoveryJob to completion and return all its candidates.
+    """
+    job = DiscoveryJob(spec, target=target, **kwargs)
+    for _ in job.run():
+        pass
+    return list(job.candidates)
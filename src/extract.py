@@ -0,0 +1,126 @@
+# src/extract.py
+"""
+Fast HTML -> (title, text, hrefs, canonical) extraction on lxml's streaming parser.
+
+No tree is built: a parser target receives start/end/data events, skips
+script/style/noscript content, and feeding stops as soon as enough text is
+collected. Use it through web.html_to_text(..., engine="lxml").
+"""
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+from lxml import etree
+
+
+SKIP_TAGS = {"script", "style", "noscript"}
+
+# feed the parser in chunks so we can stop early on huge pages
+FEED_CHUNK_CHARS = 32 * 1024
+
+
+def _clean_text(s: str) -> str:
+    s = re.sub(r"\s+", " ", s)
+    return s.strip()
+
+
+class _TextTarget:
+    """
+    lxml parser target collecting title, visible text and <a href> values.
+    """
+
+    def __init__(self, max_text: Optional[int], want_links: bool):
+        self.max_text = max_text
+        self.want_links = want_links
+        self.skip_depth = 0
+        self.in_title = False
+        self.title_parts: list[str] = []
+        self.text_parts: list[str] = []
+        self.text_len = 0
+        self.hrefs: list[str] = []
+        self.canonical = ""
+        # one text node can arrive as several data() calls (e.g. around entities)
+        self._pending: list[str] = []
+
+    @property
+    def done(self) -> bool:
+        # Stop only once links are not needed: hrefs further down the page would be lost otherwise.
+        return self.max_text is not None and not self.want_links and self.text_len >= self.max_text
+
+    def _flush(self):
+        if not self._pending:
+            return
+        piece = "".join(self._pending).strip()
+        self._pending = []
+        if not piece or self.skip_depth:
+            return
+        if self.in_title:
+            self.title_parts.append(piece)
+        if self.max_text is None or self.text_len < self.max_text:
+            self.text_parts.append(piece)
+            self.text_len += len(piece) + 1
+
+    def start(self, tag, attrib):
+        self._flush()
+        tag = str(tag).lower()
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == "title":
+            self.in_title = True
+        elif tag == "a" and self.want_links:
+            href = attrib.get("href")
+            if href is not None:
+                self.hrefs.append(href.strip())
+        elif tag == "link" and not self.canonical:
+            if "canonical" in (attrib.get("rel") or "").lower().split():
+                self.canonical = (attrib.get("href") or "").strip()
+
+    def end(self, tag):
+        self._flush()
+        tag = str(tag).lower()
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag == "title":
+            self.in_title = False
+
+    def data(self, data):
+        if not self.skip_depth:
+            self._pending.append(data)
+
+    def comment(self, text):
+        self._flush()
+
+    def close(self):
+        self._flush()
+        return None
+
+
+def fast_parse(
+    html: str,
+    max_text: Optional[int] = None,
+    want_links: bool = True,
+) -> tuple[str, str, list[str], str]:
+    """
+    Extract (title, visible text, hrefs, canonical href) in one streaming pass.
+    With want_links=False and max_text set, parsing stops once max_text chars of text are collected.
+    """
+    target = _TextTarget(max_text=max_text, want_links=want_links)
+    parser = etree.HTMLParser(target=target, recover=True, no_network=True)
+
+    html = html or ""
+    for i in range(0, len(html), FEED_CHUNK_CHARS):
+        parser.feed(html[i : i + FEED_CHUNK_CHARS])
+        if target.done:
+            break
+    try:
+        parser.close()
+    except Exception:
+        # closing after an early stop may complain about unclosed tags; results are already collected
+        target.close()
+
+    title = _clean_text(" ".join(target.title_parts))
+    text = _clean_text(" ".join(target.text_parts))
+    if max_text is not None:
+        text = text[:max_text]
+    return title, text, target.hrefs, target.canonical
@@ -1,48 +1,22 @@
 from __future__ import annotations
 
-import json
 import re
 from typing import Any, Dict, List, Tuple
 
 import pandas as pd
 
+from .keywords import KeywordMatcher, keyword_matcher
+from .schemas import parsed_profile
 from .types import SearchSpec
 
 
 # ----------------------------
 # Utilities
 # ----------------------------
-def _safe_parse_json(text: str) -> Dict[str, Any]:
-    if not text:
-        return {}
-    t = text.strip()
-    try:
-        obj = json.loads(t)
-        return obj if isinstance(obj, dict) else {}
-    except Exception:
-        pass
-
-    start = t.find("{")
-    end = t.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        candidate = t[start : end + 1]
-        try:
-            obj = json.loads(candidate)
-            return obj if isinstance(obj, dict) else {}
-        except Exception:
-            return {}
-    return {}
-
-
 def _norm(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "").strip()).lower()
 
 
-def _has_any(text: str, keywords: List[str]) -> bool:
-    t = _norm(text)
-    return any(k.lower() in t for k in keywords if k and k.strip())
-
-
 def _bucket_from_score(score: int) -> str:
     if score >= 75:
         return "strong"
@@ -140,6 +114,11 @@ SOFTWARE_PRODUCT_HINTS = [
     "cloud",
 ]
 
+# built once; one pass over the text per list instead of one `in` scan per keyword
+_CONSUMER_MATCHER = KeywordMatcher(CONSUMER_LOCAL_SERVICE_HINTS)
+_B2B_MATCHER = KeywordMatcher(B2B_HINTS)
+_SOFTWARE_MATCHER = KeywordMatcher(SOFTWARE_PRODUCT_HINTS)
+
 
 def _score_from_text(text: str, spec: SearchSpec) -> Tuple[int, List[str]]:
     """
@@ -152,23 +131,24 @@ def _score_from_text(text: str, spec: SearchSpec) -> Tuple[int, List[str]]:
     score = 35  # baseline
 
     # Negative: local consumer services
-    if spec.exclude_consumer_services and _has_any(t, CONSUMER_LOCAL_SERVICE_HINTS):
+    if spec.exclude_consumer_services and _CONSUMER_MATCHER.any(t):
         score -= 45
         reasons.append("Looks like a local consumer service (excluded).")
 
     # Positive: B2B / industrial ops signals
-    if spec.prefer_b2b and _has_any(t, B2B_HINTS):
+    if spec.prefer_b2b and _B2B_MATCHER.any(t):
         score += 20
         reasons.append("Contains B2B / industrial / ops keywords.")
 
     # Positive: software orgs often fit decision-support prototypes too
-    if _has_any(t, SOFTWARE_PRODUCT_HINTS):
+    if _SOFTWARE_MATCHER.any(t):
         score += 15
         reasons.append("Contains software/platform/API signals (often good for prototypes).")
 
     # User-specified industry keywords (soft)
     if spec.industry_keywords:
-        hits = [k for k in spec.industry_keywords if k and k.lower() in t]
+        found = keyword_matcher(tuple(spec.industry_keywords)).hit_set(t)
+        hits = [k for k in spec.industry_keywords if k and k.strip().lower() in found]
         if hits:
             score += min(15, 3 * len(hits))
             reasons.append(
@@ -236,7 +216,7 @@ def merge_profiles_into_screen(screen_df: pd.DataFrame, profiles: List[Dict[str,
             continue
 
         profile_raw = p.get("profile_raw", "") or ""
-        parsed = _safe_parse_json(profile_raw)
+        parsed = parsed_profile(p)
 
         text_parts = []
         for k in ["company_summary", "what_they_sell", "likely_users", "possible_ux_opportunities", "uncertainties"]:
@@ -1,15 +1,18 @@
 import json
 import hashlib
 import re
-from typing import Any, Dict, Optional
-
-from openai import OpenAI
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 from .cache import cache_get_json, cache_set_json
+from .json_stream import iter_partial_json
+from .keywords import KeywordMatcher
+from .llm import get_llm, run_batch
+from .schemas import FIT_SCHEMA, parse_structured, text_format
 
-client = OpenAI()
-
-FIT_VERSION = "v3"  # bump when logic/prompt changes
+FIT_VERSION = "v4"  # bump when logic/prompt changes
+# seconds between partial results while streaming (UI redraws)
+STREAM_UPDATE_S = 0.15
+FIT_FORMAT = text_format("decision_fit", FIT_SCHEMA)
 
 
 FIT_PROMPT_TEMPLATE = """
@@ -78,6 +81,7 @@ LOCAL_CONSUMER_HINTS = [
     "öffnungszeiten",
     "oeffnungszeiten",
 ]
+_LOCAL_CONSUMER_MATCHER = KeywordMatcher(LOCAL_CONSUMER_HINTS)
 
 
 def _safe_parse_json(text: str) -> Dict[str, Any]:
@@ -106,8 +110,7 @@ def _hash_profile(profile_raw: str) -> str:
 
 
 def _looks_like_local_consumer_service(profile_raw: str) -> bool:
-    t = (profile_raw or "").lower()
-    hits = sum(1 for k in LOCAL_CONSUMER_HINTS if k in t)
+    hits = _LOCAL_CONSUMER_MATCHER.count(profile_raw or "")
     return hits >= 2  # require multiple hints to avoid false positives
 
 
@@ -167,44 +170,40 @@ def _apply_hard_guard(
     return parsed
 
 
-def score_company_fit(
-    company_name: str,
-    profile_raw: str,
-    preferences: Optional[Dict[str, Any]] = None,
-    use_cache: bool = True,
-) -> Dict[str, Any]:
-    """
-    Decision suitability scoring for agentic decision-support (not outreach).
-    - Preferences influence the prompt (goal/risk/horizon/detail).
-    - Hard-guard clamps obvious local consumer services if user chose to exclude them.
-    - Cache is keyed by (version + company + profile hash + preferences hash).
-    """
-    preferences = preferences or {}
+def _fit_cache_key(company_name: str, profile_raw: str, preferences: Dict[str, Any]) -> str:
     profile_hash = _hash_profile(profile_raw)
 
     # Preferences hash to avoid weird "same company but different settings" cache collisions
     pref_str = json.dumps(preferences, sort_keys=True, ensure_ascii=False)
     pref_hash = hashlib.sha256(pref_str.encode("utf-8")).hexdigest()[:10]
 
-    cache_key = f"fit::{FIT_VERSION}::{company_name}::{profile_hash}::{pref_hash}"
+    return f"fit::{FIT_VERSION}::{company_name}::{profile_hash}::{pref_hash}"
 
-    if use_cache:
-        cached = cache_get_json("cache/fit", cache_key)
-        if cached:
-            cached["from_cache"] = True
-            return cached
 
-    prompt = FIT_PROMPT_TEMPLATE.format(
+def _fit_prompt(profile_raw: str, preferences: Dict[str, Any], profile: Optional[Dict[str, Any]] = None) -> str:
+    # the parsed profile, compact, instead of the model's raw answer (fences, whitespace)
+    company_profile = json.dumps(profile, ensure_ascii=False, separators=(",", ":")) if profile else profile_raw
+    return FIT_PROMPT_TEMPLATE.format(
         decision_goal=str(preferences.get("decision_goal", "General decision-support (broad)")),
         risk_tolerance=str(preferences.get("risk_tolerance", "Medium")),
         prototype_horizon=str(preferences.get("prototype_horizon", "2–4 weeks (strict)")),
         detail_level=str(preferences.get("detail_level", "Standard")),
-        company_profile=profile_raw,
+        company_profile=company_profile,
     )
 
-    resp = client.responses.create(model="gpt-5-mini", input=prompt)
-    text = (resp.output_text or "").strip()
-    parsed = _safe_parse_json(text)
+
+def _fit_result(
+    company_name: str,
+    profile_raw: str,
+    preferences: Dict[str, Any],
+    text: str,
+    cache_key: str,
+) -> Dict[str, Any]:
+    text = (text or "").strip()
+    parsed, errors = parse_structured(text, FIT_SCHEMA)
+    if parsed is None:
+        # not JSON at all (structured output refused / truncated): salvage what we can
+        parsed = _safe_parse_json(text)
 
     if not isinstance(parsed, dict):
         parsed = {"raw": text}
@@ -230,6 +229,90 @@ def score_company_fit(
         "from_cache": False,
         "preferences": preferences,
     }
+    if errors:
+        result["fit_errors"] = errors
 
     cache_set_json("cache/fit", cache_key, result)
     return result
+
+
+def score_company_fit(
+    company_name: str,
+    profile_raw: str,
+    preferences: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True,
+    profile: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Decision suitability scoring for agentic decision-support (not outreach).
+    - profile: the parsed profile (build_company_profile()["profile"]); sent instead of profile_raw.
+    - Preferences influence the prompt (goal/risk/horizon/detail).
+    - Hard-guard clamps obvious local consumer services if user chose to exclude them.
+    - Cache is keyed by (version + company + profile hash + preferences hash).
+    """
+    preferences = preferences or {}
+    cache_key = _fit_cache_key(company_name, profile_raw, preferences)
+
+    if use_cache:
+        cached = cache_get_json("cache/fit", cache_key)
+        if cached:
+            cached["from_cache"] = True
+            return cached
+
+    resp = get_llm().create(input=_fit_prompt(profile_raw, preferences, profile), model="gpt-5-mini", text=FIT_FORMAT)
+    return _fit_result(company_name, profile_raw, preferences, resp.output_text, cache_key)
+
+
+def iter_score_company_fit(
+    company_name: str,
+    profile_raw: str,
+    preferences: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True,
+    profile: Optional[Dict[str, Any]] = None,
+    min_interval_s: float = STREAM_UPDATE_S,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming score_company_fit: while the model writes, yields
+    {"company_name", "fit": fields so far, "fit_raw": text so far, "partial": True};
+    the last item is the normalized, guarded and cached result.
+    """
+    preferences = preferences or {}
+    cache_key = _fit_cache_key(company_name, profile_raw, preferences)
+
+    if use_cache:
+        cached = cache_get_json("cache/fit", cache_key)
+        if cached:
+            cached["from_cache"] = True
+            yield cached
+            return
+
+    text = ""
+    deltas = get_llm().stream(input=_fit_prompt(profile_raw, preferences, profile), model="gpt-5-mini", text=FIT_FORMAT)
+    for fields, text in iter_partial_json(deltas, min_interval_s=min_interval_s):
+        yield {"company_name": company_name, "fit": fields, "fit_raw": text, "partial": True}
+    yield _fit_result(company_name, profile_raw, preferences, text, cache_key)
+
+
+def score_company_fits(
+    companies: List[Dict[str, str]],
+    preferences: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True,
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[int, Any], None]] = None,
+) -> List[Any]:
+    """
+    score_company_fit for many {company_name, profile_raw, profile?} at once (see llm.run_batch).
+    Results in input order; a failed company's slot holds the exception.
+    """
+    return run_batch(
+        lambda c: score_company_fit(
+            company_name=c["company_name"],
+            profile_raw=c["profile_raw"],
+            profile=c.get("profile"),
+            preferences=preferences,
+            use_cache=use_cache,
+        ),
+        companies,
+        workers=workers,
+        on_result=on_result,
+    )
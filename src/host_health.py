@@ -0,0 +1,270 @@
+# src/host_health.py
+"""
+Persistent per-host health for page fetching.
+
+- negative cache: URLs that failed (4xx, non-HTML, network error) are skipped until their TTL expires
+- circuit breaker: after BREAKER_THRESHOLD consecutive failures a host is skipped for a while;
+  the open period doubles on every repeated trip (capped). After it expires the breaker is
+  half-open: is_open() lets exactly one probe request through and keeps the host closed for
+  everyone else until that probe is recorded (or PROBE_TIMEOUT_S passes without an answer).
+- adaptive timeouts: per-host latency samples -> timeout ~ TIMEOUT_FACTOR * p95, clamped
+
+Stored as one JSON file (.cache/hosts/health.json) shared by all sessions / runs. save() merges
+with what other processes wrote in the meantime (per host the most recently updated record wins,
+negative-cache entries are unioned) instead of overwriting it.
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+
+HEALTH_PATH = os.path.join(".cache", "hosts", "health.json")
+
+# seconds a failed URL stays in the negative cache, by failure reason
+NEGATIVE_TTL_S = {
+    "http_4xx": 7 * 24 * 3600,
+    "not_html": 7 * 24 * 3600,
+    "http_429": 10 * 60,
+    "http_5xx": 30 * 60,
+    "error": 30 * 60,
+}
+# reasons that say something about the HOST (count towards the breaker)
+HOST_FAILURE_REASONS = {"http_5xx", "http_429", "error"}
+
+BREAKER_THRESHOLD = 3
+BREAKER_OPEN_S = 15 * 60
+BREAKER_MAX_OPEN_S = 6 * 3600
+# a half-open probe that never reports back (caller crashed) frees the slot after this long
+PROBE_TIMEOUT_S = 60.0
+
+LATENCY_SAMPLES = 50
+MIN_SAMPLES_FOR_ADAPTIVE = 5
+TIMEOUT_FACTOR = 3.0
+MIN_TIMEOUT_S = 3.0
+
+# write the file at most this often (every fetch would be too chatty)
+SAVE_INTERVAL_S = 5.0
+
+
+def _host(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+
+
+def _percentile(values: list[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    xs = sorted(values)
+    idx = min(len(xs) - 1, max(0, int(round(q * (len(xs) - 1)))))
+    return xs[idx]
+
+
+class HostHealth:
+    def __init__(self, path: str = HEALTH_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._hosts: dict[str, dict[str, Any]] = {}
+        self._negative: dict[str, dict[str, Any]] = {}
+        # host -> when its half-open probe was let through (per process, not persisted)
+        self._probes: dict[str, float] = {}
+        self._dirty = False
+        self._last_save = 0.0
+        self._load()
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def _read(self) -> dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            data = json.loads(open(self.path, "r", encoding="utf-8").read())
+        except Exception:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _load(self) -> None:
+        data = self._read()
+        self._hosts = dict(data.get("hosts") or {})
+        self._negative = dict(data.get("negative") or {})
+
+    def _merge_from_disk(self) -> None:
+        # other processes (batch jobs, other app sessions) write the same file
+        data = self._read()
+        for host, rec in (data.get("hosts") or {}).items():
+            mine = self._hosts.get(host)
+            if mine is None or float(rec.get("updated", 0)) > float(mine.get("updated", 0)):
+                self._hosts[host] = rec
+        for key, rec in (data.get("negative") or {}).items():
+            mine = self._negative.get(key)
+            if mine is None or float(rec.get("until", 0)) > float(mine.get("until", 0)):
+                self._negative[key] = rec
+
+    def save(self, force: bool = False) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            if not force and now - self._last_save < SAVE_INTERVAL_S:
+                return
+            self._merge_from_disk()
+            self._negative = {k: v for k, v in self._negative.items() if float(v.get("until", 0)) > now}
+            data = {"hosts": self._hosts, "negative": self._negative}
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(json.dumps(data, ensure_ascii=False))
+                os.replace(tmp, self.path)
+                self._dirty = False
+                self._last_save = now
+            except Exception:
+                pass
+
+    def _host_rec(self, host: str) -> dict[str, Any]:
+        rec = self._hosts.get(host)
+        if rec is None:
+            rec = {"ok": 0, "fail": 0, "consecutive_fail": 0, "trips": 0, "open_until": 0.0, "latencies": []}
+            self._hosts[host] = rec
+        return rec
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def negative_reason(self, url: str) -> Optional[str]:
+        """
+        Reason string if `url` is in the negative cache, else None.
+        """
+        with self._lock:
+            rec = self._negative.get(_url_key(url))
+            if not rec:
+                return None
+            if float(rec.get("until", 0)) <= time.time():
+                self._negative.pop(_url_key(url), None)
+                self._dirty = True
+                return None
+            return str(rec.get("reason") or "error")
+
+    def is_open(self, url_or_host: str) -> bool:
+        """
+        True while the host's breaker is open (requests should be skipped).
+        Half-open (open period over, no success since): the first caller gets False and must
+        report the outcome via record_success / record_failure; everyone else gets True until then.
+        """
+        host = _host(url_or_host) if "://" in url_or_host else url_or_host.lower()
+        now = time.time()
+        with self._lock:
+            rec = self._hosts.get(host)
+            open_until = float(rec.get("open_until", 0)) if rec else 0.0
+            if not open_until:
+                return False
+            if open_until > now:
+                return True
+            if now - self._probes.get(host, 0.0) < PROBE_TIMEOUT_S:
+                return True
+            self._probes[host] = now
+            return False
+
+    def latency_percentile(self, url_or_host: str, q: float) -> Optional[float]:
+        host = _host(url_or_host) if "://" in url_or_host else url_or_host.lower()
+        with self._lock:
+            rec = self._hosts.get(host)
+            if not rec or len(rec.get("latencies") or []) < MIN_SAMPLES_FOR_ADAPTIVE:
+                return None
+            return _percentile(rec["latencies"], q)
+
+    def timeout_for(self, url: str, default_s: float) -> float:
+        """
+        Adaptive timeout: TIMEOUT_FACTOR * p95 of observed latency, in [MIN_TIMEOUT_S, default_s].
+        Hosts without enough samples get default_s.
+        """
+        p95 = self.latency_percentile(url, 0.95)
+        if p95 is None:
+            return default_s
+        return max(MIN_TIMEOUT_S, min(float(default_s), p95 * TIMEOUT_FACTOR))
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+    @staticmethod
+    def _close_breaker(rec: dict[str, Any], latency_s: Optional[float]) -> None:
+        rec["consecutive_fail"] = 0
+        rec["trips"] = 0
+        rec["open_until"] = 0.0
+        if latency_s is not None:
+            lat = rec.setdefault("latencies", [])
+            lat.append(round(float(latency_s), 3))
+            del lat[:-LATENCY_SAMPLES]
+
+    def record_success(self, url: str, latency_s: Optional[float] = None) -> None:
+        with self._lock:
+            host = _host(url)
+            rec = self._host_rec(host)
+            rec["ok"] += 1
+            self._close_breaker(rec, latency_s)
+            rec["updated"] = time.time()
+            self._probes.pop(host, None)
+            self._dirty = True
+        self.save()
+
+    def record_failure(self, url: str, reason: str, latency_s: Optional[float] = None) -> None:
+        """
+        reason: one of NEGATIVE_TTL_S keys. Host-level reasons also feed the circuit breaker;
+        the others mean the host answered (latency_s = how fast), only this URL is useless.
+        """
+        now = time.time()
+        with self._lock:
+            ttl = NEGATIVE_TTL_S.get(reason, NEGATIVE_TTL_S["error"])
+            self._negative[_url_key(url)] = {"url": url, "reason": reason, "until": now + ttl}
+
+            host = _host(url)
+            rec = self._host_rec(host)
+            rec["updated"] = now
+            self._probes.pop(host, None)
+            if reason in HOST_FAILURE_REASONS:
+                rec["fail"] += 1
+                rec["consecutive_fail"] += 1
+                if rec["consecutive_fail"] >= BREAKER_THRESHOLD:
+                    open_s = min(BREAKER_MAX_OPEN_S, BREAKER_OPEN_S * (2 ** int(rec.get("trips", 0))))
+                    rec["open_until"] = now + open_s
+                    rec["trips"] = int(rec.get("trips", 0)) + 1
+                    # half-open afterwards: one more failure re-trips immediately
+                    rec["consecutive_fail"] = BREAKER_THRESHOLD - 1
+            else:
+                self._close_breaker(rec, latency_s)
+            self._dirty = True
+        self.save()
+
+    def stats(self) -> dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            return {
+                "hosts": len(self._hosts),
+                "open_breakers": sorted(h for h, r in self._hosts.items() if float(r.get("open_until", 0)) > now),
+                "negative_urls": sum(1 for v in self._negative.values() if float(v.get("until", 0)) > now),
+            }
+
+
+_health: Optional[HostHealth] = None
+_health_lock = threading.Lock()
+
+
+def get_host_health() -> HostHealth:
+    global _health
+    if _health is None:
+        with _health_lock:
+            if _health is None:
+                _health = HostHealth()
+                atexit.register(_health.save, True)
+    return _health
@@ -0,0 +1,332 @@
+# src/http_cache.py
+"""
+Disk cache for fetched HTML pages.
+
+Layout (content-addressed):
+- index/{url_key}.json   URL -> metadata (fetch time, final URL, status, content type,
+                         ETag / Last-Modified) + the blob hash of the body
+- blobs/{h[:2]}/{h}.html.zst|.gz   compressed page body, stored once per distinct content
+
+Identical pages under different URLs share one blob. Old flat entries
+({url_key}.html + {url_key}.json) are still read; migrate_legacy_entries() converts them.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+try:
+    import zstandard  # optional, better ratio + much faster than gzip
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+HTTP_CACHE_DIR = os.path.join(".cache", "http")
+
+# entries older than this are revalidated before use (None = never expire)
+HTTP_CACHE_TTL_S: Optional[float] = 7 * 24 * 3600
+
+# "zstd" (needs the zstandard package) or "gzip"
+HTTP_CACHE_CODEC = "zstd" if zstandard is not None else "gzip"
+# zstd: 1-22, gzip: 1-9
+HTTP_CACHE_LEVEL = 6
+
+_CODEC_EXT = {"zstd": ".zst", "gzip": ".gz"}
+# gc_blobs leaves younger blobs alone: store_entry writes the blob before its index entry
+GC_GRACE_S = 600
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    html: str
+    fetched_at: float
+    final_url: str = ""
+    status: int = 200
+    content_type: str = ""
+    etag: str = ""
+    last_modified: str = ""
+
+    def age_s(self) -> float:
+        return max(0.0, time.time() - self.fetched_at)
+
+    def is_fresh(self, ttl_s: Optional[float]) -> bool:
+        if ttl_s is None:
+            return True
+        return self.age_s() <= ttl_s
+
+    def validator_headers(self) -> dict[str, str]:
+        h: dict[str, str] = {}
+        if self.etag:
+            h["If-None-Match"] = self.etag
+        if self.last_modified:
+            h["If-Modified-Since"] = self.last_modified
+        return h
+
+
+def _cache_dir(*parts: str) -> str:
+    d = os.path.join(HTTP_CACHE_DIR, *parts)
+    os.makedirs(d, exist_ok=True)
+    return d
+
+
+def cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+
+
+def _index_path(url: str) -> str:
+    return os.path.join(_cache_dir("index"), f"{cache_key(url)}.json")
+
+
+def _blob_path(blob: str, codec: str) -> str:
+    return os.path.join(_cache_dir("blobs", blob[:2]), f"{blob}.html{_CODEC_EXT.get(codec, '.gz')}")
+
+
+def _legacy_html_path(url: str) -> str:
+    return os.path.join(HTTP_CACHE_DIR, f"{cache_key(url)}.html")
+
+
+def _legacy_meta_path(url: str) -> str:
+    return os.path.join(HTTP_CACHE_DIR, f"{cache_key(url)}.json")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    # unique temp name per write: threads storing the same blob / URL must not share one
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _compress(raw: bytes, codec: str, level: int) -> bytes:
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=level).compress(raw)
+    return gzip.compress(raw, compresslevel=max(1, min(9, level)))
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd blob in cache but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _put_blob(html: str) -> tuple[str, str]:
+    """
+    Store a page body once per distinct content. Returns (blob hash, codec).
+    """
+    raw = html.encode("utf-8")
+    blob = hashlib.sha256(raw).hexdigest()
+    for codec in _CODEC_EXT:
+        if os.path.exists(_blob_path(blob, codec)):
+            return blob, codec
+    codec = HTTP_CACHE_CODEC if HTTP_CACHE_CODEC in _CODEC_EXT else "gzip"
+    if codec == "zstd" and zstandard is None:
+        codec = "gzip"
+    _write_atomic(_blob_path(blob, codec), _compress(raw, codec, HTTP_CACHE_LEVEL))
+    return blob, codec
+
+
+def _get_blob(blob: str, codec: str) -> Optional[str]:
+    p = _blob_path(blob, codec)
+    if not os.path.exists(p):
+        return None
+    try:
+        return _decompress(open(p, "rb").read(), codec).decode("utf-8", errors="ignore")
+    except Exception:
+        return None
+
+
+def _read_json(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        obj = json.loads(open(path, "r", encoding="utf-8").read())
+        return obj if isinstance(obj, dict) else {}
+    except Exception:
+        return {}
+
+
+def _meta_dict(entry: CacheEntry, blob: str, codec: str) -> dict[str, Any]:
+    meta = asdict(entry)
+    meta.pop("html", None)
+    meta["blob"] = blob
+    meta["codec"] = codec
+    return meta
+
+
+def _entry_from_meta(url: str, html: str, meta: dict, fallback_fetched_at: float) -> CacheEntry:
+    try:
+        fetched_at = float(meta.get("fetched_at") or fallback_fetched_at)
+    except Exception:
+        fetched_at = 0.0
+
+    return CacheEntry(
+        url=url,
+        html=html,
+        fetched_at=fetched_at,
+        final_url=str(meta.get("final_url") or url),
+        status=int(meta.get("status") or 200),
+        content_type=str(meta.get("content_type") or ""),
+        etag=str(meta.get("etag") or ""),
+        last_modified=str(meta.get("last_modified") or ""),
+    )
+
+
+def _load_legacy(url: str) -> Optional[CacheEntry]:
+    hp = _legacy_html_path(url)
+    if not os.path.exists(hp):
+        return None
+    try:
+        html = open(hp, "r", encoding="utf-8", errors="ignore").read()
+        mtime = os.path.getmtime(hp)
+    except Exception:
+        return None
+    return _entry_from_meta(url, html, _read_json(_legacy_meta_path(url)), mtime)
+
+
+def load_entry(url: str) -> Optional[CacheEntry]:
+    """
+    Read a cached page (index -> blob, decompressed transparently).
+    Old flat entries without metadata get their file mtime as fetch time and no validators.
+    """
+    meta = _read_json(_index_path(url))
+    blob = str(meta.get("blob") or "")
+    if blob:
+        html = _get_blob(blob, str(meta.get("codec") or "gzip"))
+        if html is not None:
+            return _entry_from_meta(url, html, meta, 0.0)
+    return _load_legacy(url)
+
+
+def _write_index(entry: CacheEntry, blob: str, codec: str) -> None:
+    data = json.dumps(_meta_dict(entry, blob, codec), ensure_ascii=False, indent=2)
+    _write_atomic(_index_path(entry.url), data.encode("utf-8"))
+
+
+def store_entry(entry: CacheEntry) -> bool:
+    """
+    Write a page to the cache. Returns False if the disk write failed (full disk, permissions):
+    the cache is best-effort, so I/O errors don't fail the fetch. Other errors propagate.
+    """
+    try:
+        blob, codec = _put_blob(entry.html)
+        _write_index(entry, blob, codec)
+    except OSError:
+        return False
+    return True
+
+
+def touch_entry(entry: CacheEntry, etag: str = "", last_modified: str = "") -> None:
+    """
+    Mark an entry as freshly revalidated (after a 304). Body stays untouched.
+    """
+    entry.fetched_at = time.time()
+    if etag:
+        entry.etag = etag
+    if last_modified:
+        entry.last_modified = last_modified
+
+    meta = _read_json(_index_path(entry.url))
+    if meta.get("blob"):
+        try:
+            _write_index(entry, str(meta["blob"]), str(meta.get("codec") or "gzip"))
+        except OSError:
+            pass
+    else:
+        # legacy entry: moving it into the blob store is as cheap as rewriting its sidecar
+        store_entry(entry)
+
+
+# ----------------------------
+# Maintenance
+# ----------------------------
+def migrate_legacy_entries(delete_old: bool = True) -> int:
+    """
+    Move flat {key}.html (+ {key}.json) entries into the blob store.
+    Legacy files don't record their URL, so entries are re-keyed by the same url_key.
+    Returns the number of migrated entries.
+    """
+    if not os.path.isdir(HTTP_CACHE_DIR):
+        return 0
+
+    n = 0
+    for name in sorted(os.listdir(HTTP_CACHE_DIR)):
+        if not name.endswith(".html"):
+            continue
+        key = name[: -len(".html")]
+        hp = os.path.join(HTTP_CACHE_DIR, name)
+        mp = os.path.join(HTTP_CACHE_DIR, f"{key}.json")
+        try:
+            html = open(hp, "r", encoding="utf-8", errors="ignore").read()
+            meta = _read_json(mp)
+            fetched_at = float(meta.get("fetched_at") or os.path.getmtime(hp))
+            blob, codec = _put_blob(html)
+            meta.update({"fetched_at": fetched_at, "blob": blob, "codec": codec})
+            meta.setdefault("url", "")
+            index_path = os.path.join(_cache_dir("index"), f"{key}.json")
+            _write_atomic(index_path, json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8"))
+        except Exception:
+            continue
+        if delete_old:
+            for p in (hp, mp):
+                try:
+                    if os.path.exists(p):
+                        os.remove(p)
+                except Exception:
+                    pass
+        n += 1
+    return n
+
+
+def gc_blobs(grace_s: float = GC_GRACE_S) -> int:
+    """
+    Delete blobs no index entry points to. Returns the number of removed blobs.
+    Temp files of writes in progress and blobs younger than grace_s (their index entry may
+    not be written yet) are kept, so gc can run while fetches are going on.
+    """
+    blobs_dir = os.path.join(HTTP_CACHE_DIR, "blobs")
+    index_dir = os.path.join(HTTP_CACHE_DIR, "index")
+    if not os.path.isdir(blobs_dir):
+        return 0
+
+    live: set[str] = set()
+    if os.path.isdir(index_dir):
+        for name in os.listdir(index_dir):
+            if name.endswith(".json"):
+                blob = _read_json(os.path.join(index_dir, name)).get("blob")
+                if blob:
+                    live.add(str(blob))
+
+    removed = 0
+    cutoff = time.time() - grace_s
+    for root, _, files in os.walk(blobs_dir):
+        for name in files:
+            if ".tmp" in name:
+                continue
+            blob = name.split(".", 1)[0]
+            if blob in live:
+                continue
+            path = os.path.join(root, name)
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                os.remove(path)
+                removed += 1
+            except Exception:
+                pass
+    return removed
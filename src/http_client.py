@@ -0,0 +1,370 @@
+# src/http_client.py
+"""
+Process-wide HTTP client shared by web.py and discovery.py.
+
+One requests.Session with per-host urllib3 connection pools, so the homepage,
+/about, /team and /impressum of the same host reuse one keep-alive connection
+instead of paying a new TCP+TLS handshake per page.
+
+Tail latency:
+- RetryPolicy: exponential backoff with full jitter for resets, 5xx and 429 (honours Retry-After)
+- HedgePolicy: if the first attempt hasn't answered after the host's p90 latency (counted from
+  when it got its scheduler slot), fire one duplicate and take whichever answers first;
+  duplicates are capped at a share of all requests
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .host_health import get_host_health
+from .ratelimit import current_caller, get_scheduler
+
+
+# ----------------------------
+# Config
+# ----------------------------
+# number of distinct hosts to keep pools for
+POOL_CONNECTIONS = 64
+# max idle keep-alive connections kept per host
+POOL_MAXSIZE = 16
+# block (instead of opening throwaway connections) when a host pool is exhausted
+POOL_BLOCK = False
+# threads for hedged requests (a primary + at most one duplicate each); see ensure_hedge_workers
+HEDGE_POOL_WORKERS = 128
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay_s: float = 0.5
+    max_delay_s: float = 8.0
+    retry_statuses: tuple[int, ...] = (429, 500, 502, 503, 504)
+    # a server asking us to wait longer than this is treated as a final answer
+    max_retry_after_s: float = 30.0
+
+    def backoff(self, attempt: int, retry_after_s: Optional[float] = None) -> float:
+        if retry_after_s is not None:
+            return max(0.0, retry_after_s) + random.uniform(0, self.base_delay_s)
+        # full jitter
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * (2 ** attempt)))
+
+
+@dataclass
+class HedgePolicy:
+    enabled: bool = True
+    # fixed hedge delay; None = the host's observed p90 latency (see host_health)
+    delay_s: Optional[float] = None
+    # used when delay_s is None and the host has no latency history yet (None = don't hedge)
+    fallback_delay_s: Optional[float] = None
+    min_delay_s: float = 0.25
+    # duplicates may be at most this share of all requests sent
+    budget_ratio: float = 0.1
+
+    def delay_for(self, url: str) -> Optional[float]:
+        if not self.enabled:
+            return None
+        d = self.delay_s
+        if d is None:
+            d = get_host_health().latency_percentile(url, 0.9)
+        if d is None:
+            d = self.fallback_delay_s
+        if d is None:
+            return None
+        return max(self.min_delay_s, float(d))
+
+
+DEFAULT_RETRY = RetryPolicy()
+NO_RETRY = RetryPolicy(max_attempts=1)
+NO_HEDGE = HedgePolicy(enabled=False)
+
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_adapter: Optional[HTTPAdapter] = None
+_requests_sent = 0
+_retries = 0
+_hedges_sent = 0
+_hedges_won = 0
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _build_session() -> tuple[requests.Session, HTTPAdapter]:
+    s = requests.Session()
+    s.headers.update({"User-Agent": DEFAULT_USER_AGENT})
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=POOL_BLOCK,
+        max_retries=0,
+    )
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s, adapter
+
+
+def get_session() -> requests.Session:
+    """
+    Lazily create the shared session (thread-safe).
+    """
+    global _session, _adapter
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session, _adapter = _build_session()
+    return _session
+
+
+def configure_http(
+    pool_connections: Optional[int] = None,
+    pool_maxsize: Optional[int] = None,
+    pool_block: Optional[bool] = None,
+) -> None:
+    """
+    Change pool sizes. Replaces the shared session; in-flight requests on the old one finish normally.
+    """
+    global POOL_CONNECTIONS, POOL_MAXSIZE, POOL_BLOCK, _session, _adapter
+    with _lock:
+        if pool_connections is not None:
+            POOL_CONNECTIONS = max(1, int(pool_connections))
+        if pool_maxsize is not None:
+            POOL_MAXSIZE = max(1, int(pool_maxsize))
+        if pool_block is not None:
+            POOL_BLOCK = bool(pool_block)
+        old = _session
+        _session, _adapter = _build_session()
+    if old is not None:
+        old.close()
+
+
+def _send(
+    url: str,
+    headers: Optional[dict[str, str]],
+    timeout_s: float,
+    caller: str,
+    kwargs: dict,
+    started: Optional[threading.Event] = None,
+) -> requests.Response:
+    global _requests_sent
+    with _lock:
+        _requests_sent += 1
+    with get_scheduler().slot(url, caller=caller):
+        if started is not None:
+            started.set()
+        return get_session().get(url, headers=headers, timeout=timeout_s, **kwargs)
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_POOL_WORKERS, thread_name_prefix="http-hedge")
+    return _hedge_pool
+
+
+def ensure_hedge_workers(concurrency: int) -> None:
+    """
+    Make room for `concurrency` hedged requests in flight at once (a primary and a duplicate
+    each), so the hedge pool never caps a batch below its own concurrency.
+    """
+    global HEDGE_POOL_WORKERS, _hedge_pool
+    with _lock:
+        need = 2 * max(1, int(concurrency))
+        if need <= HEDGE_POOL_WORKERS:
+            return
+        HEDGE_POOL_WORKERS = need
+        old, _hedge_pool = _hedge_pool, None
+    if old is not None:
+        old.shutdown(wait=False)  # queued requests still run on the old threads
+
+
+def _take_hedge_token(policy: HedgePolicy) -> bool:
+    global _hedges_sent
+    with _lock:
+        # +1 so the very first slow request of a run may hedge too
+        if _hedges_sent + 1 > policy.budget_ratio * _requests_sent + 1:
+            return False
+        _hedges_sent += 1
+        return True
+
+
+def _close_quietly(f: Future) -> None:
+    try:
+        if f.exception() is None:
+            f.result().close()
+    except Exception:
+        pass
+
+
+def _send_hedged(
+    url: str,
+    headers: Optional[dict[str, str]],
+    timeout_s: float,
+    caller: str,
+    kwargs: dict,
+    policy: HedgePolicy,
+) -> requests.Response:
+    global _hedges_won
+    delay = policy.delay_for(url)
+    if delay is None or delay >= timeout_s:
+        return _send(url, headers, timeout_s, caller, kwargs)
+
+    pool = _get_hedge_pool()
+    started = threading.Event()
+    primary = pool.submit(_send, url, headers, timeout_s, caller, kwargs, started)
+    primary.add_done_callback(lambda _: started.set())
+    # the hedge delay counts from when the request is on the wire: time queued in the pool
+    # or waiting for a scheduler slot says nothing about the host being slow
+    started.wait()
+    done, _ = wait([primary], timeout=delay)
+    if done or not _take_hedge_token(policy):
+        return primary.result()
+
+    hedge = pool.submit(_send, url, headers, timeout_s, caller, kwargs)
+    pending = {primary, hedge}
+    first_exc: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        winner = next((f for f in done if f.exception() is None), None)
+        if winner is None:
+            first_exc = first_exc or next(iter(done)).exception()
+            continue
+        # the loser is closed whenever it finishes (or right away if it already has)
+        for f in (done | pending) - {winner}:
+            f.add_done_callback(_close_quietly)
+        if winner is hedge:
+            with _lock:
+                _hedges_won += 1
+        return winner.result()
+    raise first_exc  # type: ignore[misc]
+
+
+def response_latency_s(r: requests.Response) -> float:
+    """
+    Network time of the attempt that produced `r` (request sent -> headers received, redirects
+    included); excludes scheduler queueing and retry backoff, unlike timing around http_get.
+    """
+    total = r.elapsed.total_seconds() if r.elapsed is not None else 0.0
+    return total + sum(h.elapsed.total_seconds() for h in r.history if h.elapsed is not None)
+
+
+def _retry_after_s(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def http_get(
+    url: str,
+    headers: Optional[dict[str, str]] = None,
+    timeout_s: float = 12,
+    caller: Optional[str] = None,
+    retry: Optional[RetryPolicy] = None,
+    hedge: Optional[HedgePolicy] = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """
+    GET through the shared pooled session. Raises like requests.get does.
+    Paced by the process-wide politeness scheduler (ratelimit.py): per-host + global
+    rate limits and a per-host concurrency cap. With stream=True the slot covers the
+    request until headers arrive; body reads happen outside it.
+    retry (default DEFAULT_RETRY) re-sends on connection resets and retry_statuses;
+    timeouts are NOT retried (host_health already shortens them for slow hosts).
+    hedge (default off) sends one duplicate after the hedge delay, see HedgePolicy.
+    After the last attempt a 5xx/429 response is returned as-is.
+    """
+    global _retries
+    policy = retry or DEFAULT_RETRY
+    who = caller or current_caller()
+    kwargs.setdefault("allow_redirects", True)
+
+    attempt = 0
+    while True:
+        try:
+            if hedge is not None and hedge.enabled:
+                r = _send_hedged(url, headers, timeout_s, who, kwargs, hedge)
+            else:
+                r = _send(url, headers, timeout_s, who, kwargs)
+        except requests.Timeout:
+            raise
+        except requests.ConnectionError:
+            if attempt + 1 >= policy.max_attempts:
+                raise
+            time.sleep(policy.backoff(attempt))
+            attempt += 1
+            with _lock:
+                _retries += 1
+            continue
+
+        if r.status_code in policy.retry_statuses and attempt + 1 < policy.max_attempts:
+            ra = _retry_after_s(r.headers.get("retry-after"))
+            if ra is not None and ra > policy.max_retry_after_s:
+                return r
+            r.close()
+            time.sleep(policy.backoff(attempt, ra))
+            attempt += 1
+            with _lock:
+                _retries += 1
+            continue
+        return r
+
+
+def http_pool_stats() -> dict[str, Any]:
+    """
+    Counters for connection reuse.
+    - requests: requests sent through the shared session
+    - connections_opened: new TCP(+TLS) connections across all host pools
+    - connections_reused: requests served on an already open connection
+    """
+    with _lock:
+        adapter = _adapter
+        sent = _requests_sent
+        retries = _retries
+        hedges_sent = _hedges_sent
+        hedges_won = _hedges_won
+
+    hosts: dict[str, dict[str, int]] = {}
+    if adapter is not None:
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{pool.scheme}://{pool.host}"
+            h = hosts.setdefault(host, {"requests": 0, "connections_opened": 0})
+            h["requests"] += int(getattr(pool, "num_requests", 0))
+            h["connections_opened"] += int(getattr(pool, "num_connections", 0))
+
+    pooled_requests = sum(h["requests"] for h in hosts.values())
+    opened = sum(h["connections_opened"] for h in hosts.values())
+    return {
+        "requests": sent,
+        "connections_opened": opened,
+        "connections_reused": max(0, pooled_requests - opened),
+        "retries": retries,
+        "hedges_sent": hedges_sent,
+        "hedges_won": hedges_won,
+        "hosts": hosts,
+        "pool_connections": POOL_CONNECTIONS,
+        "pool_maxsize": POOL_MAXSIZE,
+    }
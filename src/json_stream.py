@@ -0,0 +1,149 @@
+# src/json_stream.py
+"""
+Incremental JSON parser for streamed model output.
+
+feed() text chunks as they arrive; `value` is always the largest prefix of the object that
+is valid JSON once closed: completed fields appear as soon as their value is complete, the
+string currently being written is included as far as it got (partial_strings=True).
+
+The scanner keeps its state between chunks (each character is looked at once) and remembers
+the last position where the prefix can be closed, plus the brackets needed to close it; a
+snapshot is only re-parsed when that position moved. Text before the first "{" (``` fences,
+"Here is the JSON:") and after the closing "}" is ignored.
+"""
+from __future__ import annotations
+
+import json
+import re
+import time
+from typing import Any, Iterable, Iterator, Optional
+
+
+_CLOSE = {"{": "}", "[": "]"}
+# unfinished escape at the end of the buffer: "\" or "\u" + < 4 hex digits (after an even run of "\")
+_DANGLING_ESCAPE_RE = re.compile(r"(?<!\\)(?:\\\\)*(\\(?:u[0-9a-fA-F]{0,3})?)$")
+
+
+class JSONStreamParser:
+    def __init__(self, partial_strings: bool = True):
+        self.partial_strings = partial_strings
+        self.buf = ""
+        self.value: dict[str, Any] = {}
+        self.done = False
+        self._pos = 0
+        self._root = -1
+        # container stack: [bracket, expecting_key] (expecting_key only meaningful for "{")
+        self._stack: list[list[Any]] = []
+        self._in_string = False
+        self._string_is_value = False
+        self._escape = False
+        self._string_start = 0
+        # last closable prefix: (end index into buf, closing brackets)
+        self._cut: Optional[tuple[int, str]] = None
+        self._parsed_cut: Optional[tuple[int, str]] = None
+
+    def _closers(self) -> str:
+        return "".join(_CLOSE[f[0]] for f in reversed(self._stack))
+
+    def _scan(self) -> None:
+        buf = self.buf
+        i = self._pos
+        n = len(buf)
+        while i < n and not self.done:
+            ch = buf[i]
+            if self._root < 0:
+                if ch == "{":
+                    self._root = i
+                    self._stack.append(["{", True])
+                    self._cut = (i + 1, "}")
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._string_is_value:
+                        self._cut = (i + 1, self._closers())
+                i += 1
+                continue
+
+            top = self._stack[-1]
+            if ch == '"':
+                self._in_string = True
+                self._string_is_value = not (top[0] == "{" and top[1])
+                self._string_start = i
+            elif ch in "{[":
+                self._stack.append([ch, True])
+                self._cut = (i + 1, self._closers())
+            elif ch in "}]":
+                self._stack.pop()
+                if not self._stack:
+                    self.done = True
+                    self._cut = (i + 1, "")
+                else:
+                    self._cut = (i + 1, self._closers())
+            elif ch == ":":
+                top[1] = False
+            elif ch == ",":
+                # everything before the comma is a complete member / element
+                self._cut = (i, self._closers())
+                if top[0] == "{":
+                    top[1] = True
+            i += 1
+        self._pos = i
+
+    def _partial_string_cut(self) -> Optional[tuple[int, str]]:
+        """
+        Close the value string that is still being written (minus a half-written escape).
+        """
+        if not (self.partial_strings and self._in_string and self._string_is_value):
+            return None
+        start = self._string_start + 1
+        # only the tail can hold a half-written escape; don't rescan the whole string per chunk
+        m = _DANGLING_ESCAPE_RE.search(self.buf, max(start, len(self.buf) - 16))
+        end = m.start(1) if m else len(self.buf)
+        return end, '"' + self._closers()
+
+    def feed(self, chunk: str) -> dict[str, Any]:
+        if self.done or not chunk:
+            return self.value
+        self.buf += chunk
+        self._scan()
+        cut = self._partial_string_cut() or self._cut
+        if cut is None or cut == self._parsed_cut:
+            return self.value
+        try:
+            obj = json.loads(self.buf[self._root : cut[0]] + cut[1])
+        except ValueError:
+            return self.value
+        if isinstance(obj, dict):
+            self.value = obj
+            self._parsed_cut = cut
+        return self.value
+
+
+def iter_partial_json(
+    chunks: Iterable[str],
+    min_interval_s: float = 0.0,
+    partial_strings: bool = True,
+) -> Iterator[tuple[dict[str, Any], str]]:
+    """
+    Yield (partial object, text so far) whenever the parsed object changed, at most every
+    `min_interval_s` (UI redraws). The last item is always the final state.
+    """
+    parser = JSONStreamParser(partial_strings=partial_strings)
+    text = ""
+    last: Optional[dict[str, Any]] = None
+    last_t = 0.0
+    for chunk in chunks:
+        text += chunk
+        value = parser.feed(chunk)
+        now = time.monotonic()
+        if value != last and now - last_t >= min_interval_s:
+            last, last_t = value, now
+            yield value, text
+    yield parser.value, text
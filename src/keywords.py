@@ -0,0 +1,156 @@
+# src/keywords.py
+"""
+Precompiled multi-keyword matcher shared by discovery, fit, filtering and crawl.
+
+All keywords of a list go into ONE regex built from a prefix trie (shared prefixes are
+factored out, greedy optional groups make it prefer the longest keyword at each position).
+After a hit at position i the scan resumes at i + 1 (so overlapping keywords are found), and
+keywords that are prefixes of a longer hit at the same position are added from a precomputed
+table - one left-to-right pass yields exactly the set of keywords a `k in text` loop would find.
+Between hits sre's first-character scan skips text that can't start any keyword.
+
+For short lists plain `k in text` (memchr-fast C) still wins - measured on 20 KB page texts
+the regex only overtakes it at ~100 keywords - so below REGEX_MIN_KEYWORDS the matcher keeps
+a prebuilt, lowercased, deduplicated tuple and scans that instead. Either way keywords are
+normalized once at build time instead of on every call.
+
+Semantics kept from the old per-keyword loops:
+- plain substring matching on lowercased text (word_boundary=True for whole words)
+- duplicate keywords in a list count once per occurrence in the list (weight)
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Iterable, Optional, Union
+
+
+KeywordSpec = Union[str, tuple[str, int]]
+
+# below this many distinct keywords a linear `in` scan is faster than the trie regex
+REGEX_MIN_KEYWORDS = 100
+
+
+def _trie_pattern(words: list[str]) -> str:
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: dict) -> str:
+        end = "" in node
+        branches = []
+        for ch, child in sorted(node.items()):
+            if ch == "":
+                continue
+            # walk single-child chains without recursing (keeps depth = number of branch points)
+            run = [ch]
+            while len(child) == 1 and "" not in child:
+                (c, child), = child.items()
+                run.append(c)
+            branches.append(re.escape("".join(run)) + build(child))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            # greedy: try the longer keyword first, fall back to the one ending here
+            return f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[KeywordSpec], word_boundary: bool = False):
+        """
+        keywords: strings (weight 1 each) or (keyword, weight) pairs. Repeated keywords add up.
+        """
+        self.word_boundary = word_boundary
+        self.weights: dict[str, int] = {}
+        for spec in keywords:
+            k, w = (spec, 1) if isinstance(spec, str) else spec
+            k = (k or "").strip().lower()
+            if k:
+                self.weights[k] = self.weights.get(k, 0) + int(w)
+        self._order = {k: i for i, k in enumerate(self.weights)}
+
+        words = sorted(self.weights)
+        # keywords that are a strict prefix of another keyword
+        self._prefixes: dict[str, list[str]] = {
+            w: [p for p in words if p != w and w.startswith(p)] for w in words
+        }
+
+        self._words = tuple(words)
+        self._re: Optional[re.Pattern[str]] = None
+        if words and (word_boundary or len(words) >= REGEX_MIN_KEYWORDS):
+            core = _trie_pattern(words)
+            if word_boundary:
+                core = rf"(?<!\w)(?:{core})(?!\w)"
+            self._re = re.compile(core)
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def _at_boundary(self, text: str, end: int) -> bool:
+        return end >= len(text) or not (text[end].isalnum() or text[end] == "_")
+
+    def hit_set(self, text: str) -> set[str]:
+        """
+        All keywords occurring in `text` (lowercased keywords).
+        """
+        if not self._words or not text:
+            return set()
+        t = text.lower()
+        if self._re is None:
+            return {k for k in self._words if k in t}
+        search = self._re.search
+        found: set[str] = set()
+        m = search(t)
+        while m is not None:
+            w = m.group()
+            start = m.start()
+            if w not in found or self._prefixes[w]:
+                found.add(w)
+                for p in self._prefixes[w]:
+                    if not self.word_boundary or self._at_boundary(t, start + len(p)):
+                        found.add(p)
+                if len(found) == len(self.weights):
+                    break
+            m = search(t, start + 1)
+        return found
+
+    def hits(self, text: str) -> list[str]:
+        """
+        Keywords occurring in `text`, in the order they were given.
+        """
+        return sorted(self.hit_set(text), key=self._order.__getitem__)
+
+    def count(self, text: str) -> int:
+        """
+        Number of keyword-list entries found (a keyword listed twice counts twice).
+        """
+        return self.score(text)
+
+    def score(self, text: str) -> int:
+        """
+        Sum of the weights of all keywords found.
+        """
+        return sum(self.weights[k] for k in self.hit_set(text))
+
+    def any(self, text: str) -> bool:
+        if not self._words or not text:
+            return False
+        t = text.lower()
+        if self._re is None:
+            return any(k in t for k in self._words)
+        return self._re.search(t) is not None
+
+
+@lru_cache(maxsize=256)
+def keyword_matcher(keywords: tuple[KeywordSpec, ...], word_boundary: bool = False) -> KeywordMatcher:
+    """
+    Cached matcher for ad-hoc keyword lists (user-supplied industry keywords etc.).
+    """
+    return KeywordMatcher(keywords, word_boundary=word_boundary)
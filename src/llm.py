@@ -0,0 +1,356 @@
+# src/llm.py
+"""
+Shared, rate-limited LLM client for research.py and fit.py.
+
+- one backend for the process (llm_backends: OpenAI or the offline fake), created on the
+  first call and chosen by LLM_BACKEND; backend-level retries are off, retries happen here
+- requests-per-minute and tokens-per-minute token buckets (ratelimit.TokenBucket) holding a
+  full minute's allowance; a call reserves its estimated tokens (prompt + running average of
+  real output usage) up front and the reservation is corrected with the real usage once the
+  response is in
+- concurrency cap on calls in flight
+- 429 / 5xx / connection errors: retried with RetryPolicy backoff; a 429 pauses ALL calls
+  for the time the server asks for (retry-after, x-ratelimit-reset-*)
+- stream(): the same, yielding output text deltas as they arrive
+- run_batch(): run many calls concurrently, results in input order
+
+Limits default to LLM_RPM / LLM_TPM / LLM_CONCURRENCY from the environment.
+"""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+from .http_client import RetryPolicy
+from .llm_backends import LLMBackend, backend_from_env, is_connection_error
+from .ratelimit import TokenBucket, bind_caller
+from .tokens import estimate_tokens
+
+
+DEFAULT_MODEL = "gpt-5-mini"
+# output tokens reserved per call before any call has finished (reasoning + JSON answer);
+# afterwards the running average of real output usage is reserved instead
+DEFAULT_OUTPUT_TOKENS = 2000
+# weight of the newest call in the running output average
+OUTPUT_EMA_ALPHA = 0.2
+LLM_RETRY = RetryPolicy(max_attempts=5, base_delay_s=1.0, max_delay_s=30.0, max_retry_after_s=60.0)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+@dataclass
+class LLMLimits:
+    rpm: float = field(default_factory=lambda: _env_float("LLM_RPM", 500))
+    tpm: float = field(default_factory=lambda: _env_float("LLM_TPM", 200_000))
+    concurrency: int = field(default_factory=lambda: int(_env_float("LLM_CONCURRENCY", 16)))
+    # bucket size in seconds of rate: how much may go out at once after an idle period
+    # (60 = the full per-minute allowance, which is the window the provider counts in)
+    burst_s: float = 60.0
+
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_S = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_duration_s(value: str) -> Optional[float]:
+    """
+    OpenAI reset headers: "1s", "6m0s", "20ms", "0.5s"; retry-after: plain seconds.
+    """
+    v = (value or "").strip()
+    if not v:
+        return None
+    try:
+        return float(v)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(v)
+    if not parts:
+        return None
+    return sum(float(n) * _UNIT_S[u] for n, u in parts)
+
+
+def _server_wait_s(exc: Exception) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return float(ms) / 1000.0
+        except ValueError:
+            pass
+    waits = [
+        _parse_duration_s(headers.get(h) or "")
+        for h in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+    ]
+    waits = [w for w in waits if w is not None]
+    return max(waits) if waits else None
+
+
+def _is_retryable(exc: Exception, policy: RetryPolicy) -> bool:
+    if is_connection_error(exc):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status == 429 and getattr(exc, "code", None) == "insufficient_quota":
+        return False  # billing, not rate: waiting won't help
+    return status in policy.retry_statuses
+
+
+def _usage(resp: Any, field_name: str) -> Optional[float]:
+    n = getattr(getattr(resp, "usage", None), field_name, None)
+    return float(n) if isinstance(n, (int, float)) else None
+
+
+class LLMClient:
+    def __init__(
+        self,
+        limits: Optional[LLMLimits] = None,
+        retry: Optional[RetryPolicy] = None,
+        backend: Optional[LLMBackend] = None,
+    ):
+        self.limits = limits or LLMLimits()
+        self.retry = retry or LLM_RETRY
+        self._backend = backend
+        self._cond = threading.Condition()
+        self.rpm_bucket = TokenBucket(
+            rate_per_s=self.limits.rpm / 60.0, burst=max(1.0, self.limits.rpm / 60.0 * self.limits.burst_s)
+        )
+        self.tpm_bucket = TokenBucket(
+            rate_per_s=self.limits.tpm / 60.0, burst=max(1.0, self.limits.tpm / 60.0 * self.limits.burst_s)
+        )
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._avg_output_tokens = float(DEFAULT_OUTPUT_TOKENS)
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "tokens_reserved": 0,
+            "tokens_used": 0,
+            "waited_s": 0.0,
+            "max_in_flight": 0,
+        }
+
+    @property
+    def backend(self) -> LLMBackend:
+        if self._backend is None:
+            with self._cond:
+                if self._backend is None:
+                    self._backend = backend_from_env()
+        return self._backend
+
+    # ----------------------------
+    # Admission
+    # ----------------------------
+    def _acquire(self, tokens: float) -> None:
+        # a single call bigger than the bucket would wait forever: cap at a full bucket
+        need = min(float(tokens), self.tpm_bucket.burst)
+        t0 = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0 and self._in_flight < self.limits.concurrency:
+                    wait = max(self.rpm_bucket.delay(now=now), self.tpm_bucket.delay(need, now=now))
+                    if wait <= 0:
+                        self.rpm_bucket.take(now=now)
+                        self.tpm_bucket.take(need, now=now)
+                        self._in_flight += 1
+                        self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._in_flight)
+                        self._stats["waited_s"] += now - t0
+                        return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def _release(self, reserved: float, resp: Any = None) -> None:
+        used = _usage(resp, "total_tokens") if resp is not None else 0.0
+        output = _usage(resp, "output_tokens") if resp is not None else None
+        with self._cond:
+            self._in_flight -= 1
+            if used is not None:
+                # give back (or charge) the difference between estimate and real usage
+                self.tpm_bucket.tokens += min(reserved, self.tpm_bucket.burst) - used
+                self._stats["tokens_used"] += int(used)
+            if output is not None:
+                self._avg_output_tokens += OUTPUT_EMA_ALPHA * (output - self._avg_output_tokens)
+            self._cond.notify_all()
+
+    def _pause(self, seconds: float) -> None:
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    # ----------------------------
+    # Calls
+    # ----------------------------
+    def estimate_tokens(self, input: Any, max_output_tokens: Optional[int] = None) -> int:
+        """
+        Tokens to reserve for a call: the prompt plus the expected output, i.e. the running
+        average of real output usage, capped by the request's max_output_tokens.
+        """
+        text = input if isinstance(input, str) else str(input)
+        with self._cond:
+            output = self._avg_output_tokens
+        if max_output_tokens:
+            output = min(output, float(max_output_tokens))
+        return estimate_tokens(text) + int(round(output))
+
+    def _retry_delay(self, exc: Exception, attempt: int) -> float:
+        """
+        Seconds to wait before retry number `attempt`; re-raises `exc` if it must not be retried.
+        """
+        with self._cond:
+            self._stats["errors"] += 1
+        if attempt >= self.retry.max_attempts or not _is_retryable(exc, self.retry):
+            raise exc
+        server_wait = _server_wait_s(exc)
+        rate_limited = getattr(exc, "status_code", None) == 429
+        if rate_limited:
+            with self._cond:
+                self._stats["rate_limited"] += 1
+            if server_wait is not None and server_wait > self.retry.max_retry_after_s:
+                raise exc
+        delay = self.retry.backoff(attempt - 1, server_wait)
+        if rate_limited:
+            self._pause(delay)
+        with self._cond:
+            self._stats["retries"] += 1
+        return delay
+
+    def _start(self, reserved: int) -> None:
+        self._acquire(reserved)
+        with self._cond:
+            self._stats["requests"] += 1
+            self._stats["tokens_reserved"] += reserved
+
+    def create(self, input: Any, model: str = DEFAULT_MODEL, **kwargs: Any) -> Any:
+        """
+        backend.create(...) (= OpenAI responses.create) behind the RPM/TPM limits, with retries.
+        """
+        reserved = self.estimate_tokens(input, kwargs.get("max_output_tokens"))
+        attempt = 0
+        while True:
+            self._start(reserved)
+            # a failed request still counted against RPM; its tokens mostly didn't
+            resp = None
+            try:
+                resp = self.backend.create(model=model, input=input, **kwargs)
+                return resp
+            except Exception as e:
+                attempt += 1
+                delay = self._retry_delay(e, attempt)
+            finally:
+                self._release(reserved, resp)
+            time.sleep(delay)
+
+    def stream(self, input: Any, model: str = DEFAULT_MODEL, **kwargs: Any) -> Iterator[str]:
+        """
+        Like create(), but yields the output text as it is generated. Errors before the first
+        text delta are retried; once text has been yielded they propagate.
+        """
+        reserved = self.estimate_tokens(input, kwargs.get("max_output_tokens"))
+        attempt = 0
+        while True:
+            self._start(reserved)
+            completed = None
+            started = False
+            try:
+                events = self.backend.create(model=model, input=input, stream=True, **kwargs)
+                for event in events:
+                    kind = getattr(event, "type", "")
+                    if kind == "response.output_text.delta":
+                        started = True
+                        yield event.delta
+                    elif kind == "response.completed":
+                        completed = getattr(event, "response", None)
+                    elif kind in ("response.failed", "error"):
+                        raise RuntimeError(f"LLM stream failed: {getattr(event, 'message', '') or kind}")
+                return
+            except Exception as e:
+                if started:
+                    with self._cond:
+                        self._stats["errors"] += 1
+                    raise
+                attempt += 1
+                delay = self._retry_delay(e, attempt)
+            finally:
+                self._release(reserved, completed)
+            time.sleep(delay)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return dict(
+                self._stats,
+                waited_s=round(self._stats["waited_s"], 3),
+                in_flight=self._in_flight,
+                paused_s=round(max(0.0, self._paused_until - time.monotonic()), 3),
+                avg_output_tokens=round(self._avg_output_tokens),
+                backend=self._backend.name if self._backend is not None else None,
+            )
+
+
+# ----------------------------
+# Process-wide client + batches
+# ----------------------------
+_llm: Optional[LLMClient] = None
+_llm_lock = threading.Lock()
+
+
+def get_llm() -> LLMClient:
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = LLMClient()
+    return _llm
+
+
+def configure_llm(llm: LLMClient) -> None:
+    global _llm
+    with _llm_lock:
+        _llm = llm
+
+
+def run_batch(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[int, Any], None]] = None,
+) -> list[Any]:
+    """
+    fn(item) for all items on a thread pool sized to the LLM concurrency; the LLM client's
+    limits decide how many calls are actually in flight. Returns results in input order;
+    a failed item's slot holds its exception. on_result(index, result) runs as items finish.
+    """
+    items = list(items)
+    if not items:
+        return []
+    n = max(1, min(len(items), workers or get_llm().limits.concurrency))
+    out: list[Any] = [None] * len(items)
+    call = bind_caller(fn)
+    with ThreadPoolExecutor(max_workers=n, thread_name_prefix="llm-batch") as ex:
+        futs = {ex.submit(call, it): i for i, it in enumerate(items)}
+        for fut in as_completed(futs):
+            i = futs[fut]
+            try:
+                out[i] = fut.result()
+            except Exception as e:
+                out[i] = e
+            if on_result is not None:
+                on_result(i, out[i])
+    return out
+
+
+def llm_stats() -> dict[str, Any]:
+    return get_llm().stats()
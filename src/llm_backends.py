@@ -0,0 +1,184 @@
+# src/llm_backends.py
+"""
+LLM backends used by llm.LLMClient.
+
+A backend is anything with a `name` and `create(model=..., input=..., **kwargs)` that behaves
+like OpenAI's `client.responses.create`: it returns a response with `output_text` and `usage`,
+or with stream=True an iterable of events ("response.output_text.delta" with `delta`,
+"response.completed" with `response`).
+
+- OpenAIBackend: the OpenAI Responses API; the SDK is imported and the client built on the
+  first call, so importing research / fit needs neither the package nor an API key
+- FakeLLMBackend: offline and deterministic; answers with schema-valid JSON generated from the
+  request's `text.format` schema after a configurable time-to-first-token and token rate -
+  for load tests and profiling of the research -> fit pipeline without network
+
+Selected via the LLM_BACKEND env var: "openai" (default) or "fake"
+(LLM_FAKE_LATENCY_S, LLM_FAKE_TOKENS_PER_S).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional, Protocol
+
+from .tokens import estimate_tokens
+
+
+class LLMBackend(Protocol):
+    name: str
+
+    def create(self, model: str, input: Any, **kwargs: Any) -> Any: ...
+
+
+def is_connection_error(exc: Exception) -> bool:
+    """
+    Network-level failure (reset, DNS, timeout) of any backend.
+    """
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        from openai import APIConnectionError  # includes timeouts
+    except ImportError:
+        return False
+    return isinstance(exc, APIConnectionError)
+
+
+class OpenAIBackend:
+    name = "openai"
+
+    def __init__(self, **client_kwargs: Any):
+        # the SDK's own retries are off; llm.LLMClient retries with its rate-limit state
+        self.client_kwargs = {"max_retries": 0, **client_kwargs}
+        self._client: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from openai import OpenAI
+
+                    self._client = OpenAI(**self.client_kwargs)
+        return self._client
+
+    def create(self, model: str, input: Any, **kwargs: Any) -> Any:
+        return self.client.responses.create(model=model, input=input, **kwargs)
+
+
+# ----------------------------
+# Fake
+# ----------------------------
+@dataclass
+class FakeUsage:
+    input_tokens: int
+    output_tokens: int
+    total_tokens: int
+
+
+@dataclass
+class FakeResponse:
+    output_text: str
+    usage: FakeUsage
+
+
+@dataclass
+class FakeEvent:
+    type: str
+    delta: str = ""
+    response: Optional[FakeResponse] = None
+
+
+def _sample(schema: dict[str, Any], seed: int, path: str) -> Any:
+    """
+    Deterministic value matching `schema` (the subset used in schemas.py).
+    """
+    h = int(hashlib.sha256(f"{seed}:{path}".encode("utf-8")).hexdigest()[:8], 16)
+    t = schema.get("type")
+    t = t[0] if isinstance(t, list) else t
+    if "enum" in schema:
+        return schema["enum"][h % len(schema["enum"])]
+    if t == "object":
+        props = schema.get("properties") or {}
+        return {k: _sample(v, seed, f"{path}.{k}") for k, v in props.items()}
+    if t == "array":
+        lo = int(schema.get("minItems", 1))
+        hi = int(schema.get("maxItems", lo + 3))
+        n = lo + h % (max(lo, hi) - lo + 1)
+        return [_sample(schema.get("items") or {"type": "string"}, seed, f"{path}[{i}]") for i in range(n)]
+    if t in ("number", "integer"):
+        lo = schema.get("minimum", 0)
+        hi = schema.get("maximum", 100)
+        return int(lo + h % (int(hi - lo) + 1))
+    if t == "boolean":
+        return bool(h % 2)
+    if t == "null":
+        return None
+    field = path.rsplit(".", 1)[-1].split("[")[0] or "text"
+    return f"Fake {field.replace('_', ' ')} #{h % 1000}"
+
+
+class FakeLLMBackend:
+    name = "fake"
+
+    def __init__(self, latency_s: float = 0.5, tokens_per_s: float = 100.0, chunk_chars: int = 16):
+        self.latency_s = max(0.0, latency_s)
+        self.tokens_per_s = tokens_per_s
+        self.chunk_chars = max(1, chunk_chars)
+
+    def _answer(self, input: Any, kwargs: dict[str, Any]) -> tuple[str, FakeUsage]:
+        prompt = input if isinstance(input, str) else json.dumps(input, ensure_ascii=False, default=str)
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        schema = (((kwargs.get("text") or {}).get("format") or {}).get("schema")) or None
+        if schema:
+            text = json.dumps(_sample(schema, seed, "$"), ensure_ascii=False)
+        else:
+            text = f"Fake answer #{seed % 1000}."
+        n_in, n_out = estimate_tokens(prompt), estimate_tokens(text)
+        return text, FakeUsage(input_tokens=n_in, output_tokens=n_out, total_tokens=n_in + n_out)
+
+    def _generation_s(self, text: str) -> float:
+        return estimate_tokens(text) / self.tokens_per_s if self.tokens_per_s > 0 else 0.0
+
+    def create(self, model: str, input: Any, stream: bool = False, **kwargs: Any) -> Any:
+        text, usage = self._answer(input, kwargs)
+        if stream:
+            return self._stream(text, usage)
+        time.sleep(self.latency_s + self._generation_s(text))
+        return FakeResponse(output_text=text, usage=usage)
+
+    def _stream(self, text: str, usage: FakeUsage) -> Iterator[FakeEvent]:
+        time.sleep(self.latency_s)
+        step = self.chunk_chars
+        for i in range(0, len(text), step):
+            chunk = text[i : i + step]
+            time.sleep(self._generation_s(chunk))
+            yield FakeEvent(type="response.output_text.delta", delta=chunk)
+        yield FakeEvent(type="response.completed", response=FakeResponse(output_text=text, usage=usage))
+
+
+# ----------------------------
+# Selection
+# ----------------------------
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def backend_from_env() -> LLMBackend:
+    kind = (os.environ.get("LLM_BACKEND") or "openai").strip().lower()
+    if kind == "fake":
+        return FakeLLMBackend(
+            latency_s=_env_float("LLM_FAKE_LATENCY_S", 0.5),
+            tokens_per_s=_env_float("LLM_FAKE_TOKENS_PER_S", 100.0),
+        )
+    if kind == "openai":
+        return OpenAIBackend()
+    raise ValueError(f"unknown LLM_BACKEND: {kind!r} (expected 'openai' or 'fake')")
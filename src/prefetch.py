@@ -0,0 +1,110 @@
+# src/prefetch.py
+"""
+Speculative background prefetch of candidate sites.
+
+While an operator looks at the results list, fetch the homepage + top internal pages of the
+first few candidates, so the HTTP cache (http_cache.py) is warm when "Run research" is clicked.
+
+- runs as the low-priority "prefetch" caller (see ratelimit.py): never delays user requests
+- page / byte budget shared by all candidates (CrawlBudget)
+- cancel() stops at the next page; focus(url) moves a candidate to the front of the queue
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Optional
+
+from .crawl import CrawlBudget
+from .ratelimit import caller_scope
+from .web import fetch_pages_for_company
+
+
+PREFETCH_CALLER = "prefetch"
+PREFETCH_MAX_COMPANIES = 3
+# same as research.build_company_profile, so research finds exactly these pages cached
+PREFETCH_MAX_PAGES = 5
+PREFETCH_MAX_TOTAL_BYTES = 25_000_000
+PREFETCH_WORKERS = 2
+
+
+class Prefetcher:
+    def __init__(
+        self,
+        urls: list[str],
+        max_companies: int = PREFETCH_MAX_COMPANIES,
+        max_pages: int = PREFETCH_MAX_PAGES,
+        max_total_bytes: int = PREFETCH_MAX_TOTAL_BYTES,
+        workers: int = PREFETCH_WORKERS,
+    ):
+        self.urls = [u for u in dict.fromkeys(urls) if u][:max_companies]
+        self.max_pages = max_pages
+        self.workers = max(1, workers)
+        self.budget = CrawlBudget(
+            max_pages_per_domain=max_pages,
+            max_total_pages=max_pages * max(1, len(self.urls)),
+            max_total_bytes=max_total_bytes,
+        )
+        self._queue: deque[str] = deque(self.urls)
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._done: dict[str, int] = {}
+        self._failed: list[str] = []
+
+    def start(self) -> "Prefetcher":
+        for i in range(min(self.workers, len(self.urls))):
+            t = threading.Thread(target=self._run, name=f"prefetch-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def _next(self) -> Optional[str]:
+        with self._lock:
+            return self._queue.popleft() if self._queue else None
+
+    def _run(self) -> None:
+        with caller_scope(PREFETCH_CALLER):
+            while not self._cancel.is_set():
+                url = self._next()
+                if url is None:
+                    return
+                try:
+                    # fetch_url stores every page in the HTTP cache; the parsed pages are discarded
+                    pages = fetch_pages_for_company(url, max_pages=self.max_pages, budget=self.budget)
+                    with self._lock:
+                        self._done[url] = len(pages)
+                except Exception:
+                    with self._lock:
+                        self._failed.append(url)
+
+    def focus(self, url: str) -> None:
+        """
+        Prefetch `url` next (e.g. the operator just opened its brief).
+        """
+        with self._lock:
+            if url in self._queue:
+                self._queue.remove(url)
+                self._queue.appendleft(url)
+
+    def cancel(self) -> None:
+        self._cancel.set()
+        self.budget.close()
+        with self._lock:
+            self._queue.clear()
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "companies": len(self.urls),
+                "done": len(self._done),
+                "failed": len(self._failed),
+                "pages": sum(self._done.values()),
+                "cancelled": self._cancel.is_set(),
+                "running": self.running,
+                "usage": self.budget.usage(),
+            }
@@ -0,0 +1,252 @@
+# src/ratelimit.py
+"""
+Central politeness scheduler for all outbound HTTP (web.py + discovery.py go through http_client).
+
+- token bucket per host + one global token bucket
+- concurrency cap per host
+- fair queueing: waiters for a host are served round-robin across callers
+  (a batch job with 500 queued pages can't starve an interactive session)
+- low-priority callers (e.g. "prefetch") only go when no normal caller waits for the host,
+  and only while the global bucket keeps `low_priority_reserve` tokens of headroom
+
+Callers are identified by a context variable (see caller_scope / bind_caller);
+everything without an explicit caller shares "default".
+"""
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+from urllib.parse import urlparse
+
+
+@dataclass
+class TokenBucket:
+    """
+    Classic token bucket. Not thread-safe on its own; HostScheduler guards it with its lock.
+    """
+
+    rate_per_s: float
+    burst: float
+    tokens: float = -1.0
+    updated_at: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self):
+        if self.tokens < 0:
+            self.tokens = float(self.burst)
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated_at:
+            self.tokens = min(float(self.burst), self.tokens + (now - self.updated_at) * self.rate_per_s)
+            self.updated_at = now
+
+    def delay(self, n: float = 1.0, now: Optional[float] = None) -> float:
+        """
+        Seconds until `n` tokens are available (0 = available now).
+        """
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if self.tokens >= n:
+            return 0.0
+        if self.rate_per_s <= 0:
+            return float("inf")
+        return (n - self.tokens) / self.rate_per_s
+
+    def take(self, n: float = 1.0, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self.tokens -= n
+
+
+@dataclass
+class HostLimits:
+    rate_per_s: float = 4.0
+    burst: float = 4.0
+    concurrency: int = 4
+
+
+# Speculative work that must never delay a user-triggered request.
+DEFAULT_LOW_PRIORITY_CALLERS = frozenset({"prefetch"})
+
+# Search engines throttle fast; be gentle with them. Matched by host suffix.
+DEFAULT_HOST_OVERRIDES: dict[str, HostLimits] = {
+    "duckduckgo.com": HostLimits(rate_per_s=1.0, burst=2.0, concurrency=2),
+}
+
+
+class _HostState:
+    def __init__(self, limits: HostLimits):
+        self.limits = limits
+        self.bucket = TokenBucket(rate_per_s=limits.rate_per_s, burst=limits.burst)
+        self.active = 0
+        self.waiting: dict[str, deque] = {}
+        self.rr: deque[str] = deque()
+
+
+class HostScheduler:
+    def __init__(
+        self,
+        global_rate_per_s: float = 50.0,
+        global_burst: float = 100.0,
+        default_host_limits: Optional[HostLimits] = None,
+        host_overrides: Optional[dict[str, HostLimits]] = None,
+        low_priority_callers: Optional[frozenset[str]] = None,
+        low_priority_reserve: Optional[float] = None,
+    ):
+        self.global_bucket = TokenBucket(rate_per_s=global_rate_per_s, burst=global_burst)
+        self.low_priority_callers = frozenset(
+            DEFAULT_LOW_PRIORITY_CALLERS if low_priority_callers is None else low_priority_callers
+        )
+        self.low_priority_reserve = global_burst * 0.25 if low_priority_reserve is None else low_priority_reserve
+        self.default_host_limits = default_host_limits or HostLimits()
+        self.host_overrides = dict(DEFAULT_HOST_OVERRIDES if host_overrides is None else host_overrides)
+        self._cond = threading.Condition()
+        self._hosts: dict[str, _HostState] = {}
+        self.granted = 0
+        self.waited_s = 0.0
+
+    def _limits_for(self, host: str) -> HostLimits:
+        for suffix, limits in self.host_overrides.items():
+            if host == suffix or host.endswith("." + suffix):
+                return limits
+        return self.default_host_limits
+
+    def _state(self, host: str) -> _HostState:
+        st = self._hosts.get(host)
+        if st is None:
+            st = _HostState(self._limits_for(host))
+            self._hosts[host] = st
+        return st
+
+    def _next_caller(self, st: _HostState) -> Optional[str]:
+        for c in st.rr:
+            if c not in self.low_priority_callers:
+                return c
+        return st.rr[0] if st.rr else None
+
+    def _is_head(self, st: _HostState, caller: str, ticket: object) -> bool:
+        return self._next_caller(st) == caller and st.waiting[caller][0] is ticket
+
+    def acquire(self, host: str, caller: str = "default") -> None:
+        host = (host or "").lower()
+        ticket = object()
+        t0 = time.monotonic()
+        with self._cond:
+            st = self._state(host)
+            st.waiting.setdefault(caller, deque()).append(ticket)
+            if caller not in st.rr:
+                st.rr.append(caller)
+
+            while True:
+                timeout: Optional[float] = None
+                if self._is_head(st, caller, ticket) and st.active < st.limits.concurrency:
+                    now = time.monotonic()
+                    need = 1.0 + (self.low_priority_reserve if caller in self.low_priority_callers else 0.0)
+                    wait = max(st.bucket.delay(now=now), self.global_bucket.delay(need, now=now))
+                    if wait <= 0:
+                        st.bucket.take(now=now)
+                        self.global_bucket.take(now=now)
+                        st.waiting[caller].popleft()
+                        st.rr.remove(caller)
+                        if st.waiting[caller]:
+                            st.rr.append(caller)  # round-robin: back of the line
+                        else:
+                            del st.waiting[caller]
+                        st.active += 1
+                        self.granted += 1
+                        self.waited_s += now - t0
+                        self._cond.notify_all()
+                        return
+                    timeout = wait
+                self._cond.wait(timeout=timeout)
+
+    def release(self, host: str) -> None:
+        host = (host or "").lower()
+        with self._cond:
+            st = self._hosts.get(host)
+            if st is not None and st.active > 0:
+                st.active -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, url: str, caller: Optional[str] = None) -> Iterator[None]:
+        host = urlparse(url).netloc.lower()
+        who = caller or current_caller()
+        self.acquire(host, who)
+        try:
+            yield
+        finally:
+            self.release(host)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "granted": self.granted,
+                "waited_s": round(self.waited_s, 3),
+                "hosts": {
+                    h: {"active": st.active, "waiting": sum(len(q) for q in st.waiting.values())}
+                    for h, st in self._hosts.items()
+                    if st.active or st.waiting
+                },
+            }
+
+
+# ----------------------------
+# Process-wide scheduler + caller identity
+# ----------------------------
+_scheduler: Optional[HostScheduler] = None
+_scheduler_lock = threading.Lock()
+
+_caller: contextvars.ContextVar[str] = contextvars.ContextVar("http_caller", default="default")
+
+
+def get_scheduler() -> HostScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = HostScheduler()
+    return _scheduler
+
+
+def configure_scheduler(scheduler: HostScheduler) -> None:
+    """
+    Swap the process-wide scheduler (e.g. different limits for a batch script).
+    """
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = scheduler
+
+
+def current_caller() -> str:
+    return _caller.get()
+
+
+@contextmanager
+def caller_scope(name: str) -> Iterator[None]:
+    """
+    Tag all HTTP issued inside this block (same thread / task) with caller `name`.
+    """
+    token = _caller.set(name or "default")
+    try:
+        yield
+    finally:
+        _caller.reset(token)
+
+
+def bind_caller(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap fn so it runs under the CURRENT caller, also inside worker threads
+    (thread pools don't inherit context variables).
+    """
+    who = current_caller()
+
+    def wrapped(*args: Any, **kwargs: Any) -> Any:
+        with caller_scope(who):
+            return fn(*args, **kwargs)
+
+    return wrapped
@@ -1,18 +1,32 @@
 from dataclasses import asdict
-from typing import Any
-
-from openai import OpenAI
+from typing import Any, Callable, Iterator, Optional
 
+from .boilerplate import strip_site_boilerplate
 from .cache import cache_get_json, cache_set_json
+from .company_index import get_company_index
+from .context_builder import CONTEXT_TOKEN_BUDGET, build_context
+from .json_stream import iter_partial_json
+from .llm import get_llm, run_batch
+from .schemas import PROFILE_SCHEMA, parse_structured, text_format
 from .web import fetch_pages_for_company, FetchedPage
 
-client = OpenAI()
 
+# seconds between partial results while streaming (UI redraws)
+STREAM_UPDATE_S = 0.15
+PROFILE_FORMAT = text_format("company_profile", PROFILE_SCHEMA)
 
-def summarize_company(company_name: str, pages: list[FetchedPage]) -> dict[str, Any]:
-    """Turn fetched pages into a short structured company profile."""
-    sources = [{"url": p.url, "title": p.title} for p in pages]
-    combined = "\n\n".join([f"URL: {p.url}\nTITLE: {p.title}\nTEXT: {p.text}" for p in pages])
+
+def _profile_prompt(
+    company_name: str,
+    pages: list[FetchedPage],
+    token_budget: int,
+) -> tuple[str, dict[str, Any]]:
+    """Prompt + the parts of the result that don't come from the model."""
+    # nav/footer repeated on every page would otherwise be sent up to 5x
+    pages, boilerplate_stats = strip_site_boilerplate(pages)
+    # best passages for the profile fields within token_budget (not whole pages)
+    combined, context_stats = build_context(company_name, pages, token_budget=token_budget)
+    sources = context_stats["sources"] or [{"url": p.url, "title": p.title} for p in pages]
 
     prompt = f"""
 Du bist ein Research-Assistent. Nutze ausschließlich die folgenden Website-Auszüge, um ein Firmenprofil zu erstellen.
@@ -32,36 +46,150 @@ Website-Auszüge:
 {combined}
 """.strip()
 
-    resp = client.responses.create(
-        model="gpt-5-mini",
-        input=prompt,
-    )
-    text = resp.output_text.strip()
-
-    # Robust: return raw even if model doesn't output perfect JSON
-    return {
+    return prompt, {
         "company_name": company_name,
-        "profile_raw": text,
         "sources": sources,
+        # the text the passage offsets in context_stats refer to; stored with the profile
+        # (IMPORTANT: no HTML in profile caches, size + noise)
+        "pages": [{"url": p.url, "title": p.title, "text": p.text} for p in pages],
+        "boilerplate": boilerplate_stats,
+        "context": context_stats,
     }
 
 
+def _profile_result(meta: dict[str, Any], text: str) -> dict[str, Any]:
+    # validated once here; consumers read "profile" (None if the answer wasn't JSON at all)
+    profile, errors = parse_structured(text, PROFILE_SCHEMA)
+    result = {
+        "company_name": meta["company_name"],
+        "profile_raw": text.strip(),
+        "profile": profile,
+        "sources": meta["sources"],
+        "pages": meta["pages"],
+        "boilerplate": meta["boilerplate"],
+        "context": meta["context"],
+    }
+    if errors:
+        result["profile_errors"] = errors
+    return result
+
+
+def summarize_company(
+    company_name: str,
+    pages: list[FetchedPage],
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+) -> dict[str, Any]:
+    """Turn fetched pages into a short structured company profile."""
+    prompt, meta = _profile_prompt(company_name, pages, token_budget)
+    resp = get_llm().create(input=prompt, model="gpt-5-mini", text=PROFILE_FORMAT)
+    return _profile_result(meta, resp.output_text)
+
+
+def iter_summarize_company(
+    company_name: str,
+    pages: list[FetchedPage],
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+    min_interval_s: float = STREAM_UPDATE_S,
+) -> Iterator[dict[str, Any]]:
+    """
+    Streaming summarize_company: while the model writes, yields partial results with
+    "partial": True and "profile" = the fields parsed so far; the last item is the result.
+    """
+    prompt, meta = _profile_prompt(company_name, pages, token_budget)
+    text = ""
+    deltas = get_llm().stream(input=prompt, model="gpt-5-mini", text=PROFILE_FORMAT)
+    for fields, text in iter_partial_json(deltas, min_interval_s=min_interval_s):
+        yield {
+            "company_name": company_name,
+            "profile_raw": text,
+            "profile": fields,
+            "sources": meta["sources"],
+            "partial": True,
+        }
+    yield _profile_result(meta, text)
+
+
+def _profile_cache_key(company_name: str, company_url: str) -> str:
+    return f"profile::{company_name}::{company_url}"
+
+
+def _cached_profile(company_name: str, company_url: str) -> Optional[dict[str, Any]]:
+    cached = cache_get_json("cache/profiles", _profile_cache_key(company_name, company_url))
+    if cached:
+        cached["from_cache"] = True
+    return cached
+
+
+def _fetch_pages(company_url: str) -> list[FetchedPage]:
+    return fetch_pages_for_company(company_url, max_pages=5)
+
+
+def _store_profile(result: dict[str, Any], company_url: str, save_index: bool = True) -> dict[str, Any]:
+    result["company_url"] = company_url
+    result["from_cache"] = False
+    cache_set_json("cache/profiles", _profile_cache_key(result["company_name"], company_url), result)
+    try:
+        # keep the local discovery index in step with the profile cache
+        get_company_index().add_profile(result, save=save_index)
+    except Exception:
+        pass
+    return result
+
+
+def _build_company_profile(company_name: str, company_url: str, use_cache: bool, save_index: bool) -> dict[str, Any]:
+    if use_cache:
+        cached = _cached_profile(company_name, company_url)
+        if cached:
+            return cached
+
+    pages = _fetch_pages(company_url)
+    return _store_profile(summarize_company(company_name, pages), company_url, save_index=save_index)
+
+
 def build_company_profile(company_name: str, company_url: str, use_cache: bool = True) -> dict[str, Any]:
     """Fetch pages -> summarize via LLM -> cache result."""
-    cache_key = f"profile::{company_name}::{company_url}"
+    return _build_company_profile(company_name, company_url, use_cache, save_index=True)
+
+
+def iter_build_company_profile(company_name: str, company_url: str, use_cache: bool = True) -> Iterator[dict[str, Any]]:
+    """
+    Streaming build_company_profile: partial results (see iter_summarize_company) while the
+    model writes; the last item is the complete, cached profile.
+    """
     if use_cache:
-        cached = cache_get_json("cache/profiles", cache_key)
+        cached = _cached_profile(company_name, company_url)
         if cached:
-            cached["from_cache"] = True
-            return cached
+            yield cached
+            return
 
-    pages = fetch_pages_for_company(company_url, max_pages=5)
+    pages = _fetch_pages(company_url)
+    for state in iter_summarize_company(company_name, pages):
+        if state.get("partial"):
+            yield state
+        else:
+            yield _store_profile(state, company_url)
 
-    # IMPORTANT: do not store HTML in profile caches (size + noise)
-    pages_dict = [{"url": p.url, "title": p.title, "text": p.text} for p in pages]
 
-    result = summarize_company(company_name, pages)
-    result["pages"] = pages_dict
-    result["from_cache"] = False
-    cache_set_json("cache/profiles", cache_key, result)
-    return result
+def build_company_profiles(
+    companies: list[dict[str, str]],
+    use_cache: bool = True,
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[int, Any], None]] = None,
+) -> list[Any]:
+    """
+    build_company_profile for many {company_name, company_url} at once (see llm.run_batch).
+    Results in input order; a failed company's slot holds the exception.
+    The company index is written once at the end, not once per profile.
+    """
+    results = run_batch(
+        lambda c: _build_company_profile(c["company_name"], c["company_url"], use_cache, save_index=False),
+        companies,
+        workers=workers,
+        on_result=on_result,
+    )
+    if any(isinstance(r, dict) and not r.get("from_cache") for r in results):
+        try:
+            get_company_index().save()
+        except Exception:
+            pass
+    return results
@@ -0,0 +1,161 @@
+# src/schemas.py
+"""
+JSON schemas for the model's structured outputs (company profile, decision fit).
+
+The schemas are sent with every request (`text=text_format(...)`, strict mode: every property
+required, no extra keys), so the model can only answer with a matching object. The answer is
+parsed and validated ONCE when the result is written; the parsed object is stored next to the
+raw text ("profile" / "fit") and consumers read fields from there instead of re-parsing.
+
+validate() covers the subset of JSON Schema used here: type, properties, required,
+additionalProperties, items, min/maxItems, minimum/maximum, enum.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Optional
+
+
+def _strings(max_items: Optional[int] = None) -> dict[str, Any]:
+    s: dict[str, Any] = {"type": "array", "items": {"type": "string"}}
+    if max_items is not None:
+        s["maxItems"] = max_items
+    return s
+
+
+def _object(properties: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+PROFILE_SCHEMA = _object(
+    {
+        "company_summary": {"type": "string"},
+        "what_they_sell": _strings(6),
+        "likely_users": _strings(5),
+        "possible_ux_opportunities": _strings(6),
+        "confidence": {"type": "number", "minimum": 0, "maximum": 100},
+        "uncertainties": _strings(5),
+        "sources": {
+            "type": "array",
+            "items": _object({"url": {"type": "string"}, "title": {"type": "string"}}),
+        },
+    }
+)
+
+FIT_SCHEMA = _object(
+    {
+        "fit_score": {"type": "number", "minimum": 0, "maximum": 100},
+        "decision_summary": {"type": "string"},
+        "why_good_fit": _strings(5),
+        "why_not": _strings(4),
+        "recommended_use_case": {"type": "string"},
+        "target_roles": _strings(3),
+        "missing_critical_info": {"type": "boolean"},
+        "next_questions": _strings(5),
+    }
+)
+
+
+def text_format(name: str, schema: dict[str, Any]) -> dict[str, Any]:
+    """
+    `text` argument for client.responses.create: structured output constrained to `schema`.
+    """
+    return {"format": {"type": "json_schema", "name": name, "schema": schema, "strict": True}}
+
+
+_TYPES: dict[str, Any] = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def _is_type(value: Any, t: str) -> bool:
+    if t in ("number", "integer"):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        return t == "number" or float(value).is_integer()
+    return isinstance(value, _TYPES.get(t, object))
+
+
+def validate(value: Any, schema: dict[str, Any], path: str = "$") -> list[str]:
+    """
+    Errors as "path: message" strings; empty list = valid.
+    """
+    errors: list[str] = []
+    types = schema.get("type")
+    if types is not None:
+        allowed = types if isinstance(types, list) else [types]
+        if not any(_is_type(value, t) for t in allowed):
+            return [f"{path}: expected {'/'.join(allowed)}, got {type(value).__name__}"]
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} not in {schema['enum']}")
+
+    if isinstance(value, dict):
+        props = schema.get("properties") or {}
+        for k in schema.get("required") or []:
+            if k not in value:
+                errors.append(f"{path}: missing {k}")
+        for k, v in value.items():
+            if k in props:
+                errors.extend(validate(v, props[k], f"{path}.{k}"))
+            elif schema.get("additionalProperties") is False:
+                errors.append(f"{path}: unexpected {k}")
+    elif isinstance(value, list):
+        if "minItems" in schema and len(value) < schema["minItems"]:
+            errors.append(f"{path}: fewer than {schema['minItems']} items")
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            errors.append(f"{path}: more than {schema['maxItems']} items")
+        if "items" in schema:
+            for i, v in enumerate(value):
+                errors.extend(validate(v, schema["items"], f"{path}[{i}]"))
+    elif _is_type(value, "number"):
+        if "minimum" in schema and value < schema["minimum"]:
+            errors.append(f"{path}: below {schema['minimum']}")
+        if "maximum" in schema and value > schema["maximum"]:
+            errors.append(f"{path}: above {schema['maximum']}")
+    return errors
+
+
+def parse_structured(text: str, schema: dict[str, Any]) -> tuple[Optional[dict[str, Any]], list[str]]:
+    """
+    (object, validation errors) for a structured-output answer; (None, [reason]) if the text
+    isn't a JSON object at all.
+    """
+    try:
+        obj = json.loads((text or "").strip())
+    except ValueError as e:
+        return None, [f"$: invalid JSON ({e})"]
+    if not isinstance(obj, dict):
+        return None, ["$: expected object"]
+    return obj, validate(obj, schema)
+
+
+def _salvage_object(raw: str) -> dict[str, Any]:
+    t = (raw or "").strip()
+    start, end = t.find("{"), t.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        obj = json.loads(t[start : end + 1])
+        return obj if isinstance(obj, dict) else {}
+    except ValueError:
+        return {}
+
+
+def parsed_profile(profile_state: dict[str, Any]) -> dict[str, Any]:
+    """
+    The profile fields of a build_company_profile result. Profiles cached before structured
+    outputs only have profile_raw; their JSON is salvaged from the text.
+    """
+    profile = (profile_state or {}).get("profile")
+    if isinstance(profile, dict):
+        return profile
+    return _salvage_object(str((profile_state or {}).get("profile_raw") or ""))
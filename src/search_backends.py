@@ -0,0 +1,384 @@
+# src/search_backends.py
+"""
+Web search backends used by discovery.py.
+
+A backend is anything with a `name`, a `cacheable` flag and
+`search(query, max_results) -> list[SearchResult]`. Backends that can paginate also offer
+`search_pages(query, max_pages) -> Iterator[list[SearchResult]]`.
+
+- DDGBackend: scrapes lite.duckduckgo.com, falls back to duckduckgo.com/html (no API key)
+- FixtureBackend: offline, deterministic, zero-latency; replays a JSON fixture file or a
+  directory of recorded search-cache entries (cache/search) - for benchmarks and load tests
+- FanoutBackend: queries several backends at once, returns the first max_results good results
+  (a failing / empty backend is simply outvoted -> failover)
+
+Selected via configure_search_backend() or the SEARCH_BACKEND env var:
+"ddg" (default), "fixture" (path from SEARCH_FIXTURES) or a comma list for fan-out, e.g. "ddg,fixture".
+"""
+from __future__ import annotations
+
+import glob
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, Optional, Protocol
+from urllib.parse import parse_qs, quote_plus, unquote, urlencode, urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from .http_client import HedgePolicy, http_get
+from .ratelimit import bind_caller
+from .types import SearchResult
+
+
+DEFAULT_FIXTURE_PATH = os.path.join("data", "search_fixtures.json")
+FIXTURE_PAGE_SIZE = 10
+
+# Search hosts have no latency history in host_health, so hedge on a fixed delay.
+# Off by default: duplicate queries eat into the search rate budget.
+SEARCH_HEDGE = HedgePolicy(enabled=False, fallback_delay_s=2.5)
+
+
+class SearchBackend(Protocol):
+    name: str
+    # results may be stored in the persistent search cache
+    cacheable: bool
+
+    def search(self, query: str, max_results: int = 10) -> list[SearchResult]: ...
+
+
+def _norm(s: str) -> str:
+    return " ".join(str(s or "").strip().split())
+
+
+def _clean_title(title: str) -> str:
+    t = _norm(title)
+    # remove common suffixes (very rough)
+    t = re.sub(r"\s*[-–|]\s*(LinkedIn|Xing|Crunchbase|Wikipedia|Jobs|Karriere|Careers)\s*$", "", t, flags=re.I)
+    return t.strip()
+
+
+# ----------------------------
+# DuckDuckGo HTML search (no key)
+# ----------------------------
+def _unwrap_ddg_url(href: str) -> str:
+    """
+    DDG often returns redirect URLs like:
+    https://duckduckgo.com/l/?uddg=https%3A%2F%2Flinear.app%2F
+    We unwrap them to the real target URL.
+    """
+    if not href:
+        return href
+
+    try:
+        u = urlparse(href)
+        # DDG redirect pattern
+        if "duckduckgo.com" in (u.netloc or "") and u.path.startswith("/l/"):
+            qs = parse_qs(u.query or "")
+            if "uddg" in qs and qs["uddg"]:
+                return unquote(qs["uddg"][0])
+    except Exception:
+        pass
+
+    return href
+
+
+def _request_html(url: str, timeout_s: int = 12) -> str:
+    headers = {
+        "User-Agent": (
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+        ),
+        "Accept-Language": "de-DE,de;q=0.9,en;q=0.8",
+        "Referer": "https://duckduckgo.com/",
+    }
+    r = http_get(url, headers=headers, timeout_s=timeout_s, hedge=SEARCH_HEDGE)
+    if r.status_code >= 400:
+        return ""
+    return r.text or ""
+
+
+def _parse_lite_results(soup: BeautifulSoup) -> list[SearchResult]:
+    out: list[SearchResult] = []
+    # lite results: links usually have class "result-link"
+    for a in soup.select("a.result-link"):
+        title = a.get_text(" ", strip=True) or ""
+        href = (a.get("href") or "").strip()
+        href = _unwrap_ddg_url(href)
+        title = _clean_title(title)
+
+        if href and title:
+            out.append(SearchResult(title=title, url=href, snippet=""))
+    return out
+
+
+def _parse_html_results(soup: BeautifulSoup) -> list[SearchResult]:
+    out: list[SearchResult] = []
+    for res in soup.select(".result"):
+        a = res.select_one(".result__a")
+        if not a:
+            continue
+
+        href = (a.get("href") or "").strip()
+        href = _unwrap_ddg_url(href)
+
+        title = _clean_title(a.get_text(" ", strip=True) or "")
+        snippet_el = res.select_one(".result__snippet")
+        snippet = _norm(snippet_el.get_text(" ", strip=True)) if snippet_el else ""
+
+        if href and title:
+            out.append(SearchResult(title=title, url=href, snippet=snippet))
+    return out
+
+
+def _next_page_url(soup: BeautifulSoup, page_url: str) -> str:
+    """
+    Both DDG frontends paginate with a small form ("Next" / "Next Page >") whose hidden
+    inputs (q, s, dc, vqd, ...) carry the offset; replay it as a GET.
+    """
+    for form in soup.find_all("form"):
+        submits = form.find_all("input", attrs={"type": "submit"})
+        if not any("next" in (i.get("value") or "").lower() for i in submits):
+            continue
+        fields = [
+            (i.get("name"), i.get("value") or "")
+            for i in form.find_all("input")
+            if i.get("name") and (i.get("type") or "").lower() != "submit"
+        ]
+        if not fields:
+            continue
+        return urljoin(page_url, form.get("action") or "") + "?" + urlencode(fields)
+    return ""
+
+
+class DDGBackend:
+    name = "ddg"
+    cacheable = True
+
+    def __init__(self, timeout_s: int = 12):
+        self.timeout_s = timeout_s
+
+    def search_pages(self, query: str, max_pages: int = 5) -> Iterator[list[SearchResult]]:
+        """
+        Yield result pages (following the next-page form) for up to max_pages pages.
+        1) Try lite.duckduckgo.com (easier to parse, fewer class changes)
+        2) Fallback to duckduckgo.com/html if lite gives nothing on its first page
+        Also unwrap redirect links to real target URLs.
+        """
+        q = _norm(query)
+        if not q:
+            return
+
+        endpoints = [
+            ("https://lite.duckduckgo.com/lite/?q=" + quote_plus(q), _parse_lite_results),
+            ("https://duckduckgo.com/html/?q=" + quote_plus(q), _parse_html_results),
+        ]
+        for url, parse in endpoints:
+            page = 0
+            while url and page < max_pages:
+                html = _request_html(url, timeout_s=self.timeout_s)
+                if not html:
+                    break
+                soup = BeautifulSoup(html, "lxml")
+                results = parse(soup)
+                if not results:
+                    break
+                yield results
+                page += 1
+                url = _next_page_url(soup, url)
+            if page:
+                return
+
+    def search(self, query: str, max_results: int = 10) -> list[SearchResult]:
+        """
+        First result page only (see search_pages).
+        """
+        for results in self.search_pages(query, max_pages=1):
+            return results[:max_results]
+        return []
+
+
+# ----------------------------
+# Offline fixtures
+# ----------------------------
+class FixtureBackend:
+    """
+    Deterministic offline search.
+
+    `path` is either
+    - a JSON file: {"queries": {"<query>": [{title, url, snippet}, ...]}, "results": [{...}, ...]}
+      (both keys optional; a bare list is treated as "results"), or
+    - a directory of search-cache entries (cache/search/*.json), i.e. replay of real searches.
+
+    A missing path raises FileNotFoundError; data/search_fixtures.json ships a small example.
+    An exact (normalized) query match returns its recorded results. Otherwise all known results
+    are ranked by how many query words occur in title/snippet/url (ties: file order).
+    """
+
+    name = "fixture"
+    cacheable = False
+
+    def __init__(self, path: str = DEFAULT_FIXTURE_PATH):
+        self.path = path
+        self.queries: dict[str, list[SearchResult]] = {}
+        self.results: list[SearchResult] = []
+        self._load()
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return _norm(query).lower()
+
+    def _add(self, query: Optional[str], rows: list[dict]) -> None:
+        items = [
+            SearchResult(title=str(r.get("title") or ""), url=str(r.get("url") or ""), snippet=str(r.get("snippet") or ""))
+            for r in rows or []
+            if isinstance(r, dict) and r.get("url")
+        ]
+        if query:
+            self.queries.setdefault(self._key(query), []).extend(items)
+        seen = {r.url for r in self.results}
+        self.results.extend(r for r in items if r.url not in seen)
+
+    def _load(self) -> None:
+        if os.path.isdir(self.path):
+            for p in sorted(glob.glob(os.path.join(self.path, "*.json"))):
+                try:
+                    entry = json.loads(open(p, "r", encoding="utf-8").read())
+                except Exception:
+                    continue
+                if isinstance(entry, dict):
+                    self._add(entry.get("query"), entry.get("results") or [])
+            return
+        if not os.path.exists(self.path):
+            # an empty fixture backend would look like "no results" for every query
+            raise FileNotFoundError(
+                f"search fixtures not found: {self.path!r} (set SEARCH_FIXTURES to a JSON file or a cache/search directory)"
+            )
+        try:
+            data = json.loads(open(self.path, "r", encoding="utf-8").read())
+        except Exception:
+            return
+        if isinstance(data, list):
+            data = {"results": data}
+        for q, rows in (data.get("queries") or {}).items():
+            self._add(q, rows)
+        self._add(None, data.get("results") or [])
+
+    def _ranked(self, query: str) -> list[SearchResult]:
+        key = self._key(query)
+        if not key:
+            return []
+        if key in self.queries:
+            return list(self.queries[key])
+
+        words = [w for w in re.split(r"\W+", key) if len(w) > 2]
+        if not words:
+            return []
+        scored = []
+        for i, r in enumerate(self.results):
+            blob = f"{r.title} {r.snippet} {r.url}".lower()
+            s = sum(1 for w in words if w in blob)
+            if s > 0:
+                scored.append((-s, i, r))
+        scored.sort(key=lambda x: (x[0], x[1]))
+        return [r for _, _, r in scored]
+
+    def search(self, query: str, max_results: int = 10) -> list[SearchResult]:
+        return self._ranked(query)[:max_results]
+
+    def search_pages(self, query: str, max_pages: int = 5) -> Iterator[list[SearchResult]]:
+        ranked = self._ranked(query)
+        for page in range(max_pages):
+            chunk = ranked[page * FIXTURE_PAGE_SIZE : (page + 1) * FIXTURE_PAGE_SIZE]
+            if not chunk:
+                return
+            yield chunk
+
+
+# ----------------------------
+# Fan-out / failover
+# ----------------------------
+def _good_result(r: SearchResult) -> bool:
+    return bool(r.title) and urlparse(r.url).scheme in {"http", "https"}
+
+
+class FanoutBackend:
+    """
+    Ask all backends concurrently; merge (dedup on URL) in arrival order and return as soon
+    as max_results good results are in. Backends that fail or time out just contribute nothing.
+    """
+
+    def __init__(
+        self,
+        backends: list[SearchBackend],
+        accept: Callable[[SearchResult], bool] = _good_result,
+    ):
+        self.backends = list(backends)
+        self.accept = accept
+        self.name = "fanout(" + "+".join(b.name for b in self.backends) + ")"
+        self.cacheable = any(b.cacheable for b in self.backends)
+
+    def search(self, query: str, max_results: int = 10) -> list[SearchResult]:
+        if not self.backends:
+            return []
+        out: list[SearchResult] = []
+        seen: set[str] = set()
+        ex = ThreadPoolExecutor(max_workers=len(self.backends), thread_name_prefix="search-fanout")
+        try:
+            futures = [ex.submit(bind_caller(b.search), query, max_results) for b in self.backends]
+            for fut in as_completed(futures):
+                try:
+                    results = fut.result()
+                except Exception:
+                    continue
+                for r in results:
+                    if r.url in seen or not self.accept(r):
+                        continue
+                    seen.add(r.url)
+                    out.append(r)
+                    if len(out) >= max_results:
+                        return out
+            return out
+        finally:
+            ex.shutdown(wait=False, cancel_futures=True)
+
+
+# ----------------------------
+# Selection
+# ----------------------------
+_backend: Optional[SearchBackend] = None
+_backend_lock = threading.Lock()
+
+
+def _backend_from_name(name: str) -> SearchBackend:
+    name = (name or "").strip().lower()
+    if name == "fixture":
+        return FixtureBackend(os.environ.get("SEARCH_FIXTURES") or DEFAULT_FIXTURE_PATH)
+    return DDGBackend()
+
+
+def backend_from_env() -> SearchBackend:
+    names = [n for n in (os.environ.get("SEARCH_BACKEND") or "ddg").split(",") if n.strip()]
+    if len(names) > 1:
+        return FanoutBackend([_backend_from_name(n) for n in names])
+    return _backend_from_name(names[0] if names else "ddg")
+
+
+def get_search_backend() -> SearchBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = backend_from_env()
+    return _backend
+
+
+def configure_search_backend(backend: SearchBackend) -> None:
+    """
+    Swap the process-wide search backend (e.g. FixtureBackend for a benchmark).
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
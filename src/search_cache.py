@@ -0,0 +1,130 @@
+# src/search_cache.py
+"""
+Persistent cache for web search results (cache/search, shared by all sessions).
+
+Keyed by normalized query + backend + max_results.
+- fresh (age < SEARCH_CACHE_TTL_S): served from disk
+- stale (age < TTL + SEARCH_CACHE_STALE_S): served from disk, refreshed in a background thread
+- older / missing: searched live and stored
+Empty result lists are never stored (DDG answers throttled requests with an empty page).
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from .cache import cache_get_json, cache_set_json
+from .ratelimit import caller_scope
+
+
+SEARCH_CACHE_DIR = "cache/search"
+SEARCH_CACHE_TTL_S = 24 * 3600
+SEARCH_CACHE_STALE_S = 7 * 24 * 3600
+
+_lock = threading.Lock()
+_inflight: set[str] = set()
+_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "revalidations": 0, "errors": 0}
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", (query or "").strip()).lower()
+
+
+def search_cache_key(query: str, backend: str, max_results: int) -> str:
+    return f"{backend}|{int(max_results)}|{normalize_query(query)}"
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+
+def _store(key: str, query: str, backend: str, max_results: int, results: list[dict[str, Any]]) -> None:
+    if not results:
+        return
+    cache_set_json(
+        SEARCH_CACHE_DIR,
+        key,
+        {
+            "query": normalize_query(query),
+            "backend": backend,
+            "max_results": int(max_results),
+            "fetched_at": time.time(),
+            "results": results,
+        },
+    )
+
+
+def _revalidate(key: str, query: str, backend: str, max_results: int, fetch: Callable[[], list[dict[str, Any]]]) -> None:
+    try:
+        with caller_scope("search-revalidate"):
+            _store(key, query, backend, max_results, fetch())
+        _count("revalidations")
+    except Exception:
+        _count("errors")
+    finally:
+        with _lock:
+            _inflight.discard(key)
+
+
+def cached_search(
+    query: str,
+    backend: str,
+    max_results: int,
+    fetch: Callable[[], list[dict[str, Any]]],
+    ttl_s: Optional[float] = None,
+    stale_s: Optional[float] = None,
+    use_cache: bool = True,
+) -> list[dict[str, Any]]:
+    """
+    Return search results (list of plain dicts) for `query`, calling fetch() only when needed.
+    fetch must return JSON-serializable dicts.
+    """
+    if not use_cache:
+        return fetch()
+
+    ttl = SEARCH_CACHE_TTL_S if ttl_s is None else ttl_s
+    stale = SEARCH_CACHE_STALE_S if stale_s is None else stale_s
+    key = search_cache_key(query, backend, max_results)
+
+    entry = cache_get_json(SEARCH_CACHE_DIR, key)
+    if entry and entry.get("results"):
+        age = time.time() - float(entry.get("fetched_at") or 0)
+        if age < ttl:
+            _count("hits")
+            return list(entry["results"])
+        if age < ttl + stale:
+            _count("stale_hits")
+            with _lock:
+                start = key not in _inflight
+                _inflight.add(key)
+            if start:
+                threading.Thread(
+                    target=_revalidate,
+                    args=(key, query, backend, max_results, fetch),
+                    name="search-revalidate",
+                    daemon=True,
+                ).start()
+            return list(entry["results"])
+
+    _count("misses")
+    try:
+        results = fetch()
+    except Exception:
+        _count("errors")
+        if entry and entry.get("results"):
+            return list(entry["results"])
+        raise
+    if results:
+        _store(key, query, backend, max_results, results)
+    elif entry and entry.get("results"):
+        # live search came back empty (throttled?): an expired answer beats none
+        return list(entry["results"])
+    return results
+
+
+def search_cache_stats() -> dict[str, Any]:
+    with _lock:
+        return dict(_stats, inflight=len(_inflight))
@@ -0,0 +1,15 @@
+# src/tokens.py
+import math
+
+
+# Rough average for mixed EN/DE web text with the OpenAI tokenizers.
+CHARS_PER_TOKEN = 4.0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (no tokenizer dependency). Good enough for budgets and reporting.
+    """
+    if not text:
+        return 0
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN))
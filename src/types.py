@@ -2,6 +2,13 @@ from dataclasses import dataclass, field
 from typing import List
 
 
+@dataclass
+class SearchResult:
+    title: str
+    url: str
+    snippet: str = ""
+
+
 @dataclass
 class Lead:
     company_name: str
@@ -1,14 +1,54 @@
 import re
 import time
-import os
-import hashlib
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
 from typing import Optional
-from urllib.parse import urljoin, urlparse
 
-import requests
 from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from . import http_cache
+from .http_cache import CacheEntry, load_entry, store_entry, touch_entry
+from .crawl import CrawlBudget, CrawlFrontier, fetch_sitemap_urls, link_candidates, site_key
+from .extract import fast_parse
+from .host_health import get_host_health
+from .http_client import HedgePolicy, ensure_hedge_workers, http_get, response_latency_s
+from .ratelimit import bind_caller
+
+
+# Global cap on in-flight fetches for batch runs (shared by all companies in the batch).
+ASYNC_FETCH_CONCURRENCY = 64
+
+# Byte cap per page download. The first 1.5 MB of HTML is plenty:
+# _fetch_and_parse keeps at most 18k chars of visible text anyway.
+MAX_HTML_BYTES = 1_500_000
+
+# HTML -> text engines: "bs4" (full BeautifulSoup tree) or "lxml" (streaming, see extract.py).
+# Same title / text / links; lxml is several times faster (bench_extract.py) and is the default
+# for the research crawl. bs4 stays available as a fallback.
+EXTRACT_ENGINES = ("bs4", "lxml")
+DEFAULT_EXTRACT_ENGINE = "lxml"
+
+# Hedge page fetches after the host's p90 latency (hosts without history are not hedged).
+FETCH_HEDGE = HedgePolicy(enabled=True)
+
+_CHARSET_HEADER_RE = re.compile(r"charset=[\"']?([A-Za-z0-9_\-:.]+)", re.I)
+_CHARSET_META_RE = re.compile(rb"<meta[^>]+charset=[\"']?([A-Za-z0-9_\-:.]+)", re.I)
+
+
+@dataclass
+class ParsedDocument:
+    """
+    One HTML page, parsed exactly once.
+    Title, visible text and link hrefs all come from the same tree; the tree itself is not kept.
+    """
+
+    url: str
+    html: str
+    title: str = ""
+    text: str = ""
+    hrefs: list[str] = field(default_factory=list)  # raw <a href> values, in document order
+    canonical: str = ""  # <link rel="canonical"> href, if any
 
 
 @dataclass
@@ -17,6 +57,7 @@ class FetchedPage:
     title: str
     text: str
     html: str = ""  # keep raw HTML for better people extraction
+    doc: Optional[ParsedDocument] = field(default=None, repr=False)
 
 
 def _clean_text(s: str) -> str:
@@ -24,69 +65,191 @@ def _clean_text(s: str) -> str:
     return s.strip()
 
 
-def _http_cache_dir() -> str:
-    d = os.path.join(".cache", "http")
-    os.makedirs(d, exist_ok=True)
-    return d
+def _read_capped(r, max_bytes: int) -> bytes:
+    buf = bytearray()
+    for chunk in r.iter_content(chunk_size=64 * 1024):
+        if not chunk:
+            continue
+        buf.extend(chunk)
+        if len(buf) >= max_bytes:
+            break
+    return bytes(buf[:max_bytes])
 
 
-def _http_cache_path(url: str) -> str:
-    key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
-    return os.path.join(_http_cache_dir(), f"{key}.html")
+def _detect_encoding(content_type: str, raw: bytes) -> str:
+    """
+    Cheap encoding detection: header charset -> BOM -> <meta charset> in the first 4 KB -> utf-8.
+    (requests' own detection scans the whole body and is slow on big pages.)
+    """
+    m = _CHARSET_HEADER_RE.search(content_type or "")
+    if m:
+        return m.group(1)
+    if raw.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    if raw.startswith(b"\xff\xfe") or raw.startswith(b"\xfe\xff"):
+        return "utf-16"
+    m = _CHARSET_META_RE.search(raw[:4096])
+    if m:
+        return m.group(1).decode("ascii", errors="ignore") or "utf-8"
+    return "utf-8"
+
+
+def _decode_html(raw: bytes, content_type: str) -> str:
+    enc = _detect_encoding(content_type, raw)
+    try:
+        return raw.decode(enc, errors="replace")
+    except LookupError:
+        return raw.decode("utf-8", errors="replace")
 
 
-def fetch_url(url: str, timeout_s: int = 12, use_cache: bool = True) -> Optional[str]:
+def fetch_url(
+    url: str,
+    timeout_s: int = 12,
+    use_cache: bool = True,
+    ttl_s: Optional[float] = None,
+    revalidate: bool = False,
+    max_bytes: Optional[int] = None,
+    content_types: tuple[str, ...] = ("text/html",),
+) -> Optional[str]:
     """
     Fetch HTML from a URL. Returns HTML string or None on error.
-    Uses a small disk cache to speed up repeated runs and reduce flakiness.
+    content_types: accepted Content-Type substrings (sitemaps pass ("xml",)).
+    Uses a disk cache (see http_cache.py):
+    - fresh entries (younger than ttl_s, default http_cache.HTTP_CACHE_TTL_S)
+      are returned without network
+    - stale entries (or revalidate=True) are refreshed with a conditional GET;
+      a 304 keeps the cached body and only bumps the fetch time
+    - if revalidation fails, the stale copy is still better than nothing
+    use_cache=False bypasses the cache completely (no read, no write).
+    The body is streamed: status and content-type are checked on the headers
+    before any body is read, and at most max_bytes (default MAX_HTML_BYTES) are kept.
+    Host health (host_health.py): negative-cached URLs and hosts with an open circuit
+    breaker are skipped, and the timeout adapts to the host's observed latency.
     """
     if not url:
         return None
 
+    entry: Optional[CacheEntry] = None
     if use_cache:
-        p = _http_cache_path(url)
-        if os.path.exists(p):
-            try:
-                return open(p, "r", encoding="utf-8", errors="ignore").read()
-            except Exception:
-                pass
-
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X) AppleWebKit/537.36 "
-            "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+        entry = load_entry(url)
+        ttl = http_cache.HTTP_CACHE_TTL_S if ttl_s is None else ttl_s
+        if entry and not revalidate and entry.is_fresh(ttl):
+            return entry.html
+
+    stale = entry.html if entry else None
+
+    # known-bad URL or a host that keeps failing: don't pay the timeout again
+    health = get_host_health()
+    if use_cache and health.negative_reason(url):
+        return stale
+    if health.is_open(url):
+        return stale
+
+    headers = entry.validator_headers() if entry else {}
+    try:
+        r = http_get(
+            url,
+            headers=headers or None,
+            timeout_s=health.timeout_for(url, timeout_s),
+            hedge=FETCH_HEDGE,
+            stream=True,
         )
-    }
+    except Exception:
+        health.record_failure(url, "error")
+        return stale
+    # network time of the answering attempt only: scheduler queueing and retry backoff would
+    # inflate the p90 that drives hedging and adaptive timeouts
+    latency_s = response_latency_s(r)
+
     try:
-        r = requests.get(url, headers=headers, timeout=timeout_s, allow_redirects=True)
+        if r.status_code == 304 and entry:
+            health.record_success(url, latency_s)
+            touch_entry(
+                entry,
+                etag=r.headers.get("etag", "") or "",
+                last_modified=r.headers.get("last-modified", "") or "",
+            )
+            return entry.html
+        if r.status_code == 429:
+            health.record_failure(url, "http_429")
+            return stale
+        if r.status_code >= 500:
+            health.record_failure(url, "http_5xx")
+            return stale
         if r.status_code >= 400:
+            health.record_failure(url, "http_4xx", latency_s)
             return None
         ct = (r.headers.get("content-type", "") or "").lower()
-        if "text/html" not in ct:
+        if not any(t in ct for t in content_types):
+            health.record_failure(url, "not_html", latency_s)
             return None
-        html = r.text
+        html = _decode_html(_read_capped(r, int(max_bytes or MAX_HTML_BYTES)), ct)
+        health.record_success(url, latency_s)
 
         if use_cache:
-            try:
-                open(_http_cache_path(url), "w", encoding="utf-8").write(html)
-            except Exception:
-                pass
+            store_entry(
+                CacheEntry(
+                    url=url,
+                    html=html,
+                    fetched_at=time.time(),
+                    final_url=str(r.url or url),
+                    status=int(r.status_code),
+                    content_type=ct,
+                    etag=r.headers.get("etag", "") or "",
+                    last_modified=r.headers.get("last-modified", "") or "",
+                )
+            )
 
         return html
     except Exception:
-        return None
+        health.record_failure(url, "error")
+        return stale
+    finally:
+        r.close()
 
 
-def html_to_text(html: str) -> tuple[str, str]:
+def parse_document(url: str, html: str, engine: str = DEFAULT_EXTRACT_ENGINE) -> ParsedDocument:
     """
-    Extract (title, visible text) from HTML.
+    Parse HTML once and pull out everything the pipeline needs (title, visible text, links).
     """
+    if engine not in EXTRACT_ENGINES:
+        raise ValueError(f"Unknown extract engine: {engine!r} (expected one of {EXTRACT_ENGINES})")
+    if engine == "lxml":
+        title, text, hrefs, canonical = fast_parse(html, max_text=None, want_links=True)
+        return ParsedDocument(url=url, html=html, title=title, text=text, hrefs=hrefs, canonical=canonical)
+
     soup = BeautifulSoup(html, "lxml")
+    hrefs = [(a.get("href") or "").strip() for a in soup.find_all("a", href=True)]
+    canonical_el = soup.select_one('link[rel~="canonical"][href]')
+    canonical = (canonical_el.get("href") or "").strip() if canonical_el else ""
     for tag in soup(["script", "style", "noscript"]):
         tag.decompose()
     title = soup.title.get_text(" ", strip=True) if soup.title else ""
     text = soup.get_text(" ", strip=True)
-    return _clean_text(title), _clean_text(text)
+    return ParsedDocument(
+        url=url,
+        html=html,
+        title=_clean_text(title),
+        text=_clean_text(text),
+        hrefs=hrefs,
+        canonical=canonical,
+    )
+
+
+def html_to_text(
+    html: str,
+    engine: str = DEFAULT_EXTRACT_ENGINE,
+    max_text: Optional[int] = None,
+) -> tuple[str, str]:
+    """
+    Extract (title, visible text) from HTML.
+    engine="lxml" streams the document and stops once max_text chars are collected.
+    """
+    if engine == "lxml":
+        title, text, _, _ = fast_parse(html, max_text=max_text, want_links=False)
+        return title, text
+    doc = parse_document("", html, engine=engine)
+    return doc.title, (doc.text[:max_text] if max_text is not None else doc.text)
 
 
 def pick_internal_links(
@@ -95,123 +258,21 @@ def pick_internal_links(
     max_links: int = 2,
     keywords: Optional[list[str]] = None,
     block_keywords: Optional[list[str]] = None,
+    doc: Optional[ParsedDocument] = None,
 ) -> list[str]:
     """
     Pick useful internal links. Supports keyword allowlist + blocklist.
     Generic + English/German variants.
+    Pass `doc` (from parse_document) to reuse an already parsed page instead of parsing `html` again.
     """
-    soup = BeautifulSoup(html, "lxml")
+    if doc is not None:
+        hrefs = doc.hrefs
+    else:
+        soup = BeautifulSoup(html, "lxml")
+        hrefs = [(a.get("href") or "").strip() for a in soup.find_all("a", href=True)]
     base = base_url.rstrip("/") + "/"
-    base_netloc = urlparse(base).netloc.lower()
-
-    if keywords is None:
-        keywords = [
-            # English
-            "about",
-            "company",
-            "team",
-            "leadership",
-            "management",
-            "imprint",
-            "contact",
-            "careers",
-            "jobs",
-            # German
-            "ueber-uns",
-            "über-uns",
-            "uber-uns",
-            "unternehmen",
-            "team",
-            "menschen",
-            "leitung",
-            "führung",
-            "geschaeftsfuehrung",
-            "geschäftsführung",
-            "impressum",
-            "kontakt",
-            "karriere",
-            "stellen",
-            "jobs",
-        ]
-
-    if block_keywords is None:
-        block_keywords = [
-            "blog",
-            "changelog",
-            "docs",
-            "documentation",
-            "help",
-            "press",
-            "news",
-            "events",
-            "community",
-            "privacy",
-            "terms",
-            "status",
-            "legal",
-            "security",
-            "cookie",
-            # common noisy sections
-            "customers",
-            "case-studies",
-            "case-studies",
-            "partners",
-        ]
-
-    candidates: list[tuple[int, str]] = []
-
-    def score_path(path: str) -> int:
-        path = path.lower()
-        s = 0
-        boosts = [
-            ("leadership", 60),
-            ("team", 55),
-            ("management", 55),
-            ("about", 50),
-            ("company", 45),
-            ("ueber-uns", 50),
-            ("über-uns", 50),
-            ("impressum", 45),
-            ("imprint", 45),
-            ("kontakt", 40),
-            ("contact", 40),
-            ("geschaeftsfuehrung", 55),
-            ("geschäftsführung", 55),
-            ("karriere", 10),
-            ("careers", 10),
-            ("jobs", 10),
-        ]
-        for k, w in boosts:
-            if k in path:
-                s += w
-        for k in keywords:
-            if k.lower() in path:
-                s += 5
-        for k in block_keywords:
-            if k.lower() in path:
-                s -= 80
-        return s
-
-    for a in soup.find_all("a", href=True):
-        href = (a.get("href") or "").strip()
-        if not href or href.startswith("#") or href.startswith("mailto:") or href.startswith("tel:"):
-            continue
-        full = urljoin(base, href)
-        netloc = urlparse(full).netloc.lower()
-        if netloc != base_netloc:
-            continue
-        path = (urlparse(full).path or "").lower()
-        if not path or path == "/":
-            continue
-        if any(path.endswith(ext) for ext in [".pdf", ".zip", ".png", ".jpg", ".jpeg", ".svg", ".webp"]):
-            continue
-
-        s = score_path(path)
-        if s <= 0:
-            continue
-        candidates.append((s, full))
+    candidates = link_candidates(base, hrefs, keywords, block_keywords)
 
-    candidates.sort(key=lambda x: x[0], reverse=True)
     seen = set()
     uniq: list[str] = []
     for _, u in candidates:
@@ -229,19 +290,97 @@ def _fetch_and_parse(
     timeout_s: int = 12,
     max_text: int = 18000,
     keep_html: bool = True,
+    engine: str = DEFAULT_EXTRACT_ENGINE,
 ) -> Optional[FetchedPage]:
     html = fetch_url(u, timeout_s=timeout_s, use_cache=True)
     if not html:
         return None
-    title, text = html_to_text(html)
+    return _page_from_doc(parse_document(u, html, engine=engine), max_text=max_text, keep_html=keep_html)
 
+
+def _page_from_doc(doc: ParsedDocument, max_text: int = 18000, keep_html: bool = True) -> FetchedPage:
+    text = doc.text
     low = (text or "").strip().lower()
     if low in {"loading…", "loading...", "loading"} or len(low) < 120:
         text = text[:max_text]
     else:
         text = text[:max_text]
 
-    return FetchedPage(url=u, title=title, text=text, html=(html if keep_html else ""))
+    return FetchedPage(
+        url=doc.url,
+        title=doc.title,
+        text=text,
+        html=(doc.html if keep_html else ""),
+        doc=doc,
+    )
+
+
+def _dedupe_urls(urls: list[str]) -> list[str]:
+    seen = set()
+    ordered: list[str] = []
+    for u in urls:
+        if u in seen:
+            continue
+        seen.add(u)
+        ordered.append(u)
+    return ordered
+
+
+def _html_bytes(page: FetchedPage) -> int:
+    return len(page.html.encode("utf-8", errors="replace"))
+
+
+def _start_frontier(
+    company_url: str,
+    first: FetchedPage,
+    max_depth: int,
+    keywords: Optional[list[str]],
+    block_keywords: Optional[list[str]],
+) -> CrawlFrontier:
+    frontier = CrawlFrontier(company_url, max_depth=max_depth, keywords=keywords, block_keywords=block_keywords)
+    if first.doc is not None:
+        frontier.accept_canonical(first.url, first.doc.canonical)
+        frontier.add_links(first.url, first.doc.hrefs, depth=1)
+    return frontier
+
+
+def _next_batch(frontier: CrawlFrontier, budget: CrawlBudget, domain: str, width: int) -> list[tuple[str, int]]:
+    """
+    Up to `width` (url, depth) items from the frontier, each with a reserved budget slot.
+    """
+    batch: list[tuple[str, int]] = []
+    while len(frontier) and len(batch) < width:
+        if not budget.reserve(domain):
+            break
+        item = frontier.pop()
+        if item is None:
+            budget.release(domain)
+            break
+        batch.append(item)
+    return batch
+
+
+def _accept_batch(
+    frontier: CrawlFrontier,
+    budget: CrawlBudget,
+    domain: str,
+    batch: list[tuple[str, int]],
+    results: list[Optional[FetchedPage]],
+    pages: list[FetchedPage],
+) -> None:
+    # keep frontier (priority) order, not completion order
+    for (u, depth), p in zip(batch, results):
+        if not p:
+            budget.release(domain)
+            continue
+        budget.record_bytes(domain, _html_bytes(p))
+        canonical = p.doc.canonical if p.doc is not None else ""
+        if not frontier.accept_canonical(p.url, canonical):
+            budget.release(domain)
+            continue
+        pages.append(p)
+        if p.doc is not None and depth < frontier.max_depth:
+            frontier.add_links(p.url, p.doc.hrefs, depth=depth + 1)
 
 
 def fetch_pages_for_company(
@@ -252,70 +391,221 @@ def fetch_pages_for_company(
     parallel: bool = True,
     keywords: Optional[list[str]] = None,
     block_keywords: Optional[list[str]] = None,
+    engine: str = DEFAULT_EXTRACT_ENGINE,
+    max_depth: int = 2,
+    use_sitemap: bool = True,
+    budget: Optional[CrawlBudget] = None,
 ) -> list[FetchedPage]:
     """
     Fetch homepage + useful internal pages.
+    Pages come from a crawl frontier (see crawl.py): homepage links and links of already fetched
+    pages up to max_depth clicks deep, best score_path first; sitemap.xml is only fetched (and
+    charged to the byte budget) once the frontier holds fewer URLs than pages still wanted.
     Speed improvements:
     - disk cache for HTML
+    - every page parsed once (text + links from the same tree)
+    - canonical-URL dedup before and after fetching
     - optional parallel fetching for internal pages
+    `budget` caps pages/bytes per domain; pass one shared CrawlBudget to cap a whole batch.
     """
     if not company_url:
         return []
 
-    homepage_html = fetch_url(company_url, timeout_s=timeout_s, use_cache=True)
-    if not homepage_html:
+    budget = budget or CrawlBudget(max_pages_per_domain=max_pages)
+    domain = site_key(company_url)
+    if not budget.reserve(domain):
         return []
 
-    urls = [company_url]
-    urls.extend(
-        pick_internal_links(
-            company_url,
-            homepage_html,
-            max_links=max(0, max_pages - 1),
-            keywords=keywords,
-            block_keywords=block_keywords,
-        )
-    )
-
-    seen = set()
-    ordered: list[str] = []
-    for u in urls:
-        if u in seen:
-            continue
-        seen.add(u)
-        ordered.append(u)
+    first = _fetch_and_parse(company_url, timeout_s=timeout_s, engine=engine)
+    if not first:
+        budget.release(domain)
+        return []
+    budget.record_bytes(domain, _html_bytes(first))
 
-    pages: list[FetchedPage] = []
+    frontier = _start_frontier(company_url, first, max_depth, keywords, block_keywords)
+    sitemap_pending = use_sitemap
 
-    first = _fetch_and_parse(ordered[0], timeout_s=timeout_s)
-    if first:
-        pages.append(first)
+    pages: list[FetchedPage] = [first]
     if sleep_s > 0:
         time.sleep(sleep_s)
 
-    rest = ordered[1:max_pages]
-    if not rest:
-        return pages
-
-    if not parallel or len(rest) == 1:
-        for u in rest:
-            p = _fetch_and_parse(u, timeout_s=timeout_s)
-            if p:
-                pages.append(p)
-            if sleep_s > 0:
-                time.sleep(sleep_s)
-        return pages
-
-    with ThreadPoolExecutor(max_workers=min(6, len(rest))) as ex:
-        futs = {ex.submit(_fetch_and_parse, u, timeout_s): u for u in rest}
-        for fut in as_completed(futs):
-            p = fut.result()
-            if p:
-                pages.append(p)
-
-    pages_sorted: list[FetchedPage] = []
-    by_url = {p.url: p for p in pages}
-    for u in ordered[:max_pages]:
-        if u in by_url:
-            pages_sorted.append(by_url[u])
-    return pages_sorted
+    while len(pages) < max_pages:
+        # the sitemap is only worth its download once the links found so far can't fill the budget
+        if sitemap_pending and len(frontier) < max_pages - len(pages):
+            sitemap_pending = False
+            frontier.add_sitemap_urls(fetch_sitemap_urls(company_url, timeout_s=min(8, timeout_s), budget=budget))
+        if not len(frontier):
+            break
+        width = min(6, max_pages - len(pages)) if parallel else 1
+        batch = _next_batch(frontier, budget, domain, width)
+        if not batch:
+            break
+
+        if len(batch) == 1:
+            results = [_fetch_and_parse(batch[0][0], timeout_s, 18000, True, engine)]
+        else:
+            with ThreadPoolExecutor(max_workers=len(batch)) as ex:
+                fetch = bind_caller(_fetch_and_parse)
+                results = list(ex.map(lambda it: fetch(it[0], timeout_s, 18000, True, engine), batch))
+        _accept_batch(frontier, budget, domain, batch, results, pages)
+
+        if sleep_s > 0:
+            time.sleep(sleep_s)
+
+    return pages[:max_pages]
+
+
+# ----------------------------
+# Async engine (batch research)
+# ----------------------------
+async def _run_blocking(executor: Optional[Executor], fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, bind_caller(fn), *args)
+
+
+async def fetch_pages_for_company_async(
+    company_url: str,
+    max_pages: int = 3,
+    timeout_s: int = 12,
+    keywords: Optional[list[str]] = None,
+    block_keywords: Optional[list[str]] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    executor: Optional[Executor] = None,
+    engine: str = DEFAULT_EXTRACT_ENGINE,
+    max_depth: int = 2,
+    use_sitemap: bool = True,
+    budget: Optional[CrawlBudget] = None,
+) -> list[FetchedPage]:
+    """
+    Async variant of fetch_pages_for_company (same frontier, sitemap and budget rules).
+    Every fetch waits on `semaphore`, so many companies can share one global limit.
+    The blocking fetch/parse helpers run in `executor` (loop default if None).
+    """
+    if not company_url:
+        return []
+
+    sem = semaphore or asyncio.Semaphore(ASYNC_FETCH_CONCURRENCY)
+    budget = budget or CrawlBudget(max_pages_per_domain=max_pages)
+    domain = site_key(company_url)
+    if not budget.reserve(domain):
+        return []
+
+    async with sem:
+        first = await _run_blocking(executor, _fetch_and_parse, company_url, timeout_s, 18000, True, engine)
+    if not first:
+        budget.release(domain)
+        return []
+    budget.record_bytes(domain, _html_bytes(first))
+
+    frontier = _start_frontier(company_url, first, max_depth, keywords, block_keywords)
+    sitemap_pending = use_sitemap
+
+    async def one(u: str) -> Optional[FetchedPage]:
+        async with sem:
+            return await _run_blocking(executor, _fetch_and_parse, u, timeout_s, 18000, True, engine)
+
+    pages: list[FetchedPage] = [first]
+    while len(pages) < max_pages:
+        # the sitemap is only worth its download once the links found so far can't fill the budget
+        if sitemap_pending and len(frontier) < max_pages - len(pages):
+            sitemap_pending = False
+            async with sem:
+                sitemap = await _run_blocking(
+                    executor, lambda: fetch_sitemap_urls(company_url, timeout_s=min(8, timeout_s), budget=budget)
+                )
+            frontier.add_sitemap_urls(sitemap)
+        if not len(frontier):
+            break
+        batch = _next_batch(frontier, budget, domain, max_pages - len(pages))
+        if not batch:
+            break
+        results = await asyncio.gather(*[one(u) for u, _ in batch])
+        _accept_batch(frontier, budget, domain, batch, list(results), pages)
+
+    return pages[:max_pages]
+
+
+async def fetch_pages_for_companies_async(
+    company_urls: list[str],
+    max_pages: int = 3,
+    timeout_s: int = 12,
+    concurrency: int = ASYNC_FETCH_CONCURRENCY,
+    keywords: Optional[list[str]] = None,
+    block_keywords: Optional[list[str]] = None,
+    engine: str = DEFAULT_EXTRACT_ENGINE,
+    max_depth: int = 2,
+    use_sitemap: bool = True,
+    budget: Optional[CrawlBudget] = None,
+) -> dict[str, list[FetchedPage]]:
+    """
+    Fetch pages for many companies at once under ONE concurrency limit.
+    All companies share one CrawlBudget (`budget`, default: max_pages per domain), so a
+    budget with max_total_pages / max_total_bytes caps the whole batch.
+    Returns {company_url: pages}. A failing company yields [] instead of aborting the batch.
+    """
+    urls = _dedupe_urls([u for u in company_urls if u])
+    if not urls:
+        return {}
+
+    concurrency = max(1, int(concurrency))
+    sem = asyncio.Semaphore(concurrency)
+    ensure_hedge_workers(concurrency)
+    budget = budget or CrawlBudget(max_pages_per_domain=max_pages)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        results = await asyncio.gather(
+            *[
+                fetch_pages_for_company_async(
+                    u,
+                    max_pages=max_pages,
+                    timeout_s=timeout_s,
+                    keywords=keywords,
+                    block_keywords=block_keywords,
+                    semaphore=sem,
+                    executor=ex,
+                    engine=engine,
+                    max_depth=max_depth,
+                    use_sitemap=use_sitemap,
+                    budget=budget,
+                )
+                for u in urls
+            ],
+            return_exceptions=True,
+        )
+
+    out: dict[str, list[FetchedPage]] = {}
+    for u, r in zip(urls, results):
+        out[u] = r if isinstance(r, list) else []
+    return out
+
+
+def fetch_pages_for_companies(
+    company_urls: list[str],
+    max_pages: int = 3,
+    timeout_s: int = 12,
+    concurrency: int = ASYNC_FETCH_CONCURRENCY,
+    keywords: Optional[list[str]] = None,
+    block_keywords: Optional[list[str]] = None,
+    engine: str = DEFAULT_EXTRACT_ENGINE,
+    max_depth: int = 2,
+    use_sitemap: bool = True,
+    budget: Optional[CrawlBudget] = None,
+) -> dict[str, list[FetchedPage]]:
+    """
+    Sync entry point for batch research (CSV leads lists, scripts).
+    Wall time is roughly the slowest few sites instead of the sum of all of them.
+    """
+    return asyncio.run(
+        fetch_pages_for_companies_async(
+            company_urls,
+            max_pages=max_pages,
+            timeout_s=timeout_s,
+            concurrency=concurrency,
+            keywords=keywords,
+            block_keywords=block_keywords,
+            engine=engine,
+            max_depth=max_depth,
+            use_sitemap=use_sitemap,
+            budget=budget,
+        )
+    )
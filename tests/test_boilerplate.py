@@ -0,0 +1,52 @@
+from src.boilerplate import strip_site_boilerplate
+from src.web import FetchedPage
+
+
+NAV = " ".join(f"nav{i}" for i in range(15))
+PRODUCT = " ".join(f"product{i}" for i in range(20))
+
+
+def _page(name: str, text: str) -> FetchedPage:
+    return FetchedPage(url=f"https://acme.example/{name}", title=name, text=text)
+
+
+def test_nav_is_kept_once_on_the_first_page():
+    pages = [_page("", f"{NAV} home intro"), _page("about", f"{NAV} about us"), _page("team", f"{NAV} our team")]
+    cleaned, stats = strip_site_boilerplate(pages)
+    assert cleaned[0].text == pages[0].text
+    assert cleaned[1].text == "about us"
+    assert cleaned[2].text == "our team"
+    assert stats["chars_saved"] == stats["chars_before"] - stats["chars_after"] > 0
+
+
+def test_block_shared_by_non_first_pages_survives_once():
+    pages = [
+        _page("", f"{NAV} home intro"),
+        _page("products", f"{NAV} {PRODUCT} products page"),
+        _page("solutions", f"{NAV} {PRODUCT} solutions page"),
+    ]
+    cleaned, _ = strip_site_boilerplate(pages)
+    assert PRODUCT in cleaned[1].text
+    assert PRODUCT not in cleaned[2].text
+    assert cleaned[2].text == "solutions page"
+
+
+def test_keep_first_false_strips_every_page():
+    pages = [_page("", f"{NAV} home intro"), _page("about", f"{NAV} about us")]
+    cleaned, _ = strip_site_boilerplate(pages, keep_first=False)
+    assert [p.text for p in cleaned] == ["home intro", "about us"]
+
+
+def test_short_repeats_are_content():
+    tagline = "fast reliable logistics software for teams"  # < MIN_RUN_WORDS
+    pages = [_page("", f"{tagline} home"), _page("about", f"{tagline} about")]
+    cleaned, stats = strip_site_boilerplate(pages)
+    assert [p.text for p in cleaned] == [p.text for p in pages]
+    assert stats["chars_saved"] == 0
+
+
+def test_inputs_are_not_modified():
+    pages = [_page("", f"{NAV} a"), _page("b", f"{NAV} b")]
+    before = [p.text for p in pages]
+    strip_site_boilerplate(pages)
+    assert [p.text for p in pages] == before
@@ -0,0 +1,65 @@
+import contextlib
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+from src import brief_view  # noqa: E402
+
+
+class _Slot:
+    def __init__(self, log: list):
+        self.log = log
+
+    @contextlib.contextmanager
+    def container(self):
+        self.log.append("container")
+        yield
+
+
+@pytest.fixture
+def fake_st(monkeypatch):
+    log: list = []
+
+    @contextlib.contextmanager
+    def spinner(text):
+        log.append(("spinner", text))
+        yield
+
+    st = SimpleNamespace(spinner=spinner, session_state={})
+    monkeypatch.setattr(brief_view, "st", st)
+    return st, log
+
+
+def test_stream_into_spins_until_first_state_then_renders_partials(fake_st):
+    _, log = fake_st
+    states = [{"partial": True, "n": 1}, {"partial": True, "n": 2}, {"n": 3}]
+    rendered = []
+    final = brief_view._stream_into(_Slot(log), states, lambda s: rendered.append(s["n"]), "warte…")
+    assert final == {"n": 3}
+    assert rendered == [1, 2]
+    assert log[:2] == ["container", ("spinner", "warte…")]
+
+
+def test_stream_into_empty_generator_returns_none(fake_st):
+    _, log = fake_st
+    assert brief_view._stream_into(_Slot(log), iter(()), lambda s: None, "x") is None
+
+
+def test_ensure_profile_streams_once_then_uses_the_session_cache(fake_st, monkeypatch):
+    st, log = fake_st
+    calls = []
+
+    def iter_build(name, url, use_cache=True):
+        calls.append(name)
+        yield {"partial": True, "profile": {"summary": "A"}}
+        yield {"profile": {"summary": "Acme"}, "from_cache": False}
+
+    monkeypatch.setattr(brief_view, "iter_build_company_profile", iter_build)
+    rendered = []
+    first = brief_view.ensure_profile("Acme", "https://acme.de", True, slot=_Slot(log), render=rendered.append)
+    again = brief_view.ensure_profile("Acme", "https://acme.de", True, slot=_Slot(log), render=rendered.append)
+    assert first is again and first["profile"]["summary"] == "Acme"
+    assert calls == ["Acme"] and len(rendered) == 1
+    assert st.session_state["profiles_by_name"]["Acme"] is first
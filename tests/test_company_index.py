@@ -0,0 +1,78 @@
+import json
+
+from src.company_index import CompanyIndex, rebuild_from_profiles, tokenize
+
+
+def _profile(name: str, url: str, summary: str, sells: list[str], page_text: str = "") -> dict:
+    return {
+        "company_name": name,
+        "company_url": url,
+        "profile": {"company_summary": summary, "what_they_sell": sells, "likely_users": []},
+        "pages": [{"url": url, "title": name, "text": page_text}],
+    }
+
+
+LOGISTICS = _profile("Routify", "https://www.routify.de/", "Routenplanung für Speditionen", ["Tourenplanung Software"])
+DESIGN = _profile("Pixelhaus", "https://pixelhaus.com/", "Design agency for brands", ["branding", "web design"])
+MEDICAL = _profile(
+    "MediScan", "https://mediscan.ch/", "Imaging software for clinics", ["software for radiology"], "Based in Switzerland"
+)
+
+
+def test_tokenize_folds_umlauts_and_drops_stopwords():
+    assert tokenize("Lösungen für die Größe 2024 GmbH") == ["loesungen", "groesse"]
+
+
+def test_search_ranks_matching_company_first(tmp_path):
+    idx = CompanyIndex(path=str(tmp_path / "companies.json"))
+    for p in (LOGISTICS, DESIGN, MEDICAL):
+        idx.add_profile(p, save=False)
+    hits = idx.search("tourenplanung speditionen")
+    assert [h["company_name"] for h in hits] == ["Routify"]
+    assert hits[0]["source"] == "local_index"
+    assert idx.search("software")[0]["company_name"] in {"Routify", "MediScan"}
+    assert idx.search("nothing matches") == []
+
+
+def test_country_and_required_filters(tmp_path):
+    idx = CompanyIndex(path=str(tmp_path / "companies.json"))
+    for p in (LOGISTICS, DESIGN, MEDICAL):
+        idx.add_profile(p, save=False)
+    assert [h["company_name"] for h in idx.search("software", country="Germany")] == ["Routify"]
+    assert [h["company_name"] for h in idx.search("software", country="schweiz")] == ["MediScan"]
+    assert [h["company_name"] for h in idx.search("software design", required="radiology")] == ["MediScan"]
+
+
+def test_reindex_replaces_document(tmp_path):
+    idx = CompanyIndex(path=str(tmp_path / "companies.json"))
+    idx.add_profile(DESIGN, save=False)
+    idx.add_profile(_profile("Pixelhaus", "https://pixelhaus.com/", "Now a bakery", ["bread"]), save=False)
+    assert len(idx) == 1
+    assert idx.search("branding") == []
+    assert idx.search("bread")[0]["company_name"] == "Pixelhaus"
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    path = str(tmp_path / "companies.json")
+    idx = CompanyIndex(path=path)
+    idx.add_profile(LOGISTICS)
+    again = CompanyIndex(path=path)
+    assert len(again) == 1
+    assert again.search("tourenplanung")[0]["company_url"] == "https://www.routify.de/"
+
+
+def test_rebuild_from_profiles_and_legacy_profile_raw(tmp_path):
+    profiles = tmp_path / "profiles"
+    profiles.mkdir()
+    legacy = {
+        "company_name": "OldCo",
+        "profile_raw": 'Here: {"company_summary": "Legacy maker of widgets", "what_they_sell": ["widgets"]}',
+        "sources": [{"url": "https://oldco.de/about", "title": "About"}],
+    }
+    (profiles / "a.json").write_text(json.dumps(legacy), encoding="utf-8")
+    (profiles / "b.json").write_text(json.dumps(LOGISTICS), encoding="utf-8")
+    (profiles / "broken.json").write_text("{", encoding="utf-8")
+    idx = CompanyIndex(path=str(tmp_path / "companies.json"))
+    assert rebuild_from_profiles(idx, profiles_dir=str(profiles)) == 2
+    hit = idx.search("widgets")[0]
+    assert hit["company_url"] == "https://oldco.de/"
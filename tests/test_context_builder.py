@@ -0,0 +1,65 @@
+from src.context_builder import Passage, build_context, score_passage, split_passages
+from src.tokens import estimate_tokens
+from src.web import FetchedPage
+
+
+def _filler(word: str, n: int) -> str:
+    return " ".join(f"{word} number {i} is a plain sentence without facts." for i in range(n))
+
+
+def test_split_passages_is_sentence_aligned_and_bounded():
+    text = "First sentence here. " * 200 + "x" * 3000
+    passages = split_passages(text, target_tokens=50)
+    assert all(len(p.text) <= 50 * 4 for p in passages)
+    assert all(p.text == text[p.start : p.end].strip() for p in passages)
+    assert passages[0].text.endswith(".")
+
+
+def test_short_keywords_only_match_whole_words():
+    p = Passage(page=0, start=10, end=20, text="The kappa value of a seagull.", tokens=8)
+    score_passage(p)
+    assert "digital" not in p.fields
+    p = Passage(page=0, start=10, end=20, text="Download our app for iOS.", tokens=6)
+    score_passage(p)
+    assert "digital" in p.fields
+
+
+def test_noise_without_facts_scores_negative_but_facts_survive():
+    cookie = Passage(page=0, start=10, end=20, text="We use cookies. Accept the privacy consent.", tokens=10)
+    score_passage(cookie)
+    assert cookie.score < 0
+    imprint = Passage(page=0, start=10, end=20, text="Impressum: Geschäftsführer Max Muster. Datenschutz.", tokens=10)
+    score_passage(imprint)
+    assert "leadership" in imprint.fields
+    assert imprint.score > 0
+
+
+def test_site_that_fits_is_passed_through_untouched():
+    pages = [FetchedPage("https://a.de", "A", "We build software for logistics. We use cookies, accept the privacy policy.")]
+    context, stats = build_context("A", pages, token_budget=5000)
+    assert pages[0].text in context
+    assert stats["passages_used"] == stats["passages_total"]
+
+
+def test_budget_is_respected_and_every_field_is_covered():
+    pages = [
+        FetchedPage("https://a.de", "Home", _filler("Product", 80) + " Our platform is software for dispatchers."),
+        FetchedPage("https://a.de/kunden", "Kunden", _filler("Kunden", 40) + " Our customers are mid-sized carriers."),
+        FetchedPage("https://a.de/team", "Team", _filler("Team", 40) + " Founder and CEO is Anna Example."),
+        FetchedPage("https://a.de/privacy", "Privacy", "We use cookies. " * 50),
+    ]
+    context, stats = build_context("Acme", pages, token_budget=600)
+    assert stats["tokens_before"] > 600
+    assert estimate_tokens(context) <= 600
+    assert "customers are mid-sized carriers" in context
+    assert "CEO is Anna Example" in context
+    assert "We use cookies" not in context
+    assert {s["url"] for s in stats["sources"]} <= {p.url for p in pages[:3]}
+
+
+def test_duplicate_passages_are_sent_once():
+    shared = "Our platform is software for dispatchers and carriers."
+    pages = [FetchedPage("https://a.de", "A", shared), FetchedPage("https://a.de/b", "B", shared)]
+    context, stats = build_context("A", pages)
+    assert context.count(shared) == 1
+    assert stats["passages_total"] == 1
@@ -0,0 +1,174 @@
+import pytest
+
+from src import crawl, web
+from src.crawl import CrawlBudget, CrawlFrontier, canonical_url, fetch_sitemap_urls
+
+
+def test_canonical_url_drops_www_tracking_and_trailing_slash():
+    assert canonical_url("https://www.Acme.de/about/?utm_source=x&b=2&a=1#team") == canonical_url(
+        "http://acme.de/about?a=1&b=2"
+    )
+    assert canonical_url("https://acme.de/about") != canonical_url("https://acme.de/team")
+
+
+def test_frontier_pops_best_first_and_dedups():
+    f = CrawlFrontier("https://acme.de/")
+    f.add_links("https://acme.de/", ["/jobs", "/about", "/about/", "/leadership", "https://other.de/team", "/blog"], depth=1)
+    order = []
+    while len(f):
+        order.append(f.pop())
+    urls = [u for u, _ in order]
+    assert urls[0] == "https://acme.de/leadership"
+    assert urls.index("https://acme.de/about") < urls.index("https://acme.de/jobs")
+    assert not any("other.de" in u or "/blog" in u for u in urls)
+    assert len(urls) == len({canonical_url(u) for u in urls})
+
+
+def test_frontier_depth_penalty_and_limit():
+    f = CrawlFrontier("https://acme.de/", max_depth=2)
+    assert f.push("https://acme.de/team", depth=3, score=100) is False
+    f.push("https://acme.de/x/about", depth=2, score=50)
+    f.push("https://acme.de/company", depth=1, score=45)
+    assert f.pop() == ("https://acme.de/company", 1)
+
+
+def test_frontier_rejects_duplicate_canonical():
+    f = CrawlFrontier("https://acme.de/")
+    f.push("https://acme.de/about", 1, 50)
+    assert f.accept_canonical("https://acme.de/ueber-uns", "https://acme.de/about") is False
+    assert f.accept_canonical("https://acme.de/team", "/team") is True
+    assert f.accept_canonical("https://acme.de/kontakt", "https://acme.de/contact") is True
+    assert f.accept_canonical("https://acme.de/contact-us", "https://acme.de/contact") is False
+
+
+def test_budget_per_domain_and_total():
+    b = CrawlBudget(max_pages_per_domain=2, max_total_pages=3)
+    assert b.reserve("a.de") and b.reserve("a.de")
+    assert not b.reserve("a.de")
+    assert b.reserve("b.de")
+    assert not b.reserve("c.de")
+    b.release("b.de")
+    assert b.reserve("c.de")
+    b.close()
+    assert not b.reserve("d.de")
+
+
+def test_budget_bytes():
+    b = CrawlBudget(max_pages_per_domain=10, max_bytes_per_domain=100)
+    assert b.reserve("a.de")
+    b.record_bytes("a.de", 150)
+    assert not b.reserve("a.de")
+    assert b.usage("a.de") == {"pages": 1, "bytes": 150}
+
+
+@pytest.fixture
+def fake_fetch(monkeypatch):
+    responses: dict[str, str] = {}
+    calls: list[str] = []
+
+    def fetch_url(url, timeout_s=12, max_bytes=None, content_types=("text/html",), **kwargs):
+        calls.append(url)
+        return responses.get(url)
+
+    monkeypatch.setattr(web, "fetch_url", fetch_url)
+    monkeypatch.setattr(crawl, "_sitemap_cache", {})
+    return responses, calls
+
+
+def test_sitemap_unescapes_and_caches_only_found(fake_fetch):
+    responses, calls = fake_fetch
+    responses["https://acme.de/sitemap.xml"] = (
+        "<urlset><url><loc>https://acme.de/team?a=1&amp;b=2</loc></url><url><loc>/relative</loc></url></urlset>"
+    )
+    assert fetch_sitemap_urls("https://acme.de/") == ["https://acme.de/team?a=1&b=2"]
+    assert fetch_sitemap_urls("https://acme.de/") == ["https://acme.de/team?a=1&b=2"]
+    assert calls.count("https://acme.de/sitemap.xml") == 1
+
+    # not found / failed: asked again next time
+    assert fetch_sitemap_urls("https://none.de/") == []
+    assert fetch_sitemap_urls("https://none.de/") == []
+    assert calls.count("https://none.de/sitemap.xml") == 2
+
+
+def test_sitemap_index_follows_children(fake_fetch):
+    responses, _ = fake_fetch
+    responses["https://acme.de/sitemap.xml"] = (
+        "<sitemapindex><sitemap><loc>https://acme.de/post-sitemap.xml</loc></sitemap>"
+        "<sitemap><loc>https://acme.de/page-sitemap.xml</loc></sitemap></sitemapindex>"
+    )
+    responses["https://acme.de/page-sitemap.xml"] = "<urlset><url><loc>https://acme.de/about</loc></url></urlset>"
+    assert fetch_sitemap_urls("https://acme.de/", max_child_sitemaps=1) == ["https://acme.de/about"]
+
+
+def test_sitemap_bytes_are_charged_to_the_budget(fake_fetch):
+    responses, _ = fake_fetch
+    xml = "<urlset><url><loc>https://www.acme.de/about</loc></url></urlset>"
+    responses["https://www.acme.de/sitemap.xml"] = xml
+    budget = CrawlBudget()
+    assert fetch_sitemap_urls("https://www.acme.de/", budget=budget) == ["https://www.acme.de/about"]
+    assert budget.usage("acme.de") == {"pages": 0, "bytes": len(xml)}
+    fetch_sitemap_urls("https://www.acme.de/", budget=budget)  # in-process cache: free
+    assert budget.usage("acme.de")["bytes"] == len(xml)
+
+
+SITE = {
+    "https://a.de": ["/about", "/team"],
+    "https://a.de/about": ["/about/leadership"],
+    "https://a.de/team": [],
+    "https://a.de/about/leadership": [],
+    "https://b.de": ["/about"],
+    "https://b.de/about": [],
+    "https://b.de/team": [],
+}
+SITEMAPS = {"https://b.de": ["https://b.de/team"]}
+
+
+@pytest.fixture
+def fake_site(monkeypatch):
+    def fetch_and_parse(u, timeout_s=12, max_text=18000, keep_html=True, engine="bs4"):
+        u = u.rstrip("/")
+        if u not in SITE:
+            return None
+        doc = web.ParsedDocument(url=u, html="x" * 100, title=u, text=u, hrefs=SITE[u])
+        return web._page_from_doc(doc)
+
+    sitemaps: list[str] = []
+
+    def sitemap(url, timeout_s=8, budget=None):
+        sitemaps.append(url)
+        if budget is not None:
+            budget.record_bytes(crawl.site_key(url), 50)
+        return SITEMAPS.get(url.rstrip("/"), [])
+
+    monkeypatch.setattr(web, "_fetch_and_parse", fetch_and_parse)
+    monkeypatch.setattr(web, "fetch_sitemap_urls", sitemap)
+    return sitemaps
+
+
+def test_sync_crawl_follows_links_past_the_homepage(fake_site):
+    urls = [p.url for p in web.fetch_pages_for_company("https://a.de", max_pages=4)]
+    assert urls[0] == "https://a.de"
+    assert "https://a.de/about/leadership" in urls
+    assert len(urls) == 4
+
+
+def test_sitemap_only_when_links_cannot_fill_the_budget(fake_site):
+    assert len(web.fetch_pages_for_company("https://a.de", max_pages=3)) == 3
+    assert fake_site == []  # /about and /team were enough
+
+    budget = CrawlBudget(max_pages_per_domain=3)
+    urls = [p.url for p in web.fetch_pages_for_company("https://b.de", max_pages=3, budget=budget)]
+    assert sorted(urls) == ["https://b.de", "https://b.de/about", "https://b.de/team"]
+    assert fake_site == ["https://b.de"]
+    assert budget.usage("b.de") == {"pages": 3, "bytes": 350}
+
+
+def test_batch_crawl_uses_frontier_and_shared_budget(fake_site):
+    out = web.fetch_pages_for_companies(["https://a.de", "https://b.de"], max_pages=4)
+    assert "https://a.de/about/leadership" in [p.url for p in out["https://a.de"]]
+    assert sorted(p.url for p in out["https://b.de"]) == ["https://b.de", "https://b.de/about", "https://b.de/team"]
+
+    budget = CrawlBudget(max_pages_per_domain=4, max_total_pages=3)
+    out = web.fetch_pages_for_companies(["https://a.de", "https://b.de"], max_pages=4, budget=budget)
+    assert sum(len(v) for v in out.values()) == 3
+    assert budget.usage()["pages"] == 3
@@ -0,0 +1,90 @@
+import threading
+import time
+from contextlib import closing
+
+from src import discovery
+from src.discovery import DiscoverySpec, _iter_search_results, iter_discover_companies
+from src.types import SearchResult
+
+
+class _SlowBackend:
+    """Answers per query after a per-query delay; records start times."""
+
+    name = "slow"
+    cacheable = False
+
+    def __init__(self, answers: dict[str, tuple[float, list[SearchResult]]], default_delay_s: float = 0.0):
+        self.answers = answers
+        self.default_delay_s = default_delay_s
+        self.started: list[str] = []
+        self._lock = threading.Lock()
+
+    def search(self, query, max_results=10):
+        with self._lock:
+            self.started.append(query)
+        delay, results = self.answers.get(query, (self.default_delay_s, []))
+        time.sleep(delay)
+        if isinstance(results, Exception):
+            raise results
+        return results[:max_results]
+
+
+def _r(url: str, title: str = "Acme GmbH", snippet: str = "Industrial software") -> SearchResult:
+    return SearchResult(title=title, url=url, snippet=snippet)
+
+
+def test_queries_run_concurrently_and_arrive_in_completion_order():
+    backend = _SlowBackend(
+        {
+            "slow": (0.2, [_r("https://slow.de/")]),
+            "fast": (0.01, [_r("https://fast.de/")]),
+            "broken": (0.0, RuntimeError("search failed")),
+        }
+    )
+    t0 = time.monotonic()
+    out = list(_iter_search_results(["slow", "fast", "broken", "fast", " "], backend=backend))
+    assert time.monotonic() - t0 < 0.35
+    assert [q for q, _ in out] == ["fast", "slow"]  # failing query skipped, duplicate asked once
+    assert sorted(backend.started) == ["broken", "fast", "slow"]
+
+
+def test_closing_early_cancels_queries_not_started(monkeypatch):
+    monkeypatch.setattr(discovery, "DISCOVERY_QUERY_WORKERS", 2)
+    backend = _SlowBackend({"q0": (0.0, [_r("https://a.de/")])}, default_delay_s=0.1)
+    with closing(_iter_search_results([f"q{i}" for i in range(10)], backend=backend)) as it:
+        assert next(it)[0] == "q0"
+    time.sleep(0.3)
+    assert len(backend.started) < 10
+
+
+def test_discovery_streams_candidates_before_slow_queries_finish(monkeypatch):
+    spec = DiscoverySpec(industry="Robotik", country="Germany")
+    fast_query = "Robotik Germany company"
+    backend = _SlowBackend(
+        {
+            fast_query: (0.0, [_r("https://www.acme.de/"), _r("https://acme.de/about"), _r("https://www.linkedin.com/company/x")]),
+        },
+        default_delay_s=0.5,
+    )
+    monkeypatch.setattr(discovery, "get_search_backend", lambda: backend)
+    t0 = time.monotonic()
+    it = iter_discover_companies(spec, max_results=5, use_local_index=False)
+    first = next(it)
+    assert time.monotonic() - t0 < 0.3
+    assert first["company_url"] == "https://www.acme.de/" and first["source"] == "slow"
+    it.close()
+
+
+def test_discovery_filters_and_stops_at_max_results(monkeypatch):
+    spec = DiscoverySpec(industry="Robotik", country="Germany")
+    rows = [
+        _r("https://www.acme.de/"),
+        _r("https://www.acme.de/team"),  # same host
+        _r("https://studio.de/", title="Hair salon & beauty spa", snippet="Barber and nails"),
+        _r("https://beta.de/"),
+        _r("https://gamma.de/"),
+    ]
+    backend = _SlowBackend({"Robotik Germany company": (0.0, rows)})
+    monkeypatch.setattr(discovery, "get_search_backend", lambda: backend)
+    urls = [c["company_url"] for c in iter_discover_companies(spec, max_results=2, use_local_index=False)]
+    assert urls == ["https://www.acme.de/", "https://beta.de/"]
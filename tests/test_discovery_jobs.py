@@ -0,0 +1,118 @@
+import json
+import threading
+
+from src import discovery_jobs
+from src.discovery import DiscoverySpec
+from src.discovery_jobs import DiscoveryJob, canonical_domain, expand_queries
+from src.types import SearchResult
+
+
+def test_canonical_domain():
+    assert canonical_domain("https://www.shop.acme.de/x?y=1") == "acme.de"
+    assert canonical_domain("http://ACME.de:8080/") == "acme.de"
+    assert canonical_domain("https://www.acme.co.uk/") == "acme.co.uk"
+    assert canonical_domain("https://user@shop.acme.com.au/") == "acme.com.au"
+    assert canonical_domain("not a url") == ""
+
+
+def test_expand_queries_general_first_and_capped():
+    spec = DiscoverySpec(industry="logistics", country="Germany")
+    qs = expand_queries(spec, max_queries=500)
+    assert qs[0] == "logistics Germany company"
+    assert len(qs) == len(set(qs))
+    assert any("spedition" in q for q in qs) and any("Bayern" in q for q in qs) and any("startup" in q for q in qs)
+    # every dimension shows up early, not only after all regions of the first synonym
+    first = qs[:10]
+    assert any("Bayern" in q for q in first) and any("logistik" in q for q in first)
+    assert expand_queries(spec, max_queries=7) == qs[:7]
+
+
+def test_expand_queries_uses_given_regions_and_size():
+    qs = expand_queries(DiscoverySpec(industry="Robotik", region_or_city="Köln, Bonn", company_size="51-200"))
+    assert qs == ["Robotik Köln Mittelstand company", "Robotik Bonn Mittelstand company"]
+
+
+class _Backend:
+    name = "scripted"
+    cacheable = False
+
+    def __init__(self, results=None, fail=()):
+        self.results = results or {}
+        self.fail = set(fail)
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+
+    def search(self, query, max_results=10):
+        return next(self.search_pages(query, 1), [])
+
+    def search_pages(self, query, max_pages=5):
+        with self._lock:
+            self.calls.append(query)
+        if query in self.fail:
+            raise TimeoutError(query)
+        for page in self.results.get(query, []):
+            yield page
+
+
+def _r(url: str) -> SearchResult:
+    return SearchResult(title=url, url=url, snippet="Industrial software company")
+
+
+def _job(tmp_path, backend, **kwargs) -> DiscoveryJob:
+    spec = DiscoverySpec(industry="Robotik", region_or_city="Köln, Bonn, Essen", company_size="51-200")
+    return DiscoveryJob(spec, backend=backend, jobs_dir=str(tmp_path), workers=2, **kwargs)
+
+
+def test_dedup_on_registrable_domain(tmp_path):
+    q0, q1, q2 = _job(tmp_path, _Backend()).queries
+    backend = _Backend(
+        {
+            q0: [[_r("https://www.acme.de/"), _r("https://shop.acme.de/x")], [_r("https://beta.de/")]],
+            q1: [[_r("https://acme.de/about"), _r("https://www.linkedin.com/company/acme")]],
+            q2: [[_r("https://gamma.de/")]],
+        }
+    )
+    job = _job(tmp_path, backend)
+    domains = sorted(c["domain"] for c in job.run())
+    assert domains == ["acme.de", "beta.de", "gamma.de"]
+    assert job.counters["duplicates"] == 2 and job.counters["rejected"] == 1
+    assert job.finished and job.stats()["queries_done"] == 3
+
+
+def test_failed_and_empty_queries_stay_pending_and_resume(tmp_path):
+    q0, q1, q2 = _job(tmp_path, _Backend()).queries
+    flaky = _Backend({q0: [[_r("https://acme.de/")]]}, fail={q1})  # q2: empty (throttled) answer
+    job = _job(tmp_path, flaky)
+    assert [c["domain"] for c in job.run()] == ["acme.de"]
+    assert job.done_queries == {q0}
+    assert job.failed_queries == {q1: 1, q2: 1}
+    assert not job.finished
+    saved = json.loads(open(job.path, encoding="utf-8").read())
+    assert saved["failed_queries"] == {q1: 1, q2: 1}
+
+    healthy = _Backend({q1: [[_r("https://beta.de/")]], q2: [[_r("https://acme.de/")], [_r("https://gamma.de/")]]})
+    resumed = _job(tmp_path, healthy)
+    assert sorted(c["domain"] for c in resumed.run()) == ["beta.de", "gamma.de"]
+    assert sorted(healthy.calls) == sorted([q1, q2])  # q0 is not searched again
+    assert resumed.done_queries == {q0, q1, q2} and resumed.failed_queries == {}
+    assert resumed.finished and len(resumed.candidates) == 3
+
+
+def test_query_is_given_up_after_max_attempts(tmp_path, monkeypatch):
+    monkeypatch.setattr(discovery_jobs, "MAX_QUERY_ATTEMPTS", 2)
+    queries = _job(tmp_path, _Backend()).queries
+    broken = _Backend(fail=set(queries))
+    for _ in range(2):
+        list(_job(tmp_path, broken).run())
+    job = _job(tmp_path, broken)
+    assert job.finished
+    assert list(job.run()) == []
+    assert len(broken.calls) == 2 * len(queries)
+
+
+def test_target_stops_the_job(tmp_path):
+    q0 = _job(tmp_path, _Backend()).queries[0]
+    backend = _Backend({q0: [[_r(f"https://c{i}.de/") for i in range(10)]]})
+    job = _job(tmp_path, backend, target=4)
+    assert len(list(job.run())) == 4
+    assert job.finished
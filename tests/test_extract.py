@@ -0,0 +1,77 @@
+import pytest
+
+from src import web
+from src.extract import fast_parse
+from src.web import html_to_text, parse_document
+
+PAGE = """<!doctype html>
+<html><head>
+<title>Acme &amp; Co – Logistik</title>
+<link rel="canonical" href="https://acme.de/">
+<style>.x { color: red }</style>
+<script>var tracking = "do not index";</script>
+</head><body>
+<nav><a href="/about">Über uns</a> <a href=" /team ">Team</a></nav>
+<h1>Routenplanung   für Speditionen</h1>
+<p>Acme plant Touren für <b>120</b> Kunden.<!-- comment --> Seit 2012.</p>
+<noscript>Bitte JavaScript aktivieren</noscript>
+<footer>© Acme GmbH</footer>
+</body></html>"""
+
+
+def test_engines_agree_on_title_text_and_links():
+    bs4 = parse_document("https://acme.de/", PAGE, engine="bs4")
+    lxml = parse_document("https://acme.de/", PAGE, engine="lxml")
+    assert lxml.title == bs4.title == "Acme & Co – Logistik"
+    assert lxml.text.split() == bs4.text.split()
+    assert "tracking" not in lxml.text and "JavaScript" not in lxml.text and ".x" not in lxml.text
+    assert lxml.hrefs == bs4.hrefs == ["/about", "/team"]
+    assert lxml.canonical == bs4.canonical == "https://acme.de/"
+
+
+def test_research_crawl_defaults_to_lxml(monkeypatch):
+    seen = []
+    monkeypatch.setattr(web, "fetch_url", lambda u, **kw: PAGE)
+    monkeypatch.setattr(web, "fast_parse", lambda *a, **kw: (seen.append(kw), fast_parse(*a, **kw))[1])
+    page = web._fetch_and_parse("https://acme.de/")
+    assert seen and page.title == "Acme & Co – Logistik"
+    assert page.doc.hrefs == ["/about", "/team"]
+
+
+def test_lxml_stops_early_without_links():
+    big = "<html><body>" + "<p>word word word word</p>" * 50_000 + "<a href='/late'>x</a></body></html>"
+    title, text, hrefs, _ = fast_parse(big, max_text=100, want_links=False)
+    assert len(text) <= 100 and hrefs == []
+    assert html_to_text(big, engine="lxml", max_text=100)[1] == text
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        parse_document("", PAGE, engine="regex")
+
+
+@pytest.mark.parametrize("engine", ["bs4", "lxml"])
+def test_each_page_is_parsed_once_for_text_and_links(monkeypatch, engine):
+    parses = []
+    real_soup, real_fast = web.BeautifulSoup, web.fast_parse
+    monkeypatch.setattr(web, "BeautifulSoup", lambda *a, **kw: (parses.append("bs4"), real_soup(*a, **kw))[1])
+    monkeypatch.setattr(web, "fast_parse", lambda *a, **kw: (parses.append("lxml"), real_fast(*a, **kw))[1])
+    monkeypatch.setattr(web, "fetch_url", lambda u, **kw: PAGE)
+
+    page = web._fetch_and_parse("https://acme.de/", engine=engine)
+    links = web.pick_internal_links(page.url, page.html, max_links=5, doc=page.doc)
+    assert parses == [engine]
+    assert page.text == page.doc.text and "Routenplanung" in page.text
+    assert links == web.pick_internal_links(page.url, page.html, max_links=5)  # same result as parsing again
+    assert "https://acme.de/about" in links
+
+
+def test_crawl_parses_every_page_once(monkeypatch):
+    parses = []
+    real_fast = web.fast_parse
+    monkeypatch.setattr(web, "fast_parse", lambda html, **kw: (parses.append(html), real_fast(html, **kw))[1])
+    site = PAGE.replace('<link rel="canonical" href="https://acme.de/">', "")
+    monkeypatch.setattr(web, "fetch_url", lambda u, **kw: site.replace("Acme plant", f"{u} plant"))
+    pages = web.fetch_pages_for_company("https://acme.de/", max_pages=3, use_sitemap=False, parallel=False)
+    assert len(pages) == 3
+    assert len(parses) == 3
@@ -0,0 +1,128 @@
+
+import pytest
+
+from src import host_health
+from src.host_health import BREAKER_THRESHOLD, HostHealth
+
+URL = "https://slow.example/about"
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = _Clock()
+    monkeypatch.setattr(host_health.time, "time", c)
+    return c
+
+
+@pytest.fixture
+def health(tmp_path):
+    return HostHealth(path=str(tmp_path / "health.json"))
+
+
+def _trip(health):
+    for _ in range(BREAKER_THRESHOLD):
+        health.record_failure(URL, "error")
+
+
+def test_breaker_opens_after_threshold_host_failures(health, clock):
+    for _ in range(BREAKER_THRESHOLD - 1):
+        health.record_failure(URL, "http_5xx")
+    assert not health.is_open(URL)
+    health.record_failure(URL, "http_5xx")
+    assert health.is_open(URL) and health.is_open("slow.example")
+    assert not health.is_open("https://other.example/")
+    assert health.stats()["open_breakers"] == ["slow.example"]
+
+
+def test_url_level_failures_do_not_trip_the_breaker(health, clock):
+    for i in range(5):
+        health.record_failure(f"https://slow.example/missing{i}", "http_4xx")
+    assert not health.is_open(URL)
+
+
+def test_half_open_lets_exactly_one_probe_through(health, clock):
+    _trip(health)
+    clock.now += host_health.BREAKER_OPEN_S + 1
+    assert health.is_open(URL) is False  # the probe
+    assert health.is_open(URL) is True  # everyone else waits for it
+    assert health.is_open(URL) is True
+    health.record_success(URL, 0.2)
+    assert not health.is_open(URL)
+    assert not health.is_open(URL)
+
+
+def test_failed_probe_retrips_with_doubled_open_period(health, clock):
+    _trip(health)
+    clock.now += host_health.BREAKER_OPEN_S + 1
+    assert not health.is_open(URL)
+    health.record_failure(URL, "error")
+    assert health.is_open(URL)
+    clock.now += host_health.BREAKER_OPEN_S + 1
+    assert health.is_open(URL)  # second trip: open twice as long
+    clock.now += host_health.BREAKER_OPEN_S
+    assert not health.is_open(URL)
+
+
+def test_lost_probe_frees_the_slot_after_timeout(health, clock):
+    _trip(health)
+    clock.now += host_health.BREAKER_OPEN_S + 1
+    assert not health.is_open(URL)
+    clock.now += host_health.PROBE_TIMEOUT_S + 1
+    assert not health.is_open(URL)  # a new probe
+    assert health.is_open(URL)
+
+
+def test_negative_cache_expires_per_reason(health, clock):
+    health.record_failure("https://a.example/x", "http_429")
+    health.record_failure("https://a.example/y", "http_4xx")
+    assert health.negative_reason("https://a.example/x") == "http_429"
+    clock.now += host_health.NEGATIVE_TTL_S["http_429"] + 1
+    assert health.negative_reason("https://a.example/x") is None
+    assert health.negative_reason("https://a.example/y") == "http_4xx"
+    assert health.negative_reason("https://a.example/z") is None
+
+
+def test_adaptive_timeout_from_p95(health, clock):
+    assert health.timeout_for(URL, 12) == 12  # no history
+    for lat in [0.5] * 18 + [2.0] * 2:
+        health.record_success(URL, lat)
+    assert health.timeout_for(URL, 12) == pytest.approx(2.0 * host_health.TIMEOUT_FACTOR)
+    assert health.timeout_for(URL, 4) == 4
+    fast = "https://fast.example/"
+    for _ in range(10):
+        health.record_success(fast, 0.05)
+    assert health.timeout_for(fast, 12) == host_health.MIN_TIMEOUT_S
+
+
+def test_save_merges_state_written_by_other_processes(tmp_path, clock):
+    path = str(tmp_path / "health.json")
+    app, batch = HostHealth(path=path), HostHealth(path=path)
+    app.record_success("https://a.example/", 0.3)
+    app.record_failure("https://a.example/gone", "http_4xx")
+    app.save(force=True)
+
+    clock.now += 1
+    _trip(batch)
+    batch.record_failure("https://b.example/gone", "not_html")
+    batch.save(force=True)
+
+    fresh = HostHealth(path=path)
+    assert fresh._hosts["a.example"]["ok"] == 1
+    assert fresh.is_open(URL)
+    assert fresh.negative_reason("https://a.example/gone") == "http_4xx"
+    assert fresh.negative_reason("https://b.example/gone") == "not_html"
+
+    # the more recently updated record of a host wins
+    clock.now += 1
+    app.record_success(URL, 0.1)
+    app.save(force=True)
+    assert not HostHealth(path=path).is_open(URL)
+    assert list(tmp_path.iterdir()) == [tmp_path / "health.json"]
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src import http_cache
+from src.http_cache import CacheEntry, gc_blobs, load_entry, migrate_legacy_entries, store_entry, touch_entry
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    d = tmp_path / "http"
+    monkeypatch.setattr(http_cache, "HTTP_CACHE_DIR", str(d))
+    return d
+
+
+def _blobs(cache_dir) -> list[str]:
+    return [n for _, _, files in os.walk(cache_dir / "blobs") for n in files]
+
+
+def test_store_then_load_roundtrip():
+    assert store_entry(CacheEntry(url="https://a.example/", html="<p>Hallo</p>", fetched_at=123.0, etag='"v1"'))
+    e = load_entry("https://a.example/")
+    assert e.html == "<p>Hallo</p>" and e.fetched_at == 123.0 and e.etag == '"v1"'
+    assert e.final_url == "https://a.example/"
+    assert e.validator_headers() == {"If-None-Match": '"v1"'}
+    assert load_entry("https://b.example/") is None
+
+
+def test_identical_bodies_share_one_blob(cache_dir):
+    for u in ("https://a.example/", "https://a.example/index.html", "https://b.example/"):
+        store_entry(CacheEntry(url=u, html="<p>same</p>", fetched_at=time.time()))
+    store_entry(CacheEntry(url="https://c.example/", html="<p>other</p>", fetched_at=time.time()))
+    assert len(_blobs(cache_dir)) == 2
+    assert load_entry("https://b.example/").html == "<p>same</p>"
+
+
+def test_concurrent_writers_of_the_same_body_all_get_an_entry(cache_dir):
+    urls = [f"https://site{i}.example/" for i in range(16)]
+    gate = threading.Barrier(len(urls) * 2)
+    errors = []
+
+    def write(u):
+        gate.wait()
+        for _ in range(5):
+            if not store_entry(CacheEntry(url=u, html="<p>same page</p>" * 500, fetched_at=time.time())):
+                errors.append(u)
+
+    threads = [threading.Thread(target=write, args=(u,)) for u in urls * 2]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert all(load_entry(u) is not None for u in urls)
+    assert len(_blobs(cache_dir)) == 1  # no temp files left behind
+
+
+def test_touch_entry_bumps_fetch_time_and_validators():
+    store_entry(CacheEntry(url="https://a.example/", html="x", fetched_at=0.0))
+    e = load_entry("https://a.example/")
+    assert not e.is_fresh(3600)
+    touch_entry(e, etag='"v2"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT")
+    again = load_entry("https://a.example/")
+    assert again.is_fresh(3600) and again.etag == '"v2"'
+    assert again.validator_headers()["If-Modified-Since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+def test_legacy_entries_are_read_and_migrated(cache_dir):
+    url = "https://old.example/"
+    cache_dir.mkdir(parents=True)
+    html_path = cache_dir / f"{http_cache.cache_key(url)}.html"
+    html_path.write_text("<p>legacy</p>", encoding="utf-8")
+    os.utime(html_path, (1000.0, 1000.0))
+
+    e = load_entry(url)
+    assert e.html == "<p>legacy</p>" and e.fetched_at == 1000.0 and e.validator_headers() == {}
+
+    assert migrate_legacy_entries() == 1
+    assert not html_path.exists()
+    e = load_entry(url)
+    assert e.html == "<p>legacy</p>" and e.fetched_at == 1000.0
+    assert len(_blobs(cache_dir)) == 1
+
+
+def test_gc_blobs_removes_only_old_unreferenced_blobs(cache_dir):
+    store_entry(CacheEntry(url="https://a.example/", html="<p>live</p>", fetched_at=time.time()))
+    store_entry(CacheEntry(url="https://b.example/", html="<p>orphan</p>", fetched_at=time.time()))
+    os.remove(http_cache._index_path("https://b.example/"))
+    tmp = cache_dir / "blobs" / "ab" / "abcd.html.gz.x.tmp"
+    tmp.parent.mkdir(parents=True, exist_ok=True)
+    tmp.write_bytes(b"partial")
+
+    assert gc_blobs() == 0  # the orphan is still inside the grace period
+    past = time.time() - 2 * http_cache.GC_GRACE_S
+    for root, _, files in os.walk(cache_dir / "blobs"):
+        for n in files:
+            os.utime(os.path.join(root, n), (past, past))
+    assert gc_blobs() == 1
+    assert load_entry("https://a.example/").html == "<p>live</p>"
+    assert tmp.exists()
@@ -0,0 +1,193 @@
+import contextlib
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src import http_client as hc
+from src.http_client import HedgePolicy, RetryPolicy, http_get, response_latency_s
+
+
+def test_backoff_full_jitter_is_bounded():
+    p = RetryPolicy(base_delay_s=0.5, max_delay_s=4.0)
+    for attempt in range(8):
+        for _ in range(50):
+            assert 0.0 <= p.backoff(attempt) <= min(4.0, 0.5 * 2**attempt)
+
+
+def test_backoff_honours_retry_after():
+    p = RetryPolicy(base_delay_s=0.5)
+    for _ in range(50):
+        assert 3.0 <= p.backoff(0, retry_after_s=3.0) <= 3.5
+
+
+def test_response_latency_includes_redirects():
+    r = requests.Response()
+    r.elapsed = datetime.timedelta(seconds=0.4)
+    hop = requests.Response()
+    hop.elapsed = datetime.timedelta(seconds=0.1)
+    r.history = [hop]
+    assert response_latency_s(r) == pytest.approx(0.5)
+
+
+class _Resp:
+    def __init__(self, status: int = 200, headers: dict | None = None):
+        self.status_code = status
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _Session:
+    def __init__(self, answers, delay_s: float = 0.0):
+        self.answers = list(answers)
+        self.delay_s = delay_s
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            answer = self.answers.pop(0) if self.answers else _Resp()
+        try:
+            time.sleep(self.delay_s)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class _Scheduler:
+    def __init__(self, concurrency: int = 1000):
+        self.sem = threading.Semaphore(concurrency)
+
+    @contextlib.contextmanager
+    def slot(self, url, caller=None):
+        with self.sem:
+            yield
+
+
+@pytest.fixture
+def fake_http(monkeypatch):
+    def install(session: _Session, concurrency: int = 1000) -> _Session:
+        monkeypatch.setattr(hc, "get_session", lambda: session)
+        monkeypatch.setattr(hc, "get_scheduler", lambda: _Scheduler(concurrency))
+        monkeypatch.setattr(hc, "_requests_sent", 0)
+        monkeypatch.setattr(hc, "_hedges_sent", 0)
+        monkeypatch.setattr(hc, "_hedges_won", 0)
+        monkeypatch.setattr(hc, "_retries", 0)
+        return session
+
+    return install
+
+
+def test_retries_5xx_then_succeeds(fake_http, monkeypatch):
+    monkeypatch.setattr(hc.time, "sleep", lambda s: None)
+    s = fake_http(_Session([_Resp(503), _Resp(502), _Resp(200)]))
+    r = http_get("https://acme.de/", retry=RetryPolicy(max_attempts=3))
+    assert r.status_code == 200 and s.calls == 3
+
+
+def test_last_5xx_is_returned_and_timeouts_are_not_retried(fake_http, monkeypatch):
+    monkeypatch.setattr(hc.time, "sleep", lambda s: None)
+    s = fake_http(_Session([_Resp(503), _Resp(503)]))
+    assert http_get("https://acme.de/", retry=RetryPolicy(max_attempts=2)).status_code == 503
+
+    s = fake_http(_Session([requests.Timeout("slow")]))
+    with pytest.raises(requests.Timeout):
+        http_get("https://acme.de/", retry=RetryPolicy(max_attempts=3))
+    assert s.calls == 1
+
+
+def test_long_retry_after_is_a_final_answer(fake_http, monkeypatch):
+    monkeypatch.setattr(hc.time, "sleep", lambda s: None)
+    s = fake_http(_Session([_Resp(429, {"retry-after": "3600"})]))
+    assert http_get("https://acme.de/", retry=RetryPolicy(max_attempts=3)).status_code == 429
+    assert s.calls == 1
+
+
+def test_hedge_fires_for_slow_host(fake_http):
+    s = fake_http(_Session([], delay_s=0.3))
+    r = http_get("https://acme.de/", hedge=HedgePolicy(delay_s=0.05, min_delay_s=0.0, budget_ratio=1.0))
+    assert r.status_code == 200
+    assert s.calls == 2
+    assert hc.http_pool_stats()["hedges_sent"] == 1
+
+
+def test_queue_time_does_not_trigger_hedges(fake_http):
+    # 40 requests through 4 scheduler slots: most of them wait far longer than the hedge delay
+    s = fake_http(_Session([], delay_s=0.1), concurrency=4)
+    policy = HedgePolicy(delay_s=0.3, min_delay_s=0.0, budget_ratio=1.0)
+    with ThreadPoolExecutor(40) as ex:
+        list(ex.map(lambda _: hc._send_hedged("https://acme.de/", None, 5, "c", {}, policy), range(40)))
+    assert hc.http_pool_stats()["hedges_sent"] == 0
+    assert s.calls == 40
+
+
+def test_hedge_pool_does_not_cap_batch_concurrency(fake_http):
+    s = fake_http(_Session([], delay_s=0.2))
+    hc.ensure_hedge_workers(100)
+    policy = HedgePolicy(delay_s=1.0, min_delay_s=0.0)
+    with ThreadPoolExecutor(100) as ex:
+        list(ex.map(lambda _: hc._send_hedged("https://acme.de/", None, 5, "c", {}, policy), range(100)))
+    assert s.peak == 100
+
+
+# ----------------------------
+# Pooled session (real local server)
+# ----------------------------
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"<p>ok</p>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_pooled_session_reuses_one_connection_per_host(local_server, monkeypatch):
+    monkeypatch.setattr(hc, "get_scheduler", lambda: _Scheduler())
+    old_maxsize = hc.POOL_MAXSIZE
+    hc.configure_http(pool_maxsize=4)  # fresh session and pool counters
+    try:
+        before = hc.http_pool_stats()["requests"]
+        for path in ["/", "/about", "/team", "/impressum", "/"]:
+            r = http_get(local_server + path, retry=hc.NO_RETRY)
+            assert r.status_code == 200 and r.text == "<p>ok</p>"
+        stats = hc.http_pool_stats()
+        assert stats["requests"] - before == 5
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 4
+        assert stats["pool_maxsize"] == 4
+        assert stats["hosts"]["http://127.0.0.1"] == {"requests": 5, "connections_opened": 1}
+    finally:
+        hc.configure_http(pool_maxsize=old_maxsize)
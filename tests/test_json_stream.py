@@ -0,0 +1,77 @@
+import json
+import random
+
+from src.json_stream import JSONStreamParser, iter_partial_json
+
+
+DOC = {
+    "company_summary": 'Acme "Logistik" GmbH \\ builds route planning – für Speditionen.\nSeit 2012.',
+    "what_they_sell": ["Tourenplanung", "Telematik é☃", ""],
+    "confidence": 72.5,
+    "nested": {"ok": True, "none": None, "list": [1, [2, 3], {"x": "y"}]},
+    "uncertainties": [],
+}
+
+
+def _chunks(text: str, rng: random.Random) -> list[str]:
+    out, i = [], 0
+    while i < len(text):
+        n = rng.randint(1, 7)
+        out.append(text[i : i + n])
+        i += n
+    return out
+
+
+def _is_prefix_state(partial, final) -> bool:
+    """
+    Every value in `partial` is the final value, or (for strings / containers still being
+    written) a prefix of it.
+    """
+    if isinstance(partial, dict):
+        return isinstance(final, dict) and all(k in final and _is_prefix_state(v, final[k]) for k, v in partial.items())
+    if isinstance(partial, list):
+        return (
+            isinstance(final, list)
+            and len(partial) <= len(final)
+            and all(_is_prefix_state(a, b) for a, b in zip(partial, final))
+        )
+    if isinstance(partial, str):
+        return isinstance(final, str) and final.startswith(partial)
+    return partial == final
+
+
+def test_random_chunkings_end_in_the_full_object():
+    rng = random.Random(7)
+    for indent in (None, 2):
+        text = "Here is the JSON:\n```json\n" + json.dumps(DOC, ensure_ascii=False, indent=indent) + "\n```"
+        for _ in range(200):
+            parser = JSONStreamParser()
+            for chunk in _chunks(text, rng):
+                value = parser.feed(chunk)
+                assert _is_prefix_state(value, DOC)
+            assert parser.done
+            assert parser.value == DOC
+
+
+def test_escaped_unicode_split_mid_escape():
+    text = json.dumps({"s": "aéb\"c\\d"})  # ascii escapes: é \" \\
+    for cut in range(1, len(text)):
+        parser = JSONStreamParser()
+        parser.feed(text[:cut])
+        assert _is_prefix_state(parser.value, {"s": "aéb\"c\\d"})
+        assert parser.feed(text[cut:]) == {"s": "aéb\"c\\d"}
+
+
+def test_partial_strings_off_waits_for_complete_values():
+    parser = JSONStreamParser(partial_strings=False)
+    assert parser.feed('{"a": "hel') == {}
+    assert parser.feed('lo", "b": "wor') == {"a": "hello"}
+
+
+def test_iter_partial_json_yields_changes_and_final_state():
+    text = json.dumps({"a": "x" * 20, "b": [1, 2]})
+    states = list(iter_partial_json(_chunks(text, random.Random(1))))
+    values = [v for v, _ in states]
+    assert values[-1] == {"a": "x" * 20, "b": [1, 2]}
+    assert states[-1][1] == text
+    assert all(a != b for a, b in zip(values, values[1:-1]))
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from src.keywords import REGEX_MIN_KEYWORDS, KeywordMatcher, keyword_matcher
+
+
+ALPHABET = "abcü "
+
+
+def _brute_hits(keywords: list[str], text: str) -> set[str]:
+    t = text.lower()
+    return {k.strip().lower() for k in keywords if k.strip() and k.strip().lower() in t}
+
+
+def _random_words(rng: random.Random, n: int) -> list[str]:
+    return ["".join(rng.choice("abcü") for _ in range(rng.randint(1, 4))) for _ in range(n)]
+
+
+@pytest.mark.parametrize("n_keywords", [5, REGEX_MIN_KEYWORDS + 20])
+def test_hit_set_matches_substring_loop(n_keywords):
+    rng = random.Random(n_keywords)
+    for _ in range(200):
+        keywords = _random_words(rng, n_keywords)
+        text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 60)))
+        assert KeywordMatcher(keywords).hit_set(text) == _brute_hits(keywords, text)
+
+
+def test_word_boundary_matches_whole_words_only():
+    m = KeywordMatcher(["app", "apps", "kappa"], word_boundary=True)
+    assert m.hit_set("Our App and apps") == {"app", "apps"}
+    assert m.hit_set("kappa happens") == {"kappa"}
+    assert m.hit_set("application") == set()
+
+
+def test_weights_add_up_for_repeated_keywords():
+    m = KeywordMatcher(["team", ("about", 50), "team", ("blog", -80)])
+    assert m.score("/about/team") == 52
+    assert m.count("/team") == 2
+    assert m.score("/blog/about") == -30
+
+
+def test_hits_keep_given_order_and_any():
+    m = KeywordMatcher(["zeta", "alpha", "Mid"])
+    assert m.hits("ALPHA mid zeta") == ["zeta", "alpha", "mid"]
+    assert m.any("xx mid xx")
+    assert not m.any("nothing here")
+    assert not KeywordMatcher([]).any("text")
+
+
+def test_keyword_matcher_is_cached():
+    assert keyword_matcher(("a", "b")) is keyword_matcher(("a", "b"))
@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pytest
+
+from src import llm as llm_mod
+from src.http_client import RetryPolicy
+from src.llm import LLMClient, LLMLimits, _parse_duration_s, run_batch
+from src.llm_backends import FakeResponse, FakeUsage
+
+
+class _Backend:
+    name = "test"
+
+    def __init__(self, errors=(), output_tokens: int = 100, delay_s: float = 0.0):
+        self.errors = list(errors)
+        self.output_tokens = output_tokens
+        self.delay_s = delay_s
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def create(self, model, input, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            err = self.errors.pop(0) if self.errors else None
+        try:
+            time.sleep(self.delay_s)
+            if err is not None:
+                raise err
+            usage = FakeUsage(input_tokens=10, output_tokens=self.output_tokens, total_tokens=10 + self.output_tokens)
+            return FakeResponse(output_text="ok", usage=usage)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class _APIError(Exception):
+    def __init__(self, status_code: int, code: str = "", headers: dict | None = None):
+        super().__init__(f"{status_code} {code}")
+        self.status_code = status_code
+        self.code = code
+        self.response = type("R", (), {"headers": headers or {}})()
+
+
+FAST_RETRY = RetryPolicy(max_attempts=4, base_delay_s=0.0, max_delay_s=0.0, max_retry_after_s=5.0)
+
+
+def test_parse_duration():
+    assert _parse_duration_s("6m0s") == 360.0
+    assert _parse_duration_s("20ms") == pytest.approx(0.02)
+    assert _parse_duration_s("1.5") == 1.5
+    assert _parse_duration_s("") is None
+
+
+def test_5xx_is_retried_and_stats_count_it():
+    backend = _Backend(errors=[_APIError(500), _APIError(503)])
+    client = LLMClient(LLMLimits(rpm=6000, tpm=10**7, concurrency=4), retry=FAST_RETRY, backend=backend)
+    assert client.create("hi").output_text == "ok"
+    stats = client.stats()
+    assert backend.calls == 3
+    assert stats["retries"] == 2 and stats["requests"] == 3
+    assert stats["tokens_used"] == 110
+    assert stats["backend"] == "test"
+
+
+def test_insufficient_quota_is_not_retried():
+    backend = _Backend(errors=[_APIError(429, code="insufficient_quota")])
+    client = LLMClient(LLMLimits(rpm=6000, tpm=10**7), retry=FAST_RETRY, backend=backend)
+    with pytest.raises(_APIError):
+        client.create("hi")
+    assert backend.calls == 1
+
+
+def test_429_pauses_all_calls_for_the_server_wait(monkeypatch):
+    backend = _Backend(errors=[_APIError(429, headers={"retry-after-ms": "200"})])
+    client = LLMClient(LLMLimits(rpm=6000, tpm=10**7), retry=FAST_RETRY, backend=backend)
+    t0 = time.monotonic()
+    client.create("hi")
+    assert time.monotonic() - t0 >= 0.2
+    assert client.stats()["rate_limited"] == 1
+
+
+def test_concurrency_cap():
+    backend = _Backend(delay_s=0.05)
+    client = LLMClient(LLMLimits(rpm=60000, tpm=10**8, concurrency=3), backend=backend)
+    results = run_batch(lambda i: client.create(f"call {i}"), range(12), workers=12)
+    assert all(r.output_text == "ok" for r in results)
+    assert backend.peak == 3
+
+
+def test_reservation_follows_real_output_usage():
+    backend = _Backend(output_tokens=100)
+    client = LLMClient(LLMLimits(rpm=60000, tpm=10**8), backend=backend)
+    first = client.estimate_tokens("x" * 40)
+    for _ in range(30):
+        client.create("x" * 40)
+    later = client.estimate_tokens("x" * 40)
+    assert first > later
+    assert later - client.estimate_tokens("") < 150
+    assert client.estimate_tokens("", max_output_tokens=50) == 50
+
+
+def test_tpm_burst_is_a_full_minute():
+    client = LLMClient(LLMLimits(rpm=600, tpm=60_000), backend=_Backend())
+    assert client.tpm_bucket.burst == 60_000
+    assert client.rpm_bucket.burst == 600
+
+
+def test_run_batch_keeps_order_and_returns_exceptions(monkeypatch):
+    monkeypatch.setattr(llm_mod, "_llm", LLMClient(LLMLimits(concurrency=4), backend=_Backend()))
+    seen = []
+
+    def fn(i):
+        if i == 2:
+            raise ValueError("boom")
+        time.sleep(0.01 * (5 - i))
+        return i * 10
+
+    out = run_batch(fn, range(5), on_result=lambda i, r: seen.append(i))
+    assert out[:2] == [0, 10] and out[3:] == [30, 40]
+    assert isinstance(out[2], ValueError)
+    assert sorted(seen) == [0, 1, 2, 3, 4]
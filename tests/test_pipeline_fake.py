@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+from src import company_index, llm, research
+from src.fit import iter_score_company_fit, score_company_fit
+from src.llm import LLMClient
+from src.llm_backends import FakeLLMBackend, backend_from_env
+from src.research import build_company_profile, build_company_profiles, iter_build_company_profile
+from src.schemas import FIT_SCHEMA, PROFILE_SCHEMA, text_format, validate
+from src.web import FetchedPage
+
+
+def _fake(**kwargs) -> FakeLLMBackend:
+    return FakeLLMBackend(latency_s=0, tokens_per_s=0, **kwargs)
+
+
+def test_fake_backend_is_deterministic_and_schema_valid():
+    backend = _fake()
+    fmt = text_format("company_profile", PROFILE_SCHEMA)
+    a = backend.create("gpt-5-mini", "profile of Routify", text=fmt)
+    b = backend.create("gpt-5-mini", "profile of Routify", text=fmt)
+    c = backend.create("gpt-5-mini", "profile of Pixelhaus", text=fmt)
+    assert a.output_text == b.output_text != c.output_text
+    assert validate(json.loads(a.output_text), PROFILE_SCHEMA) == []
+    fit = backend.create("gpt-5-mini", "fit", text=text_format("company_fit", FIT_SCHEMA))
+    assert validate(json.loads(fit.output_text), FIT_SCHEMA) == []
+    assert a.usage.total_tokens == a.usage.input_tokens + a.usage.output_tokens
+
+
+def test_fake_backend_streams_deltas_then_completed():
+    events = list(_fake(chunk_chars=5).create("gpt-5-mini", "hello", stream=True))
+    assert [e.type for e in events[:-1]] == ["response.output_text.delta"] * (len(events) - 1)
+    assert events[-1].type == "response.completed"
+    assert "".join(e.delta for e in events[:-1]) == events[-1].response.output_text
+    assert all(len(e.delta) <= 5 for e in events[:-1])
+
+
+def test_backend_from_env(monkeypatch):
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    monkeypatch.setenv("LLM_FAKE_LATENCY_S", "0.01")
+    backend = backend_from_env()
+    assert isinstance(backend, FakeLLMBackend) and backend.latency_s == 0.01
+    monkeypatch.setenv("LLM_BACKEND", "nope")
+    with pytest.raises(ValueError):
+        backend_from_env()
+
+
+@pytest.fixture
+def fake_pipeline(tmp_path, monkeypatch):
+    """No network, no OpenAI: pages are fixed, the LLM is FakeLLMBackend, caches live in tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(llm, "_llm", LLMClient(backend=_fake()))
+    monkeypatch.setattr(company_index, "_index", None)
+    fetched = []
+
+    def fetch(company_url):
+        fetched.append(company_url)
+        text = f"{company_url} builds route planning software for logistics companies in Germany. " * 20
+        return [FetchedPage(url=company_url, title="Home", text=text)]
+
+    monkeypatch.setattr(research, "_fetch_pages", fetch)
+    return fetched
+
+
+def test_profile_then_fit_end_to_end(fake_pipeline):
+    profile = build_company_profile("Routify", "https://routify.example/")
+    assert not profile.get("profile_errors")
+    assert validate(profile["profile"], PROFILE_SCHEMA) == []
+    assert profile["from_cache"] is False
+
+    fit = score_company_fit("Routify", profile["profile_raw"], profile=profile["profile"])
+    assert not fit.get("fit_errors")
+    assert fit["from_cache"] is False
+
+    assert build_company_profile("Routify", "https://routify.example/")["from_cache"] is True
+    assert score_company_fit("Routify", profile["profile_raw"], profile=profile["profile"])["from_cache"] is True
+    assert fake_pipeline == ["https://routify.example/"]
+
+
+def test_streamed_profile_and_fit_end_with_complete_result(fake_pipeline):
+    states = list(iter_build_company_profile("Routify", "https://routify.example/"))
+    assert states[-1].get("partial") is None and not states[-1].get("profile_errors")
+    assert len(states) > 1 and all(s.get("partial") for s in states[:-1])
+    profile = states[-1]
+
+    fits = list(iter_score_company_fit("Routify", profile["profile_raw"], profile=profile["profile"], min_interval_s=0))
+    assert len(fits) > 1 and all(f.get("partial") for f in fits[:-1])
+    assert not fits[-1].get("fit_errors") and "partial" not in fits[-1]
+
+
+def test_batch_profiles_save_the_index_once(fake_pipeline, monkeypatch):
+    saves = []
+    idx = company_index.get_company_index()
+    monkeypatch.setattr(idx, "save", lambda: saves.append(1))
+    companies = [{"company_name": f"Company {i}", "company_url": f"https://c{i}.example/"} for i in range(4)]
+    results = build_company_profiles(companies, workers=4)
+    assert [r["company_name"] for r in results] == [c["company_name"] for c in companies]
+    assert len(saves) == 1
+    assert len(idx) == 4
+
+    build_company_profiles(companies, workers=4)  # all from cache -> nothing to save
+    assert len(saves) == 1
+
+
+def test_stored_pages_match_recorded_passage_offsets(fake_pipeline, monkeypatch):
+    nav = "Home Produkte Lösungen Karriere Kontakt Impressum Datenschutz Cookie Einstellungen Login Newsletter Jobs Presse"
+    site = {
+        "https://routify.example/": " ".join(f"Release {i} of our route planning software for carriers." for i in range(300)),
+        "https://routify.example/about": " ".join(f"In {1900 + i} Routify opened office {i}." for i in range(300)),
+        "https://routify.example/team": " ".join(f"Team member {i} works in engineering." for i in range(300)),
+    }
+    pages = [FetchedPage(url=u, title=u, text=f"{nav} {body} {nav}") for u, body in site.items()]
+    monkeypatch.setattr(research, "_fetch_pages", lambda company_url: pages)
+
+    profile = build_company_profile("Routify", "https://routify.example/")
+    assert profile["boilerplate"]["chars_saved"] > 0
+    stored = {p["url"]: p["text"] for p in profile["pages"]}
+    passages = profile["context"]["passages"]
+    assert passages
+    assert profile["context"]["passages_used"] < profile["context"]["passages_total"]
+    prompt, _ = research._profile_prompt("Routify", pages, profile["context"]["token_budget"])
+    for p in passages:
+        piece = stored[p["url"]][p["start"] : p["end"]]
+        assert piece and piece in prompt
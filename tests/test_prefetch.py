@@ -0,0 +1,117 @@
+import threading
+import time
+
+from src import prefetch
+from src.crawl import site_key
+from src.prefetch import Prefetcher
+from src.ratelimit import HostLimits, HostScheduler, current_caller
+
+
+class _Crawl:
+    """Stands in for web.fetch_pages_for_company: reserves budget pages like the real crawl."""
+
+    def __init__(self, delay_s: float = 0.0, gate: threading.Event | None = None):
+        self.delay_s = delay_s
+        self.gate = gate
+        self.calls: list[tuple[str, str]] = []
+
+    def __call__(self, url, max_pages=3, budget=None, **kwargs):
+        self.calls.append((url, current_caller()))
+        if self.gate is not None:
+            self.gate.wait(5)
+        n = 0
+        while n < max_pages and budget.reserve(site_key(url)):
+            budget.record_bytes(site_key(url), 1000)
+            n += 1
+            time.sleep(self.delay_s)
+        if "broken" in url:
+            raise RuntimeError("crawl failed")
+        return [object()] * n
+
+
+def _wait(p: Prefetcher) -> None:
+    deadline = time.monotonic() + 5
+    while p.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_prefetches_first_candidates_as_low_priority_caller(monkeypatch):
+    crawl = _Crawl()
+    monkeypatch.setattr(prefetch, "fetch_pages_for_company", crawl)
+    urls = ["https://a.de", "https://a.de", "", "https://broken.de", "https://c.de", "https://d.de"]
+    p = Prefetcher(urls, max_companies=3, max_pages=2).start()
+    _wait(p)
+    assert sorted(u for u, _ in crawl.calls) == ["https://a.de", "https://broken.de", "https://c.de"]
+    assert {who for _, who in crawl.calls} == {prefetch.PREFETCH_CALLER}
+    stats = p.stats()
+    assert stats["done"] == 2 and stats["failed"] == 1 and stats["pages"] == 4
+    assert stats["usage"] == {"pages": 6, "bytes": 6000}
+
+
+def test_total_byte_budget_caps_the_prefetch(monkeypatch):
+    monkeypatch.setattr(prefetch, "fetch_pages_for_company", _Crawl())
+    p = Prefetcher(["https://a.de", "https://b.de", "https://c.de"], max_pages=5, max_total_bytes=3000, workers=1).start()
+    _wait(p)
+    assert p.stats()["usage"]["bytes"] == 3000
+
+
+def test_focus_moves_a_candidate_to_the_front(monkeypatch):
+    gate = threading.Event()
+    crawl = _Crawl(gate=gate)
+    monkeypatch.setattr(prefetch, "fetch_pages_for_company", crawl)
+    p = Prefetcher(["https://a.de", "https://b.de", "https://c.de"], workers=1).start()
+    time.sleep(0.05)  # worker is busy with a.de
+    p.focus("https://c.de")
+    p.focus("https://unknown.de")
+    gate.set()
+    _wait(p)
+    assert [u for u, _ in crawl.calls] == ["https://a.de", "https://c.de", "https://b.de"]
+
+
+def test_cancel_stops_at_the_next_page(monkeypatch):
+    crawl = _Crawl(delay_s=0.05)
+    monkeypatch.setattr(prefetch, "fetch_pages_for_company", crawl)
+    p = Prefetcher(["https://a.de", "https://b.de", "https://c.de"], max_pages=5, workers=1).start()
+    time.sleep(0.08)
+    p.cancel()
+    _wait(p)
+    stats = p.stats()
+    assert not stats["running"] and stats["cancelled"]
+    assert [u for u, _ in crawl.calls] == ["https://a.de"]
+    assert stats["usage"]["pages"] < 5
+
+
+def test_low_priority_caller_yields_the_host_to_normal_callers():
+    sched = HostScheduler(default_host_limits=HostLimits(rate_per_s=1000, burst=1000, concurrency=1), host_overrides={})
+    order: list[str] = []
+    sched.acquire("acme.de", "holder")
+
+    def work(caller: str):
+        sched.acquire("acme.de", caller)
+        order.append(caller)
+        sched.release("acme.de")
+
+    threads = []
+    for caller in ["prefetch", "prefetch", "ui"]:
+        t = threading.Thread(target=work, args=(caller,))
+        t.start()
+        threads.append(t)
+        time.sleep(0.01)
+    sched.release("acme.de")
+    for t in threads:
+        t.join()
+    assert order == ["ui", "prefetch", "prefetch"]
+
+
+def test_low_priority_caller_keeps_global_headroom():
+    sched = HostScheduler(global_rate_per_s=20, global_burst=4, low_priority_reserve=2, host_overrides={})
+    for i in range(2):
+        sched.acquire(f"h{i}.de", "ui")
+        sched.release(f"h{i}.de")
+    # 2 tokens left: a normal caller goes now, prefetch waits until 3 are available
+    t0 = time.monotonic()
+    sched.acquire("x.de", "prefetch")
+    assert time.monotonic() - t0 >= 0.04
+    t0 = time.monotonic()
+    sched.acquire("y.de", "ui")
+    assert time.monotonic() - t0 < 0.03
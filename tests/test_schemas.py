@@ -0,0 +1,59 @@
+import json
+
+from src.schemas import FIT_SCHEMA, PROFILE_SCHEMA, parse_structured, parsed_profile, text_format, validate
+
+
+VALID_PROFILE = {
+    "company_summary": "Acme builds route planning software.",
+    "what_they_sell": ["Tourenplanung"],
+    "likely_users": ["Dispatchers"],
+    "possible_ux_opportunities": [],
+    "confidence": 70,
+    "uncertainties": [],
+    "sources": [{"url": "https://acme.de", "title": "Acme"}],
+}
+
+
+def test_valid_profile_has_no_errors():
+    assert validate(VALID_PROFILE, PROFILE_SCHEMA) == []
+
+
+def test_validate_reports_paths():
+    bad = dict(VALID_PROFILE, confidence=120, extra=1, what_they_sell=["a"] * 7, sources=[{"url": 1, "title": "x"}])
+    del bad["likely_users"]
+    errors = validate(bad, PROFILE_SCHEMA)
+    assert "$: missing likely_users" in errors
+    assert "$: unexpected extra" in errors
+    assert "$.confidence: above 100" in errors
+    assert "$.what_they_sell: more than 6 items" in errors
+    assert "$.sources[0].url: expected string, got int" in errors
+
+
+def test_booleans_are_not_numbers():
+    assert validate(True, {"type": "number"}) == ["$: expected number, got bool"]
+    assert validate(3.0, {"type": "integer"}) == []
+    assert validate(3.5, {"type": "integer"}) != []
+    assert validate(None, {"type": ["string", "null"]}) == []
+
+
+def test_strict_schemas_require_every_property():
+    for schema in (PROFILE_SCHEMA, FIT_SCHEMA):
+        assert set(schema["required"]) == set(schema["properties"])
+        assert schema["additionalProperties"] is False
+    fmt = text_format("fit", FIT_SCHEMA)["format"]
+    assert fmt["strict"] is True and fmt["schema"] is FIT_SCHEMA
+
+
+def test_parse_structured():
+    obj, errors = parse_structured(json.dumps(VALID_PROFILE), PROFILE_SCHEMA)
+    assert obj == VALID_PROFILE and errors == []
+    assert parse_structured("not json", PROFILE_SCHEMA)[0] is None
+    assert parse_structured("[1, 2]", PROFILE_SCHEMA) == (None, ["$: expected object"])
+
+
+def test_parsed_profile_prefers_stored_object_and_salvages_legacy_text():
+    assert parsed_profile({"profile": VALID_PROFILE, "profile_raw": "{}"}) is VALID_PROFILE
+    legacy = {"profile_raw": 'Sure! ```json\n{"company_summary": "Old"}\n```'}
+    assert parsed_profile(legacy) == {"company_summary": "Old"}
+    assert parsed_profile({"profile_raw": "no json here"}) == {}
+    assert parsed_profile({}) == {}
@@ -0,0 +1,126 @@
+import json
+import time
+
+import pytest
+
+from src import search_backends
+from src.search_backends import DDGBackend, FanoutBackend, FixtureBackend, backend_from_env
+from src.types import SearchResult
+
+
+@pytest.fixture
+def fixture_file(tmp_path):
+    path = tmp_path / "fixtures.json"
+    path.write_text(
+        json.dumps(
+            {
+                "queries": {"Logistik Software": [{"title": "Routify", "url": "https://routify.de/", "snippet": "Tourenplanung"}]},
+                "results": [
+                    {"title": "Acme Robotics", "url": "https://acme.de/", "snippet": "Industrial robots for logistics"},
+                    {"title": "Beta Design", "url": "https://beta.de/", "snippet": "Design agency"},
+                    {"title": "no url"},
+                ]
+                + [{"title": f"Robotics {i}", "url": f"https://r{i}.de/", "snippet": "robots"} for i in range(15)],
+            }
+        ),
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+def test_fixture_exact_query_then_word_ranking(fixture_file):
+    b = FixtureBackend(fixture_file)
+    assert [r.url for r in b.search("  logistik   SOFTWARE ")] == ["https://routify.de/"]
+    ranked = b.search("industrial robots logistics", max_results=3)
+    assert ranked[0].url == "https://acme.de/"  # three words match
+    assert all("beta" not in r.url for r in b.search("robots", max_results=50))
+    assert b.search("zz") == [] and b.search("") == []
+
+
+def test_fixture_pages(fixture_file):
+    pages = list(FixtureBackend(fixture_file).search_pages("robots", max_pages=5))
+    assert [len(p) for p in pages] == [10, 6]
+    assert len({r.url for p in pages for r in p}) == 16
+
+
+def test_fixture_replays_a_search_cache_directory(tmp_path):
+    (tmp_path / "a.json").write_text(
+        json.dumps({"query": "acme", "results": [{"title": "Acme", "url": "https://acme.de/", "snippet": ""}]}),
+        encoding="utf-8",
+    )
+    (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+    assert [r.url for r in FixtureBackend(str(tmp_path)).search("Acme")] == ["https://acme.de/"]
+
+
+def test_missing_fixture_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        FixtureBackend(str(tmp_path / "nope.json"))
+
+
+def test_shipped_fixtures_load():
+    assert FixtureBackend().search("project management software")
+
+
+class _Static:
+    def __init__(self, name, results, delay_s=0.0, cacheable=False):
+        self.name, self.results, self.delay_s, self.cacheable = name, results, delay_s, cacheable
+
+    def search(self, query, max_results=10):
+        time.sleep(self.delay_s)
+        if isinstance(self.results, Exception):
+            raise self.results
+        return list(self.results)[:max_results]
+
+
+def _r(url, title="x"):
+    return SearchResult(title=title, url=url, snippet="")
+
+
+def test_fanout_merges_in_arrival_order_and_dedups():
+    fast = _Static("fast", [_r("https://a.de/"), _r("https://b.de/"), _r("mailto:x@y.de"), _r("https://c.de/", title="")])
+    slow = _Static("slow", [_r("https://b.de/"), _r("https://d.de/")], delay_s=0.05, cacheable=True)
+    broken = _Static("broken", RuntimeError("down"))
+    fan = FanoutBackend([slow, broken, fast])
+    assert fan.name == "fanout(slow+broken+fast)" and fan.cacheable
+    assert [r.url for r in fan.search("q")] == ["https://a.de/", "https://b.de/", "https://d.de/"]
+
+
+def test_fanout_returns_once_enough_results_are_in():
+    fast = _Static("fast", [_r(f"https://{i}.de/") for i in range(5)])
+    slow = _Static("slow", [_r("https://late.de/")], delay_s=1.0)
+    t0 = time.monotonic()
+    assert len(FanoutBackend([slow, fast]).search("q", max_results=3)) == 3
+    assert time.monotonic() - t0 < 0.5
+    assert FanoutBackend([]).search("q") == []
+
+
+def test_ddg_parses_lite_results_and_follows_next_page(monkeypatch):
+    page1 = """<html><body>
+      <a class="result-link" href="https://duckduckgo.com/l/?uddg=https%3A%2F%2Facme.de%2F">Acme GmbH - LinkedIn</a>
+      <a class="result-link" href="https://beta.de/">Beta</a>
+      <form action="/lite/" method="post"><input type="hidden" name="q" value="acme"><input type="hidden" name="s" value="20">
+      <input type="submit" value="Next Page &gt;"></form></body></html>"""
+    page2 = '<html><body><a class="result-link" href="https://gamma.de/">Gamma</a></body></html>'
+    requested = []
+
+    def request_html(url, timeout_s=12):
+        requested.append(url)
+        return page1 if len(requested) == 1 else page2
+
+    monkeypatch.setattr(search_backends, "_request_html", request_html)
+    pages = list(DDGBackend().search_pages("acme", max_pages=3))
+    assert [[(r.title, r.url) for r in p] for p in pages] == [
+        [("Acme GmbH", "https://acme.de/"), ("Beta", "https://beta.de/")],
+        [("Gamma", "https://gamma.de/")],
+    ]
+    assert requested[1] == "https://lite.duckduckgo.com/lite/?q=acme&s=20"
+    assert len(requested) == 2  # page 2 has no next-page form
+
+
+def test_backend_from_env(monkeypatch, fixture_file):
+    monkeypatch.setenv("SEARCH_FIXTURES", fixture_file)
+    monkeypatch.setenv("SEARCH_BACKEND", "fixture")
+    assert isinstance(backend_from_env(), FixtureBackend)
+    monkeypatch.setenv("SEARCH_BACKEND", "ddg,fixture")
+    fan = backend_from_env()
+    assert isinstance(fan, FanoutBackend) and fan.name == "fanout(ddg+fixture)"
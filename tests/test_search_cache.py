@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+from dataclasses import asdict
+
+import pytest
+
+from src import search_cache
+from src.search_backends import FixtureBackend
+from src.search_cache import cached_search, search_cache_key, search_cache_stats
+
+QUERY = "project management software"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(search_cache, "SEARCH_CACHE_DIR", str(tmp_path / "search"))
+    return tmp_path / "search"
+
+
+class _Counting:
+    """fetch() for cached_search on top of FixtureBackend, counting live searches."""
+
+    def __init__(self, tmp_path, results):
+        self.backend = FixtureBackend(str(_fixture(tmp_path, results, "fixtures.json")))
+        self.calls = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.gate.wait(5)
+        return [asdict(r) for r in self.backend.search(QUERY, max_results=10)]
+
+
+def _fixture(tmp_path, results, name="fixtures2.json"):
+    path = tmp_path / name
+    path.write_text(json.dumps({"queries": {QUERY: results}}), encoding="utf-8")
+    return path
+
+
+def _rows(*urls):
+    return [{"title": u, "url": u, "snippet": ""} for u in urls]
+
+
+def _search(fetch, **kwargs):
+    return cached_search(QUERY, "fixture", 10, fetch, **kwargs)
+
+
+def _delta(before):
+    after = search_cache_stats()
+    return {k: after[k] - before[k] for k in before if k != "inflight"}
+
+
+def _wait_idle():
+    deadline = time.monotonic() + 5
+    while search_cache_stats()["inflight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_key_normalizes_query():
+    assert search_cache_key("  Foo   BAR ", "ddg", 10) == search_cache_key("foo bar", "ddg", 10)
+    assert search_cache_key("foo", "ddg", 10) != search_cache_key("foo", "ddg", 20)
+
+
+def test_miss_then_fresh_hit(tmp_path):
+    fetch = _Counting(tmp_path, _rows("https://a.example/"))
+    before = search_cache_stats()
+    first = _search(fetch)
+    assert _search(fetch) == first and [r["url"] for r in first] == ["https://a.example/"]
+    assert fetch.calls == 1
+    assert _delta(before) == {"hits": 1, "stale_hits": 0, "misses": 1, "revalidations": 0, "errors": 0}
+
+
+def test_stale_entry_is_served_and_refreshed_in_background(tmp_path):
+    fetch = _Counting(tmp_path, _rows("https://a.example/"))
+    _search(fetch)
+    fetch.gate.clear()  # hold the background refresh
+    before = search_cache_stats()
+    stale = _search(fetch, ttl_s=0)
+    assert [r["url"] for r in stale] == ["https://a.example/"]
+    assert _search(fetch, ttl_s=0) == stale  # second stale hit does not start another refresh
+    assert search_cache_stats()["inflight"] == 1
+    fetch.gate.set()
+    _wait_idle()
+    assert fetch.calls == 2
+    assert _delta(before) == {"hits": 0, "stale_hits": 2, "misses": 0, "revalidations": 1, "errors": 0}
+
+
+def test_background_refresh_stores_new_results(tmp_path):
+    fetch = _Counting(tmp_path, _rows("https://a.example/"))
+    _search(fetch)
+    fetch.backend = FixtureBackend(str(_fixture(tmp_path, _rows("https://b.example/"))))
+    assert [r["url"] for r in _search(fetch, ttl_s=0)] == ["https://a.example/"]
+    _wait_idle()
+    assert [r["url"] for r in _search(fetch)] == ["https://b.example/"]
+
+
+def test_expired_entry_is_searched_live(tmp_path):
+    fetch = _Counting(tmp_path, _rows("https://a.example/"))
+    _search(fetch)
+    fetch.backend = FixtureBackend(str(_fixture(tmp_path, _rows("https://b.example/"))))
+    before = search_cache_stats()
+    assert [r["url"] for r in _search(fetch, ttl_s=0, stale_s=0)] == ["https://b.example/"]
+    assert fetch.calls == 2
+    assert _delta(before)["misses"] == 1
+
+
+def test_empty_results_are_not_stored_and_expired_copy_beats_none(tmp_path, cache_dir):
+    empty = _Counting(tmp_path, [])
+    assert _search(empty) == []
+    assert not cache_dir.exists()
+    assert _search(empty) == [] and empty.calls == 2  # nothing cached -> searched again
+
+    fetch = _Counting(tmp_path, _rows("https://a.example/"))
+    _search(fetch)
+    # expired, and the live search comes back empty (throttled): keep the old answer
+    assert [r["url"] for r in _search(empty, ttl_s=0, stale_s=0)] == ["https://a.example/"]
+
+
+def test_fetch_error_falls_back_to_expired_copy(tmp_path):
+    fetch = _Counting(tmp_path, _rows("https://a.example/"))
+    _search(fetch)
+
+    def broken():
+        raise TimeoutError("search timed out")
+
+    before = search_cache_stats()
+    assert [r["url"] for r in _search(broken, ttl_s=0, stale_s=0)] == ["https://a.example/"]
+    assert _delta(before)["errors"] == 1
+    with pytest.raises(TimeoutError):
+        cached_search("never searched", "fixture", 10, broken)
+
+
+def test_use_cache_false_always_searches(tmp_path, cache_dir):
+    fetch = _Counting(tmp_path, _rows("https://a.example/"))
+    _search(fetch, use_cache=False)
+    _search(fetch, use_cache=False)
+    assert fetch.calls == 2 and not cache_dir.exists()
@@ -0,0 +1,266 @@
+import io
+import os
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src import http_cache, web
+from src.host_health import HostHealth
+
+
+def _response(url: str, status: int = 200, body: bytes = b"", headers: dict | None = None) -> requests.Response:
+    r = requests.Response()
+    r.status_code = status
+    r.url = url
+    r.headers = CaseInsensitiveDict({"content-type": "text/html; charset=utf-8", **(headers or {})})
+    r.raw = io.BytesIO(body)
+    r.elapsed = timedelta(milliseconds=200)
+    return r
+
+
+class _Server:
+    """Stub for web.http_get: answers from a queue per URL and records the request headers."""
+
+    def __init__(self):
+        self.answers: dict[str, list] = {}
+        self.requests: list[tuple[str, dict]] = []
+
+    def add(self, url: str, *answers) -> None:
+        self.answers.setdefault(url, []).extend(answers)
+
+    def __call__(self, url, headers=None, **kwargs):
+        self.requests.append((url, dict(headers or {})))
+        answer = self.answers[url].pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+@pytest.fixture
+def server(monkeypatch):
+    s = _Server()
+    monkeypatch.setattr(web, "http_get", s)
+    return s
+
+
+@pytest.fixture
+def health(tmp_path, monkeypatch):
+    h = HostHealth(path=str(tmp_path / "health.json"))
+    monkeypatch.setattr(web, "get_host_health", lambda: h)
+    return h
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "HTTP_CACHE_DIR", str(tmp_path / "http"))
+
+
+def test_4xx_is_recorded_once_as_url_failure(server, health, monkeypatch):
+    calls = []
+    monkeypatch.setattr(health, "record_success", lambda *a, **k: calls.append(("success", a)))
+    real_failure = health.record_failure
+    monkeypatch.setattr(health, "record_failure", lambda *a, **k: (calls.append(("failure", a)), real_failure(*a, **k)))
+    url = "https://a.example/missing"
+    server.add(url, _response(url, 404))
+    assert web.fetch_url(url) is None
+    assert [c[0] for c in calls] == ["failure"] and calls[0][1][1] == "http_4xx"
+    # negative-cached: no second request
+    assert web.fetch_url(url) is None
+    assert len(server.requests) == 1
+
+
+def test_non_html_is_negative_cached(server, health):
+    url = "https://a.example/report.pdf"
+    server.add(url, _response(url, headers={"content-type": "application/pdf"}, body=b"%PDF"))
+    assert web.fetch_url(url) is None
+    assert health.negative_reason(url) == "not_html"
+
+
+def test_open_breaker_skips_the_host(server, health):
+    for i in range(3):
+        url = f"https://down.example/{i}"
+        server.add(url, requests.ConnectionError("reset"))
+        assert web.fetch_url(url) is None
+    assert health.is_open("down.example")
+    assert web.fetch_url("https://down.example/other") is None
+    assert len(server.requests) == 3
+
+
+def test_success_feeds_latency_and_adaptive_timeout(server, health, monkeypatch):
+    timeouts = []
+    real = server.__call__
+
+    def get(url, headers=None, timeout_s=None, **kwargs):
+        timeouts.append(timeout_s)
+        return real(url, headers=headers, **kwargs)
+
+    monkeypatch.setattr(web, "http_get", get)
+    for i in range(6):
+        url = f"https://fast.example/{i}"
+        server.add(url, _response(url, body=b"<p>ok</p>"))
+        assert web.fetch_url(url, use_cache=False) == "<p>ok</p>"
+    assert timeouts[0] == 12
+    assert timeouts[-1] < 12  # 3x p95 of 0.2 s, clamped to MIN_TIMEOUT_S
+
+
+# ----------------------------
+# Cache revalidation
+# ----------------------------
+URL = "https://site.example/"
+
+
+def _cached(html: str = "<p>cached</p>", age_s: float = 0.0, **meta) -> None:
+    http_cache.store_entry(http_cache.CacheEntry(url=URL, html=html, fetched_at=time.time() - age_s, **meta))
+
+
+def test_fresh_entry_is_served_without_network(server, health):
+    _cached()
+    assert web.fetch_url(URL) == "<p>cached</p>"
+    assert server.requests == []
+
+
+def test_stale_entry_sends_conditional_get_and_304_keeps_body(server, health):
+    _cached(age_s=10 * 24 * 3600, etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    server.add(URL, _response(URL, 304, headers={"etag": '"v2"'}))
+    assert web.fetch_url(URL) == "<p>cached</p>"
+    assert server.requests[0][1] == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    entry = http_cache.load_entry(URL)
+    assert entry.is_fresh(60) and entry.etag == '"v2"'
+    assert web.fetch_url(URL) == "<p>cached</p>"  # touched -> fresh again
+    assert len(server.requests) == 1
+
+
+def test_stale_entry_replaced_by_new_body(server, health):
+    _cached(age_s=10 * 24 * 3600, etag='"v1"')
+    server.add(URL, _response(URL, body=b"<p>new</p>", headers={"etag": '"v2"'}))
+    assert web.fetch_url(URL) == "<p>new</p>"
+    assert http_cache.load_entry(URL).html == "<p>new</p>"
+
+
+def test_revalidate_forces_a_request_for_fresh_entries(server, health):
+    _cached(etag='"v1"')
+    server.add(URL, _response(URL, 304))
+    assert web.fetch_url(URL, revalidate=True) == "<p>cached</p>"
+    assert server.requests[0][1] == {"If-None-Match": '"v1"'}
+
+
+@pytest.mark.parametrize(
+    "answer",
+    [requests.ConnectionError("reset"), _response(URL, 503), _response(URL, 429)],
+    ids=["error", "5xx", "429"],
+)
+def test_stale_copy_is_returned_when_revalidation_fails(server, health, answer):
+    _cached(age_s=10 * 24 * 3600)
+    server.add(URL, answer)
+    assert web.fetch_url(URL) == "<p>cached</p>"
+
+
+def test_legacy_entry_without_metadata_is_revalidated_unconditionally(server, health, tmp_path):
+    legacy = tmp_path / "http" / f"{http_cache.cache_key(URL)}.html"
+    legacy.parent.mkdir(parents=True, exist_ok=True)
+    legacy.write_text("<p>legacy</p>", encoding="utf-8")
+    os.utime(legacy, (1000.0, 1000.0))
+    server.add(URL, _response(URL, 304))
+    assert web.fetch_url(URL) == "<p>legacy</p>"
+    assert server.requests[0][1] == {}  # no validators to send
+    # the 304 moved it into the blob store with a fresh fetch time
+    assert http_cache.load_entry(URL).is_fresh(60)
+    assert os.path.isdir(tmp_path / "http" / "index")
+
+
+def test_use_cache_false_neither_reads_nor_writes(server, health):
+    _cached()
+    server.add(URL, _response(URL, body=b"<p>live</p>"))
+    assert web.fetch_url(URL, use_cache=False) == "<p>live</p>"
+    assert http_cache.load_entry(URL).html == "<p>cached</p>"
+
+
+# ----------------------------
+# Async batch fetch
+# ----------------------------
+def test_batch_fetch_shares_one_concurrency_limit_and_isolates_failures(monkeypatch):
+    lock = threading.Lock()
+    active, peak = [0], [0]
+
+    def fetch_and_parse(u, timeout_s=12, max_text=18000, keep_html=True, engine="lxml"):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        try:
+            time.sleep(0.02)
+            if "broken" in u:
+                raise RuntimeError("parser crashed")
+            if "down" in u:
+                return None
+            doc = web.ParsedDocument(url=u, html="<p/>", title=u, text=u, hrefs=["/about", "/team"])
+            return web._page_from_doc(doc)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    monkeypatch.setattr(web, "_fetch_and_parse", fetch_and_parse)
+    urls = [f"https://c{i}.example" for i in range(8)] + ["https://broken.example", "https://down.example", "", "https://c0.example"]
+    out = web.fetch_pages_for_companies(urls, max_pages=3, concurrency=3, use_sitemap=False)
+
+    assert list(out) == [f"https://c{i}.example" for i in range(8)] + ["https://broken.example", "https://down.example"]
+    assert all(len(out[f"https://c{i}.example"]) == 3 for i in range(8))
+    assert out["https://broken.example"] == [] and out["https://down.example"] == []
+    assert peak[0] == 3
+
+
+def test_batch_fetch_is_faster_than_sequential(monkeypatch):
+    def fetch_and_parse(u, timeout_s=12, max_text=18000, keep_html=True, engine="lxml"):
+        time.sleep(0.05)
+        return web._page_from_doc(web.ParsedDocument(url=u, html="", title=u, text=u))
+
+    monkeypatch.setattr(web, "_fetch_and_parse", fetch_and_parse)
+    t0 = time.monotonic()
+    out = web.fetch_pages_for_companies([f"https://c{i}.example" for i in range(20)], max_pages=1, concurrency=20)
+    assert len(out) == 20 and time.monotonic() - t0 < 0.5  # sequential: 1 s
+
+
+# ----------------------------
+# Capped streaming + charset decoding
+# ----------------------------
+class _Chunks:
+    def __init__(self, n: int, size: int):
+        self.n, self.size, self.read = n, size, 0
+
+    def iter_content(self, chunk_size=1):
+        for _ in range(self.n):
+            self.read += 1
+            yield b"x" * self.size
+
+
+def test_read_capped_truncates_and_stops_reading():
+    r = _Chunks(n=100, size=64 * 1024)
+    assert len(web._read_capped(r, 100_000)) == 100_000
+    assert r.read == 2  # the other 98 chunks are never downloaded
+    assert web._read_capped(_Chunks(n=2, size=10), 1000) == b"x" * 20
+
+
+def test_fetch_url_caps_the_body(server, health):
+    url = "https://big.example/"
+    server.add(url, _response(url, body=b"a" * 5000))
+    assert web.fetch_url(url, max_bytes=1000, use_cache=False) == "a" * 1000
+
+
+def test_decode_html_meta_charset():
+    raw = '<html><head><meta charset="iso-8859-1"></head><body>Größe</body></html>'.encode("latin-1")
+    assert "Größe" in web._decode_html(raw, "text/html")
+    raw = '<meta http-equiv="Content-Type" content="text/html; charset=windows-1252"><p>€ 5</p>'.encode("cp1252")
+    assert "€ 5" in web._decode_html(raw, "text/html")
+
+
+def test_decode_html_header_bom_and_fallbacks():
+    latin = "Grüße".encode("latin-1")
+    assert web._decode_html(latin, "text/html; charset=ISO-8859-1") == "Grüße"
+    # the header wins over a contradicting meta tag
+    assert "Grüße" in web._decode_html(b'<meta charset="utf-8">' + latin, "text/html; charset=latin-1")
+    assert web._decode_html("\ufeffHallo".encode("utf-8"), "text/html") == "Hallo"
+    assert web._decode_html("Grüße".encode("utf-8"), "text/html; charset=no-such-codec") == "Grüße"
+    assert web._decode_html("Grüße".encode("utf-8"), "text/html") == "Grüße"